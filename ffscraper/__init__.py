@@ -30,11 +30,17 @@ Example:
 
 """
 
+from . import archive
 from . import fanfic
 from .format import format
 from . import storyid
 from . import author
+from . import cache
+from . import frontier
 from . import nlp
+from . import ratelimit
+from . import session
+from . import store
 from . import utils
 
 __author__ = 'Alexander L. Hayes (@hayesall)'
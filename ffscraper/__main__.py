@@ -23,6 +23,11 @@ from .author import profile
 from .phases import phase1
 from .phases import phase2
 from .phases import phase3
+from . import archive
+from . import cache
+from . import frontier
+from . import ratelimit
+from . import store
 from . import utils
 
 # Non-Standard Library Modules
@@ -77,6 +82,38 @@ parser.add_argument('-co', '--Cout', type=str, default='cytoscape.txt',
                     help='Set output file for cytoscape network file.')
 parser.add_argument('-o', '--output', type=str, default='facts.txt',
                     help='Set output file the information scraped.')
+
+parser.add_argument('--budget', type=str,
+                    help='''SQLite file holding a rate budget shared by every
+                            process started with the same file.''')
+parser.add_argument('--rate', type=float, default=0.5,
+                    help='''Requests per second allowed by --budget, summed
+                            over all processes (default: 0.5).''')
+parser.add_argument('--cache', type=str,
+                    help='''Directory to cache downloaded pages in. Cached
+                            pages are not downloaded again.''')
+parser.add_argument('--store', type=str,
+                    help='''SQLite file to remember every story seen in (on
+                            story pages or in favorites). Stories already in
+                            it are not downloaded again.''')
+parser.add_argument('--frontier', type=str,
+                    help='''SQLite file to keep track of which stories and
+                            users were scraped in. Running the same command
+                            again resumes where it stopped.''')
+parser.add_argument('--new-crawl', action='store_true',
+                    help='''Forget what the --frontier says was already
+                            scraped, and crawl everything again.''')
+parser.add_argument('--parser', type=str, default='html.parser',
+                    choices=utils.PARSERS,
+                    help='''Parser for BeautifulSoup to use. lxml is fastest,
+                            if it is installed (default: html.parser).''')
+
+archive_mode = parser.add_mutually_exclusive_group()
+archive_mode.add_argument('--record', type=str,
+                          help='Record every page into an archive file.')
+archive_mode.add_argument('--replay', type=str,
+                          help='''Read every page from an archive file made
+                                  with --record, without using the network.''')
 # </Argument Parser>
 
 args = parser.parse_args()
@@ -99,6 +136,30 @@ if args.verbose:
     logger.addHandler(log_handler)
     logger.info('Started logger.')
 
+utils.set_parser(args.parser)
+
+if args.budget:
+    # Draw from a rate budget shared with other ffscraper processes.
+    ratelimit.set_limiter(ratelimit.SharedRateLimiter(args.budget, args.rate))
+
+if args.cache:
+    # Reuse pages downloaded by earlier runs.
+    cache.set_cache(cache.HTMLCache(args.cache))
+
+if args.store:
+    store.set_store(store.StoryStore(args.store))
+
+if args.frontier:
+    frontier.set_frontier(frontier.Frontier(args.frontier))
+    if args.new_crawl:
+        frontier.get_frontier().clear('story')
+        frontier.get_frontier().clear('user')
+
+if args.record:
+    archive.set_archive(archive.Archive(args.record, mode='a'))
+elif args.replay:
+    archive.set_archive(archive.Archive(args.replay))
+
 if args.sid:
     # Scrape the contents of a single file from FanFiction.Net
 
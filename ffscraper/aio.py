@@ -0,0 +1,170 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
++-------------+------------------------------------------------------------+
+|   **Name**  |                     **Description**                        |
++-------------+------------------------------------------------------------+
+|    aio.py   | asyncio versions of the scrapers, with bounded concurrency |
++-------------+------------------------------------------------------------+
+
+The scrapers in :mod:`ffscraper.fanfic`, :mod:`ffscraper.author` and
+:mod:`ffscraper.storyid` download one page at a time. An :class:`Engine`
+keeps up to ``concurrency`` downloads in flight at once, so waiting on the
+network overlaps with parsing; throughput is then bounded by the rate
+limiter rather than by round trips.
+
+Pages are requested exactly like :func:`ffscraper.utils.fetch` does: through
+the shared session, limiter, cache and archive.
+
+.. note:: Requires Python 3.5 or newer, so this module is not imported by
+          ``import ffscraper``.
+
+.. code-block:: python
+
+                import asyncio
+                from ffscraper.aio import Engine
+
+                async def main(sids):
+                    engine = Engine(concurrency=8, rate_limit=1)
+                    stories = await asyncio.gather(
+                        *[engine.scrape_story(sid) for sid in sids],
+                        return_exceptions=True)
+                    engine.close()
+                    return stories
+
+                stories = asyncio.get_event_loop().run_until_complete(
+                    main(['123', '124', '125']))
+"""
+
+import asyncio
+from concurrent.futures import ThreadPoolExecutor
+
+from . import store
+from . import storyid
+from . import utils
+from .author import profile
+from .fanfic import review
+from .fanfic import story
+from .ratelimit import get_limiter
+
+
+class Engine(object):
+    """
+    .. versionadded:: 0.3.0
+
+    :param concurrency: Maximum number of pages being downloaded at once.
+    :type concurrency: int.
+    :param rate_limit: Minimum number of seconds between requests (ignored if
+                       a limiter was installed with
+                       :func:`ffscraper.ratelimit.set_limiter`).
+    :type rate_limit: int.
+    """
+
+    def __init__(self, concurrency=8, rate_limit=3):
+        self.concurrency = concurrency
+        self.rate_limit = rate_limit
+
+        # requests is synchronous, so downloads happen on worker threads.
+        self._executor = ThreadPoolExecutor(max_workers=concurrency)
+        self._semaphore = None
+
+    def _slots(self):
+        # Created lazily, since it has to belong to the running event loop.
+        if self._semaphore is None:
+            self._semaphore = asyncio.Semaphore(self.concurrency)
+        return self._semaphore
+
+    async def _run(self, func, *args):
+        loop = asyncio.get_event_loop()
+        return await loop.run_in_executor(self._executor, func, *args)
+
+    async def fetch(self, url):
+        """
+        Returns the html at a url. See :func:`ffscraper.utils.fetch`.
+        """
+        async with self._slots():
+            html = await self._run(utils._stored, url)
+
+        if html is None:
+            # Wait for the limiter without holding one of the slots.
+            limiter = get_limiter(self.rate_limit)
+            if limiter is not None:
+                await asyncio.sleep(limiter.reserve())
+
+            async with self._slots():
+                html = await self._run(utils._download, url)
+
+        return html
+
+    async def soupify(self, url, parse_only=None):
+        """
+        Returns the soup for the html at a url.
+        """
+        return utils._soup(await self.fetch(url), parse_only=parse_only)
+
+    async def scrape_story(self, sid, fields=None):
+        """
+        asyncio version of :func:`ffscraper.fanfic.story.scraper`.
+        """
+        fields = story._fields(fields)
+        soup = await self.soupify(story._url(sid), story._strainer(fields))
+        return story._story(soup, sid, fields=fields)
+
+    async def scrape_reviews(self, sid, reviews_num):
+        """
+        asyncio version of :func:`ffscraper.fanfic.review.scraper`. Every page
+        of reviews is requested at once.
+        """
+        pages = await asyncio.gather(
+            *[self.soupify(review._url(sid, p + 1), review._STRAINER)
+              for p in range(review._number_of_pages(reviews_num))])
+        return [r for soup in pages for r in review._reviews_in_table(soup)]
+
+    async def scrape_profile(self, uid):
+        """
+        asyncio version of :func:`ffscraper.author.profile.scraper`.
+        """
+        soup = await self.soupify(profile._url(uid), profile._STRAINER)
+        user = profile._profile(soup, uid)
+        store.remember(user['favorite_records'])
+        return user
+
+    async def scrape_storyids(self, url, max_pages=float('inf')):
+        """
+        asyncio version of :func:`ffscraper.storyid.scrape`. Every page after
+        the first is requested at once.
+        """
+        soup = await self.soupify(url, storyid._STRAINER)
+        number_of_pages = min(storyid._number_of_pages(soup), max_pages)
+
+        if not number_of_pages:
+            return storyid._get_sids(soup)
+
+        pages = await asyncio.gather(
+            *[self.soupify(storyid._page_url(url, page),
+                           storyid._STRAINER)
+              for page in range(2, number_of_pages + 1)])
+
+        sids = storyid._get_sids(soup)
+        for page in pages:
+            sids += storyid._get_sids(page)
+        return sids
+
+    def close(self):
+        """
+        Shut down the worker threads.
+        """
+        self._executor.shutdown(wait=False)
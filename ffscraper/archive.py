@@ -0,0 +1,222 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
++-------------+------------------------------------------------------------+
+|   **Name**  |                     **Description**                        |
++-------------+------------------------------------------------------------+
+|  archive.py | Record every page from a crawl, and replay it offline.     |
++-------------+------------------------------------------------------------+
+
+An archive is a single append-only file holding every page downloaded
+during a crawl. Recording one and replaying it later re-runs the exact same
+crawl (e.g. after changing how stories are parsed) without touching the
+network and without waiting on the rate limiter.
+
+.. code-block:: python
+
+                from ffscraper import archive
+                from ffscraper.phases import phase1
+
+                # Record...
+                archive.set_archive(archive.Archive('crawl.ffa', mode='a'))
+                phase1(sids)
+
+                # ...then replay, entirely offline.
+                archive.set_archive(archive.Archive('crawl.ffa'))
+                phase1(sids)
+
+The same is available from the command line with ``--record`` and
+``--replay``.
+
+Each record is a header line followed by the zlib-compressed page:
+
+.. code-block:: text
+
+                FFA <url> <unix time fetched> <compressed length>\\n
+                <compressed html>\\n
+
+The url may contain spaces, so the time and length are read from the end
+of the header. The index of urls is rebuilt by reading only the header
+lines when the archive is opened. A record left incomplete by a crash is
+dropped.
+"""
+
+from __future__ import print_function
+
+import os
+import threading
+import time
+import zlib
+
+from .cache import normalize_url
+
+_MAGIC = b'FFA'
+
+
+class PageNotArchived(KeyError):
+    """
+    .. versionadded:: 0.3.0
+
+    Raised when replaying an archive which does not contain a requested page.
+    """
+
+
+class Archive(object):
+    """
+    .. versionadded:: 0.3.0
+
+    :param path: Path to the archive file.
+    :type path: str.
+    :param mode: ``'r'`` to replay an existing archive, or ``'a'`` to record
+                 into it (creating it if it does not exist).
+    :type mode: str.
+    """
+
+    def __init__(self, path, mode='r'):
+        if mode not in ('r', 'a'):
+            raise ValueError("mode should be 'r' or 'a'.")
+
+        self.path = path
+        self.mode = mode
+        self._index = {}
+        self._lock = threading.Lock()
+
+        if mode == 'a' and not os.path.exists(path):
+            open(path, 'wb').close()
+
+        self._file = open(path, 'rb+' if mode == 'a' else 'rb')
+        end = self._build_index()
+
+        if mode == 'a':
+            # Drop a partial record left behind by a crash, then append.
+            self._file.truncate(end)
+            self._file.seek(end)
+
+    @property
+    def replay(self):
+        """
+        True if this archive is being replayed rather than recorded into.
+        """
+        return self.mode == 'r'
+
+    def _build_index(self):
+        """
+        Read the header of every record, skipping over the pages.
+
+        :returns: Offset at the end of the last complete record.
+        :rtype: int.
+        """
+        f = self._file
+        f.seek(0, os.SEEK_END)
+        size = f.tell()
+        f.seek(0)
+
+        end = 0
+        while True:
+            header = f.readline()
+            if not header.endswith(b'\n'):
+                break
+            try:
+                # Only the url may contain spaces.
+                magic, rest = header[:-1].split(b' ', 1)
+                url, fetched, length = rest.rsplit(b' ', 2)
+                length = int(length)
+            except ValueError:
+                break
+            if magic != _MAGIC or f.tell() + length + 1 > size:
+                break
+
+            self._index[url.decode('utf-8')] = (f.tell(), length)
+            f.seek(length + 1, os.SEEK_CUR)
+            end = f.tell()
+
+        return end
+
+    def get(self, url):
+        """
+        Returns the html recorded for ``url``, or None.
+        """
+        location = self._index.get(normalize_url(url))
+        if location is None:
+            return None
+
+        offset, length = location
+        with self._lock:
+            self._file.seek(offset)
+            data = self._file.read(length)
+        return zlib.decompress(data).decode('utf-8')
+
+    def record(self, url, html):
+        """
+        Append the html for ``url``, unless the archive already holds it.
+        """
+        if self.replay:
+            raise IOError('Archive was opened for replay.')
+
+        key = normalize_url(url)
+        data = zlib.compress(html.encode('utf-8'))
+
+        with self._lock:
+            if key in self._index:
+                return
+            self._file.seek(0, os.SEEK_END)
+            header = u'FFA {0} {1} {2}\n'.format(key, int(time.time()),
+                                                 len(data))
+            self._file.write(header.encode('utf-8'))
+            offset = self._file.tell()
+            self._file.write(data + b'\n')
+            self._file.flush()
+            self._index[key] = (offset, len(data))
+
+    def urls(self):
+        """
+        Returns the (normalized) urls of every archived page.
+        """
+        return list(self._index)
+
+    def close(self):
+        self._file.close()
+
+    def __contains__(self, url):
+        return normalize_url(url) in self._index
+
+    def __len__(self):
+        return len(self._index)
+
+
+_archive = None
+
+
+def set_archive(archive):
+    """
+    .. versionadded:: 0.3.0
+
+    Record into (or replay from) ``archive`` for every page requested by the
+    scrapers.
+
+    :param archive: An :class:`Archive`, or None to stop.
+    """
+    global _archive
+    _archive = archive
+
+
+def get_archive():
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the installed archive, or None.
+    """
+    return _archive
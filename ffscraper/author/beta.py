@@ -18,7 +18,6 @@ from __future__ import print_function
 from ..utils import soupify
 
 from bs4 import BeautifulSoup as bs
-import time
 
 def scraper(uid, rate_limit=3):
     """
@@ -45,8 +44,8 @@ def scraper(uid, rate_limit=3):
 
     :param uid: User-id number for a person on FanFiction.Net.
     :type uid: str.
-    :param rate_limit: Number of seconds to wait at the start of function call
-                       in order to enforce scraper niceness.
+    :param rate_limit: Minimum number of seconds between requests, in order
+                       to enforce scraper niceness.
     :type rate_limit: int.
     :returns: Currently returns nothing.
 
@@ -61,9 +60,6 @@ def scraper(uid, rate_limit=3):
     >>> beta.scraper('123')
     """
 
-    # Rate Limit
-    time.sleep(rate_limit)
-
     # Make a request to the site, make a BeautifulSoup instance for the html
     soup = soupify('https://www.fanfiction.net/beta/' + uid,
                    rate_limit=rate_limit)
@@ -24,12 +24,30 @@
 from __future__ import print_function
 from __future__ import division
 
+from ..fanfic import metadata
+from ..store import remember
+from ..utils import scrape_many as _scrape_many
 from ..utils import soupify
+from ..utils import Strainer
 
 from bs4 import BeautifulSoup as bs
 import time
 
 
+def _profile_parts(name, attrs):
+    """
+    .. versionadded:: 0.3.0
+
+    Parts of a profile read by :func:`_profile`: the favorite stories and
+    the table of favorite authors.
+    """
+    return (attrs.get('id') == 'fa' or
+            'favstories' in Strainer.classes(attrs))
+
+
+_STRAINER = Strainer(_profile_parts)
+
+
 def _favorite_stories(soup):
     """
     .. versionadded:: 0.3.0
@@ -69,6 +87,50 @@ def _favorite_stories(soup):
     return favs, favorites_inverted
 
 
+def _favorite_records(soup):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads everything shown about each favorite story: the entry itself (see
+    :func:`ffscraper.fanfic.metadata.z_list_record`), with the fandom,
+    title, timestamps and counts taken from the data attributes of the div.
+
+    :param soup: Soup containing a page from FanFiction.Net
+    :type soup: bs4.BeautifulSoup class
+
+    :returns: A list of story records.
+    :rtype: list of dicts.
+    """
+
+    records = []
+    for story in soup.find_all('div', {'class': 'z-list favstories'}):
+        record = metadata.z_list_record(story) or {}
+        m = record.setdefault('metadata', metadata.parse(''))
+
+        record['sid'] = _metadata_storyid(story)
+        record['fandom'] = _metadata_fandom(story)
+        record['title'] = story.get('data-title', record.get('title'))
+        record['published'] = story.get('data-datesubmit',
+                                        record.get('published'))
+        record['updated'] = story.get('data-dateupdate',
+                                      record.get('updated'))
+
+        for key, attribute in (('words', 'data-wordcount'),
+                               ('chapters', 'data-chapters'),
+                               ('reviews', 'data-ratingtimes')):
+            if story.get(attribute, '').isdigit():
+                m[key] = int(story[attribute])
+        if story.get('data-statusid') == '2':
+            m['status'] = 'Complete'
+
+        if m['reviews']:
+            record['num_reviews'] = m['reviews']
+
+        records.append(record)
+
+    return records
+
+
 def _favorite_authors(soup):
     """
     .. versionadded:: 0.3.0
@@ -198,11 +260,14 @@ def scraper(uid, rate_limit=3):
 
     :param uid: User-id number for a person on FanFiction.Net.
     :type uid: str.
-    :param rate_limit: Number of seconds to wait at the start of function call
-                       in order to enforce scraper niceness.
+    :param rate_limit: Minimum number of seconds between requests, in order
+                       to enforce scraper niceness.
     :type rate_limit: int.
     :returns: Returns a dictionary containing favorite stories, favorite
-              authors.
+              authors, and everything shown about each favorite story
+              (see :func:`_favorite_records`). If a store was installed with
+              :func:`ffscraper.store.set_store`, the favorite stories are
+              saved into it.
     :rtype: dict.
 
     .. code-block:: python
@@ -223,13 +288,69 @@ def scraper(uid, rate_limit=3):
                     uid - 123
                     favorite_authors - ['134', '136', '138']
                     favorite_stories - (['111', 'Hobbit'], {'Hobbit': ['111']})
+                    favorite_records - [{'sid': '111', 'title': 'There', ...}]
     """
 
     # Make a request to the site, make a BeautifulSoup instance for the html
-    soup = soupify('https://www.fanfiction.net/u/' + uid,
-                   rate_limit=rate_limit)
+    soup = soupify(_url(uid), rate_limit=rate_limit, parse_only=_STRAINER)
+    profile = _profile(soup, uid)
+
+    # Remember the favorites, so their pages need not be downloaded.
+    remember(profile['favorite_records'])
+
+    return profile
+
+
+def scrape_many(uids, workers=4, rate_limit=3):
+    """
+    .. versionadded:: 0.3.0
+
+    Scrapes many profiles at once on a pool of threads. See
+    :func:`ffscraper.utils.scrape_many`.
+
+    :param uids: Iterable of user-ids.
+    :type uids: iterable of str.
+    :param workers: Number of threads.
+    :type workers: int.
+    :param rate_limit: Minimum number of seconds between requests, shared by
+                       all of the threads.
+    :type rate_limit: int.
+
+    :returns: Generator of (uid, profile, error) in completion order, where
+              ``profile`` is the dictionary from :func:`scraper` and ``error``
+              is an exception if scraping failed.
+    """
+    return _scrape_many(scraper, uids, workers=workers,
+                        rate_limit=rate_limit)
+
+
+def _url(uid):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the address of a user's profile on FanFiction.Net.
+    """
+    return 'https://www.fanfiction.net/u/' + uid
+
+
+def _profile(soup, uid):
+    """
+    .. versionadded:: 0.3.0
+
+    Parses a user's profile from the soup. See :func:`scraper` for the
+    contents of the dictionary.
+
+    :param soup: Soup containing a profile page from FanFiction.Net
+    :type soup: bs4.BeautifulSoup class
+    :param uid: User-id number for the person.
+    :type uid: str.
+
+    :returns: Dictionary containing favorite stories, favorite authors.
+    :rtype: dict.
+    """
     return {
                 'uid': uid,
                 'favorite_authors': _favorite_authors(soup),
-                'favorite_stories': _favorite_stories(soup)
+                'favorite_stories': _favorite_stories(soup),
+                'favorite_records': _favorite_records(soup)
             }
@@ -0,0 +1,251 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
++-------------+------------------------------------------------------------+
+|   **Name**  |                     **Description**                        |
++-------------+------------------------------------------------------------+
+|   cache.py  | On-disk cache for html downloaded from FanFiction.Net      |
++-------------+------------------------------------------------------------+
+
+When a cache is installed, :func:`ffscraper.utils.soupify` checks it before
+downloading a page, and stores every page it downloads. Cache hits do not
+wait on the rate limiter, so re-running a phase after a crash (or after
+changing how pages are parsed) only downloads pages which were not seen yet.
+
+.. code-block:: python
+
+                from ffscraper import cache
+
+                # Keep up to 2 GB of pages, and re-download reviews daily.
+                cache.set_cache(cache.HTMLCache('.ffscraper-cache',
+                                                ttl={'review': 86400},
+                                                max_size=2 * 1024 ** 3))
+
+Pages are stored zlib-compressed under the sha1 of their normalized url.
+An index (a small SQLite database in the same directory) tracks when each
+page was downloaded and last used, so that expired pages can be ignored and
+the least recently used pages removed once the cache grows past
+``max_size`` bytes.
+"""
+
+from __future__ import division
+
+import hashlib
+import os
+import sqlite3
+import threading
+import time
+import zlib
+
+try:
+    from urllib.parse import parse_qsl, urlencode, urlsplit, urlunsplit
+except ImportError:
+    from urllib import urlencode
+    from urlparse import parse_qsl, urlsplit, urlunsplit
+
+# Seconds before a page of each type is considered stale. None never expires.
+DEFAULT_TTL = {
+    'story': 7 * 86400,
+    'review': 86400,
+    'profile': 7 * 86400,
+    'listing': 86400,
+}
+
+
+def normalize_url(url):
+    """
+    .. versionadded:: 0.3.0
+
+    Normalize a url so that equivalent addresses share a cache entry: the
+    scheme and host are lowercased, fragments and empty query parameters are
+    dropped, query parameters are sorted, and trailing slashes are removed.
+
+    >>> normalize_url('https://www.FanFiction.net/book/Coraline/?&p=2#top')
+    'https://www.fanfiction.net/book/Coraline?p=2'
+    """
+    scheme, netloc, path, query, _ = urlsplit(url.strip())
+    query = urlencode(sorted(parse_qsl(query)))
+    return urlunsplit((scheme.lower(), netloc.lower(), path.rstrip('/'),
+                       query, ''))
+
+
+def page_type(url):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns which kind of page a url points to: one of ``'story'``,
+    ``'review'``, ``'profile'`` or ``'listing'``.
+    """
+    first = urlsplit(url).path.strip('/').split('/')[0]
+    return {'s': 'story', 'r': 'review', 'u': 'profile'}.get(first, 'listing')
+
+
+class HTMLCache(object):
+    """
+    .. versionadded:: 0.3.0
+
+    Size-bounded, compressed, on-disk cache of html pages.
+
+    :param directory: Directory to keep the cache in (created if needed).
+    :type directory: str.
+    :param ttl: Seconds before pages of each type expire, overriding
+                :data:`DEFAULT_TTL`, e.g. ``{'listing': 3600}``.
+    :type ttl: dict.
+    :param max_size: Upper limit on the compressed size of all pages, in
+                     bytes. Least recently used pages are evicted first.
+    :type max_size: int.
+    """
+
+    def __init__(self, directory, ttl=None, max_size=1024 ** 3,
+                 clock=time.time):
+        self.directory = directory
+        self.ttl = dict(DEFAULT_TTL)
+        self.ttl.update(ttl or {})
+        self.max_size = max_size
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        if not os.path.isdir(directory):
+            os.makedirs(directory)
+
+        self._conn = sqlite3.connect(os.path.join(directory, 'index.db'),
+                                     timeout=60, check_same_thread=False)
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS pages '
+                               '(key TEXT PRIMARY KEY, kind TEXT, '
+                               'size INTEGER, fetched REAL, accessed REAL)')
+            self._conn.execute('CREATE INDEX IF NOT EXISTS lru '
+                               'ON pages (accessed)')
+
+    def _path(self, key):
+        return os.path.join(self.directory, key[:2], key + '.z')
+
+    def get(self, url):
+        """
+        Returns the cached html for ``url``, or None if there is no fresh copy.
+        """
+        key = hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+        now = self._clock()
+
+        with self._lock:
+            row = self._conn.execute('SELECT kind, fetched FROM pages '
+                                     'WHERE key=?', (key,)).fetchone()
+            if row is None:
+                return None
+
+            kind, fetched = row
+            ttl = self.ttl.get(kind)
+            if ttl is not None and now - fetched > ttl:
+                return None
+
+            try:
+                with open(self._path(key), 'rb') as f:
+                    data = f.read()
+            except (IOError, OSError):
+                # Removed by someone else; forget about it.
+                with self._conn:
+                    self._conn.execute('DELETE FROM pages WHERE key=?', (key,))
+                return None
+
+            with self._conn:
+                self._conn.execute('UPDATE pages SET accessed=? WHERE key=?',
+                                   (now, key))
+
+        return zlib.decompress(data).decode('utf-8')
+
+    def put(self, url, html):
+        """
+        Store the html for ``url``, evicting old pages if the cache is full.
+        """
+        key = hashlib.sha1(normalize_url(url).encode('utf-8')).hexdigest()
+        data = zlib.compress(html.encode('utf-8'))
+        path = self._path(key)
+        now = self._clock()
+
+        with self._lock:
+            if not os.path.isdir(os.path.dirname(path)):
+                os.makedirs(os.path.dirname(path))
+
+            # Write to a temporary file first so readers never see half a page.
+            tmp = path + '.' + str(os.getpid()) + '.tmp'
+            with open(tmp, 'wb') as f:
+                f.write(data)
+            os.rename(tmp, path)
+
+            with self._conn:
+                self._conn.execute('INSERT OR REPLACE INTO pages '
+                                   'VALUES (?, ?, ?, ?, ?)',
+                                   (key, page_type(url), len(data), now, now))
+            self._evict()
+
+    def _evict(self):
+        """
+        Remove least recently used pages until the cache fits in max_size.
+        """
+        total = self.size()
+        if total <= self.max_size:
+            return
+
+        evicted = []
+        for key, size in self._conn.execute('SELECT key, size FROM pages '
+                                            'ORDER BY accessed'):
+            if total <= self.max_size:
+                break
+            evicted.append(key)
+            total -= size
+
+        with self._conn:
+            self._conn.executemany('DELETE FROM pages WHERE key=?',
+                                   [(key,) for key in evicted])
+        for key in evicted:
+            try:
+                os.remove(self._path(key))
+            except OSError:
+                pass
+
+    def size(self):
+        """
+        Returns the compressed size of every page in the cache, in bytes.
+        """
+        total = self._conn.execute('SELECT SUM(size) FROM pages').fetchone()
+        return total[0] or 0
+
+    def __len__(self):
+        return self._conn.execute('SELECT COUNT(*) FROM pages').fetchone()[0]
+
+
+_cache = None
+
+
+def set_cache(cache):
+    """
+    .. versionadded:: 0.3.0
+
+    Use ``cache`` for every page requested by the scrapers.
+
+    :param cache: An :class:`HTMLCache`, or None to turn caching off.
+    """
+    global _cache
+    _cache = cache
+
+
+def get_cache():
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the installed cache, or None.
+    """
+    return _cache
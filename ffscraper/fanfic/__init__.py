@@ -2,5 +2,7 @@
 Doc-string for FanFicScraper
 """
 
+from . import chapter
+from . import metadata
 from . import story
 from . import review
@@ -13,9 +13,232 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+"""
++----------------------+---------------------------------------------------+
+|      **Name**        |                  **Description**                  |
++----------------------+---------------------------------------------------+
+|      chapter.py      | Download the text of every chapter of a story     |
++----------------------+---------------------------------------------------+
+
+:func:`download` writes the text of each chapter of a story to
+``<sid>.txt.gz`` as soon as it (and every chapter before it) has been
+downloaded, so only a few chapters are held in memory at once. Each chapter
+is its own gzip member, so the file reads as one stream of text with any
+gzip tool, while :func:`read_chapters` reads the chapters one by one.
+
+A small sidecar file, ``<sid>.txt.gz.progress``, records where each chapter
+ends. If a download is interrupted, calling :func:`download` again resumes
+after the last chapter which was completely written. Calling it again after
+the story was updated downloads only the new chapters.
+
+.. code-block:: python
+
+                from ffscraper.fanfic import chapter
+
+                path = chapter.download('123', directory='corpus', workers=4)
+
+                for number, text in chapter.read_chapters(path):
+                    print(number, len(text))
+"""
+
 from __future__ import print_function
+from __future__ import division
+
+from ..utils import _soup
+from ..utils import fetch
+from ..utils import scrape_many
+from ..utils import Strainer
+
+import gzip
+import os
+import zlib
+
+
+def _chapter_parts(name, attrs):
+    """
+    .. versionadded:: 0.3.0
+
+    Parts of a chapter page read by :func:`_chapter`: the chapter menu, the
+    text of the chapter and the 'Story Not Found' warning.
+    """
+    return (attrs.get('id') in ('chap_select', 'storytext') or
+            'gui_warning' in Strainer.classes(attrs))
+
+
+_STRAINER = Strainer(_chapter_parts)
+
+
+def _url(storyid, chapter):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the address of a chapter of a story on FanFiction.Net.
+    """
+    return 'https://www.fanfiction.net/s/' + storyid + '/' + str(chapter)
+
+
+def _chapter(soup):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads a chapter page.
+
+    :param soup: Soup containing a chapter page from FanFiction.Net
+    :type soup: bs4.BeautifulSoup class
+
+    :returns: Tuple of (text of the chapter, number of chapters in the story)
+    :rtype: tuple
+    """
+
+    if soup.find('span', {'class': 'gui_warning'}):
+        raise(Exception('Fanfic is empty.'))
+
+    # Stories with a single chapter do not have a chapter menu.
+    number_of_chapters = 1
+    menu = soup.find('select', {'id': 'chap_select'})
+    if menu is not None:
+        values = [o.get('value') for o in menu.find_all('option')]
+        number_of_chapters = max([int(v) for v in values if v and
+                                  v.isdigit()] or [1])
+
+    return soup.find('div', {'id': 'storytext'}).text, number_of_chapters
+
+
+def _scrape(storyid, chapter, rate_limit):
+    html = fetch(_url(storyid, chapter), rate_limit=rate_limit)
+    return _chapter(_soup(html, parse_only=_STRAINER))
+
+
+def _progress(path):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads the sidecar of a chapter file.
+
+    :returns: List of (chapter, offset where the chapter ends) for every
+              chapter which was completely written.
+    :rtype: list of tuples.
+    """
+    done = []
+    if not (os.path.exists(path) and os.path.exists(path + '.progress')):
+        return done
+
+    size = os.path.getsize(path)
+    last = 0
+
+    with open(path + '.progress') as f:
+        for line in f:
+            # A line left incomplete by a crash (e.g. '3 2' instead of
+            # '3 219\n') may still read as two numbers, so it must also end
+            # the line, and end after the last chapter but inside the file.
+            try:
+                chapter, offset = (int(n) for n in line.split())
+            except ValueError:
+                break
+            if not line.endswith('\n') or not last < offset <= size:
+                break
+            done.append((chapter, offset))
+            last = offset
+    return done
+
+
+def download(storyid, directory='.', workers=4, rate_limit=3):
+    """
+    .. versionadded:: 0.3.0
+
+    Downloads every chapter of a story into ``<directory>/<storyid>.txt.gz``,
+    resuming after the last chapter written by a previous call.
+
+    Chapters are requested on a pool of threads (through the rate limiter,
+    so the budget is shared with everything else), but written in order.
+
+    :param storyid: Story-id number for a story on FanFiction.Net.
+    :type storyid: str.
+    :param directory: Directory to write the file in.
+    :type directory: str.
+    :param workers: Number of chapters downloaded at once.
+    :type workers: int.
+    :param rate_limit: Minimum number of seconds between requests, in order
+                       to enforce scraper niceness.
+    :type rate_limit: int.
+
+    :returns: The path to the file.
+    :rtype: str.
+    """
+
+    path = os.path.join(directory, storyid + '.txt.gz')
+    done = _progress(path)
+
+    if done:
+        # Re-read the last chapter written, to see if any were added since.
+        last, offset = done[-1]
+        number_of_chapters = _scrape(storyid, last, rate_limit)[1]
+        first = None
+    else:
+        # The first chapter also says how many chapters there are.
+        last, offset = 1, 0
+        first, number_of_chapters = _scrape(storyid, 1, rate_limit)
+
+    if not os.path.isdir(directory):
+        os.makedirs(directory)
+
+    # Drop anything written after the last completed chapter.
+    with open(path, 'ab') as f:
+        f.truncate(offset)
+    with open(path + '.progress', 'w') as progress:
+        progress.writelines('{0} {1}\n'.format(c, o) for c, o in done)
+
+    def scrape(chapter):
+        return _scrape(storyid, chapter, rate_limit)[0]
+
+    chapters = scrape_many(scrape, range(last + 1, number_of_chapters + 1),
+                           workers=workers, ordered=True)
+    try:
+        with open(path, 'ab') as f, open(path + '.progress', 'a') as progress:
+            if first is not None:
+                _write(f, progress, 1, first)
+
+            for chapter, text, error in chapters:
+                if error is not None:
+                    raise error
+                _write(f, progress, chapter, text)
+    finally:
+        # If a chapter failed, do not start anything new.
+        chapters.close()
+
+    return path
+
+
+def _write(f, progress, chapter, text):
+    """
+    .. versionadded:: 0.3.0
+
+    Append one chapter as its own gzip member, then record where it ends.
+    """
+    with gzip.GzipFile(fileobj=f, mode='wb') as member:
+        member.write(text.encode('utf-8'))
+    f.flush()
+    progress.write('{0} {1}\n'.format(chapter, f.tell()))
+    progress.flush()
+
+
+def read_chapters(path):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads a file written by :func:`download`, one chapter at a time.
 
-from bs4 import BeautifulSoup as bs
+    :param path: Path to the file.
+    :type path: str.
 
-import requests
-import time
+    :returns: Generator of (chapter number, text of the chapter).
+    """
+    start = 0
+    with open(path, 'rb') as f:
+        for chapter, end in _progress(path):
+            f.seek(start)
+            data = f.read(end - start)
+            # 16 + MAX_WBITS reads a gzip header rather than a zlib one.
+            text = zlib.decompress(data, 16 + zlib.MAX_WBITS)
+            yield chapter, text.decode('utf-8')
+            start = end
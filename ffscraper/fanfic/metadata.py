@@ -13,9 +13,233 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+"""
++----------------------+---------------------------------------------------+
+|      **Name**        |                  **Description**                  |
++----------------------+---------------------------------------------------+
+|     metadata.py      | Parse the metadata line describing a story        |
++----------------------+---------------------------------------------------+
+
+FanFiction.Net describes each story with a line of metadata, which looks
+slightly different depending on where the story is shown:
+
+* Story pages: ``Rated: Fiction  T - English - Romance/Sci-Fi - [Harry P.,
+  Hermione G.] Ron W. - Chapters: 3 - Words: 12,345 - Reviews: 32 - Favs: 1,024
+  - Follows: 56 - Updated: 7/14/2017 - Published: 5/13/2014 - Status: Complete
+  - id: 123``
+* Listing pages: ``Rated: K+ - English - Humor - Chapters: 1 - Words: 2,048 -
+  ... - Published: 1/2/2010 - Luna L., Neville L. - Complete``
+* Favorites on a profile, which start with the fandom: ``Harry Potter - Rated:
+  T - ...`` or ``Crossover - Harry Potter & Naruto - Rated: T - ...``
+
+:func:`parse` reads any of them.
+
+.. code-block:: python
+
+                from ffscraper.fanfic import metadata
+
+                m = metadata.parse('Rated: K+ - English - Humor/Sci-Fi - '
+                                   'Chapters: 2 - Words: 2,048 - Complete')
+                print(m['rating'], m['genres'], m['words'], m['status'])
+
+.. code-block:: bash
+
+                K+ ['Humor', 'Sci-Fi'] 2048 Complete
+"""
+
 from __future__ import print_function
 
-from bs4 import BeautifulSoup as bs
+import re
+
+GENRES = ('Adventure', 'Angst', 'Crime', 'Drama', 'Family', 'Fantasy',
+          'Friendship', 'General', 'Horror', 'Humor', 'Hurt/Comfort',
+          'Mystery', 'Parody', 'Poetry', 'Romance', 'Sci-Fi', 'Spiritual',
+          'Supernatural', 'Suspense', 'Tragedy', 'Western')
+
+# Counts which are 0 when they are left out of the line.
+COUNTS = ('chapters', 'words', 'reviews', 'favs', 'follows')
+
+# Fields are separated by a dash with spaces around it, which keeps Sci-Fi
+# (and hyphenated names) in one piece.
+_SEPARATOR = re.compile(r'\s+-\s+')
+_WHITESPACE = re.compile(r'\s+')
+_FIELD = re.compile(r'^(Rated|Chapters|Words|Reviews|Favs|Follows|Updated|'
+                    r'Published|Status|id):\s*(.*)$')
+_RATING = re.compile(r'(K\+|K|T|M)$')
+_GENRE = '|'.join(re.escape(g) for g in
+                  sorted(GENRES, key=len, reverse=True))
+_GENRES = re.compile(r'^(?:{0})(?:/(?:{0}))*$'.format(_GENRE))
+_GENRE_NAMES = re.compile(_GENRE)
+_CHARACTER = re.compile(r'\[([^\]]*)\]|([^,\[\]]+)')
+
+
+def parse(text):
+    """
+    .. versionadded:: 0.3.0
+
+    Parses the metadata line for a story.
+
+    :param text: The text of the metadata line.
+    :type text: str.
+
+    :returns: Dictionary with the keys:
+
+              * 'rating': 'K', 'K+', 'T' or 'M' (or None)
+              * 'language': e.g. 'English' (or None)
+              * 'genres': list of genres, e.g. ``['Humor', 'Sci-Fi']``
+              * 'characters': list of every character listed
+              * 'pairings': list of lists, one for each bracketed pairing
+              * 'chapters', 'words', 'reviews', 'favs', 'follows': ints
+                (0 when left out of the line, except 'chapters', which is
+                left out for one-shots and so is 1)
+              * 'status': 'Complete' or 'In-Progress'
+              * 'id': the story-id as a string, when on the line (or None)
+              * 'fandom': the fandom, when the line starts with one (or None)
+              * 'crossover': True if the story is a crossover
+
+    :rtype: dict.
+    """
+
+    metadata = {
+        'rating': None,
+        'language': None,
+        'genres': [],
+        'characters': [],
+        'pairings': [],
+        'status': 'In-Progress',
+        'id': None,
+        'fandom': None,
+        'crossover': False,
+    }
+    for count in COUNTS:
+        metadata[count] = 0
+    # One-shots have no 'Chapters:' on the line.
+    metadata['chapters'] = 1
+
+    parts = _SEPARATOR.split(_WHITESPACE.sub(' ', text).strip(' -'))
+
+    # Profiles put the fandom (or 'Crossover - A & B') before the rating.
+    rated = [i for i, part in enumerate(parts) if part.startswith('Rated:')]
+    if rated and rated[0] > 0:
+        fandom = parts[:rated[0]]
+        if fandom[0] == 'Crossover' and len(fandom) > 1:
+            metadata['crossover'] = True
+            fandom = fandom[1:]
+        metadata['fandom'] = ' - '.join(fandom)
+        parts = parts[rated[0]:]
+
+    for part in parts:
+        field = _FIELD.match(part)
+
+        if field is not None:
+            key, value = field.group(1).lower(), field.group(2).strip()
+            if key == 'rated':
+                rating = _RATING.search(value)
+                metadata['rating'] = rating.group(1) if rating else value
+            elif key in COUNTS:
+                metadata[key] = int(value.replace(',', '') or 0)
+            elif key == 'status':
+                metadata['status'] = value
+            elif key == 'id':
+                metadata['id'] = value
+            # The dates are read from data-xutime instead of the text.
+
+        elif part == 'Complete':
+            metadata['status'] = 'Complete'
+        elif metadata['language'] is None:
+            # The language always comes first after the rating.
+            metadata['language'] = part
+        elif (not metadata['genres'] and not metadata['characters'] and
+              _GENRES.match(part)):
+            metadata['genres'] = _GENRE_NAMES.findall(part)
+        elif not metadata['characters']:
+            metadata['characters'], metadata['pairings'] = _characters(part)
+
+    return metadata
+
+
+def z_list_record(entry):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads the entry for a story in a ``z-list``, the format used for stories
+    on listing pages and for favorites on profiles.
+
+    :param entry: Tag containing <div class="z-list" ...>
+    :type entry: bs4.element.Tag class
+
+    :returns: Dictionary with the keys 'sid', 'aid', 'author', 'title',
+              'summary', 'published', 'updated', 'metadata' (parsed by
+              :func:`parse`) and, if the story has reviews, 'num_reviews'.
+              None if the entry has no story link.
+    :rtype: dict.
+
+    .. note:: The rating and genres are only in 'metadata'. The 'rating' and
+              'genre' keys of :func:`ffscraper.fanfic.story.scraper` are left
+              out, since a z-list does not show them in the same form as a
+              story page.
+    """
+
+    title = entry.find('a', {'class': 'stitle'}, href=True)
+    line = entry.find('div', {'class': 'z-padtop2'})
+    if title is None:
+        return None
+
+    author = None
+    for a in entry.find_all('a', href=True):
+        if a['href'].startswith('/u/'):
+            author = a
+            break
+
+    # The summary is the text of the indented div, before the metadata.
+    summary = ''
+    indent = entry.find('div', {'class': 'z-indent'})
+    if indent is not None:
+        summary = ''.join(indent.find_all(string=True, recursive=False))
+
+    # Like on a story page, the update time comes first if there is one.
+    timestamps = []
+    if line is not None:
+        timestamps = [t['data-xutime'] for t in
+                      line.find_all(attrs={'data-xutime': True})]
+
+    metadata = parse(line.text if line is not None else '')
+
+    record = {
+        'sid': title['href'].split('/')[2],
+        'aid': author['href'].split('/')[2] if author else None,
+        'author': author.text if author else None,
+        'title': title.text.strip(),
+        'summary': summary.strip(),
+        'updated': timestamps[0] if timestamps else None,
+        'published': timestamps[-1] if timestamps else None,
+        'metadata': metadata,
+    }
+    if metadata['fandom'] is not None:
+        record['fandom'] = metadata['fandom']
+    if metadata['reviews']:
+        record['num_reviews'] = metadata['reviews']
+
+    return record
+
+
+def _characters(part):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads the characters and bracketed pairings from a part of the line, e.g.
+    ``[Harry P., Hermione G.] Ron W.``
 
-import requests
-import time
+    :returns: Tuple of (characters, pairings).
+    :rtype: tuple
+    """
+    characters = []
+    pairings = []
+    for pairing, name in _CHARACTER.findall(part):
+        if pairing:
+            names = [n.strip() for n in pairing.split(',') if n.strip()]
+            pairings.append(names)
+            characters += names
+        elif name.strip():
+            characters.append(name.strip())
+    return characters, pairings
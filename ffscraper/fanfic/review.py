@@ -26,8 +26,13 @@ from __future__ import division
 
 from bs4 import BeautifulSoup as bs
 
-from ..utils import soupify
+from ..utils import _soup
+from ..utils import _text
+from ..utils import fetch
+from ..utils import scrape_many as _scrape_many
+from ..utils import Strainer
 
+import re
 import requests
 import time
 
@@ -41,6 +46,11 @@ def ReviewIDScraper(storyid, reviews_num, rate_limit=3):
     """
     pass
 
+# Only the review table (and the links to other pages of reviews, which are
+# in a <center>) need to be built from a page of reviews.
+_STRAINER = Strainer(lambda name, attrs: name in ('tbody', 'center'))
+
+
 def _review_chapter_and_timestamp(soup_tag):
     """
     .. versionadded:: 0.3.0
@@ -131,7 +141,274 @@ def _reviews_in_table(soup):
         yield (reviewer, chapter, timestamp, review_text)
 
 
-def scraper(storyid, reviews_num, rate_limit=3):
+def _url(storyid, page, chapter=0):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the address of a page of reviews on FanFiction.Net. Chapter 0
+    lists the reviews for every chapter.
+    """
+    return ('https://www.fanfiction.net/r/' + storyid + '/' + str(chapter) +
+            '/' + str(page) + '/')
+
+
+def _last_page(soup):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the number of pages of reviews, according to the links to the
+    other pages (e.g. /r/[sid]/0/7/ in the 'Last' link). Pages without
+    links are the only page.
+    """
+    pages = [1]
+    for center in soup.find_all('center'):
+        for link in center.find_all('a', href=True):
+            # ['', 'r', sid, chapter, page, '']
+            parts = link['href'].split('/')
+            if len(parts) > 4 and parts[1] == 'r' and parts[4].isdigit():
+                pages.append(int(parts[4]))
+    return max(pages)
+
+
+def _number_of_pages(reviews_num):
+    """
+    .. versionadded:: 0.3.0
+
+    There may be up to 15 reviews on a single page, therefore the number of
+    pages the reviews are stored on is equal to the following.
+    """
+    return (reviews_num // 15) + 1
+
+
+# Patterns for reading a page of reviews without building a soup.
+_TBODY = re.compile(r'<tbody\b[^>]*>(.*?)</tbody>', re.S)
+_TD = re.compile(r'<td\b[^>]*>(.*?)</td>', re.S)
+_USER = re.compile(r"""<a\b[^>]*href=['"]?/u/(\d+)/""")
+_SMALL = re.compile(r'<small\b[^>]*>(.*?)</small>', re.S)
+_XUTIME = re.compile(r"""data-xutime=['"]?(\d+)""")
+_REVIEW_TEXT = re.compile(
+    r"""<div style=['"]?margin-top:5px['"]?>(.*?)</div>""", re.S)
+_PAGE_LINK = re.compile(r"""<a\b[^>]*href=['"]?/r/\d+/\d+/(\d+)/""")
+
+
+def _reviews_in_html(html):
+    """
+    .. versionadded:: 0.3.0
+
+    Fast path for :func:`_reviews_in_table`: finds the same reviews by
+    scanning the html with precompiled regular expressions, without building
+    a soup.
+
+    :param html: The html of a page of reviews from FanFiction.Net
+    :type html: str.
+
+    :returns: A list of (reviewer, chapter, timestamp, review_text) tuples,
+              or None if the page does not look as expected (in which case
+              the soup should be used).
+    :rtype: list of tuples.
+    """
+
+    tbody = _TBODY.search(html)
+    if tbody is None:
+        return None
+
+    entries = _TD.findall(tbody.group(1))
+    if len(entries) != tbody.group(1).count('<td'):
+        return None
+
+    reviews = []
+    for entry in entries:
+        small = _SMALL.search(entry)
+        text = _REVIEW_TEXT.search(entry)
+        timestamp = _XUTIME.search(small.group(1)) if small else None
+        if not (small and text and timestamp):
+            return None
+
+        # Chapter is parsed exactly like _review_chapter_and_timestamp.
+        chapter = _text(small.group(1)).split('.')[0][:-1].strip('chapter ')
+        user = _USER.search(entry)
+
+        reviews.append((user.group(1) if user else 'Guest', chapter,
+                        timestamp.group(1), _text(text.group(1))))
+
+    return reviews
+
+
+def _reviews_on_page(html, fast=False):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the list of reviews on a page, using :func:`_reviews_in_html` if
+    ``fast`` (and if it succeeds), or :func:`_reviews_in_table` otherwise.
+    """
+    if fast:
+        reviews = _reviews_in_html(html)
+        if reviews is not None:
+            return reviews
+    return list(_reviews_in_table(_soup(html, parse_only=_STRAINER)))
+
+
+def _read_page(html, fast=False):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads a page of reviews and the number of pages there are.
+
+    :returns: Tuple of (list of reviews, number of pages).
+    :rtype: tuple
+    """
+    if fast:
+        reviews = _reviews_in_html(html)
+        if reviews is not None:
+            pages = [int(p) for p in _PAGE_LINK.findall(html)]
+            return reviews, max(pages or [1])
+    soup = _soup(html, parse_only=_STRAINER)
+    return list(_reviews_in_table(soup)), _last_page(soup)
+
+
+def stream(storyid, workers=4, rate_limit=3, fast=False, prefetch=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Scrapes the reviews for a story, yielding each one as soon as its page
+    (and every page before it) has arrived, so that the reviews of a story
+    with thousands of them never have to be held in memory at once.
+
+    The number of pages is read from the links on the first page, rather
+    than worked out from the number of reviews in the metadata. The other
+    pages are requested on a pool of threads, through the shared rate
+    limiter (see :func:`ffscraper.utils.fetch`).
+
+    :param storyid: Story-id number for a story on FanFiction.Net.
+    :type storyid: str.
+    :param workers: Number of pages requested at once.
+    :type workers: int.
+    :param rate_limit: Minimum number of seconds between requests, shared by
+                       all of the threads.
+    :type rate_limit: int.
+    :param fast: Read pages with regular expressions (see :func:`scraper`).
+    :type fast: bool.
+    :param prefetch: Most pages which are requested or held before the
+                     caller reads them (``2 * workers`` by default).
+    :type prefetch: int.
+
+    :returns: Generator of (reviewer, chapter, timestamp, review_text), in
+              the same order as :func:`scraper`.
+
+    .. code-block:: python
+
+                    from ffscraper.fanfic import review
+
+                    with open('reviews.tsv', 'w') as f:
+                        for r in review.stream('123', workers=4):
+                            f.write('\\t'.join(r[:3]) + '\\n')
+    """
+
+    def scrape(page):
+        html = fetch(_url(storyid, page), rate_limit=rate_limit)
+        return _read_page(html, fast=fast)[0]
+
+    first, number_of_pages = _read_page(
+        fetch(_url(storyid, 1), rate_limit=rate_limit), fast=fast)
+
+    for review in first:
+        yield review
+    del first
+
+    pages = _scrape_many(scrape, range(2, number_of_pages + 1),
+                         workers=workers, ordered=True, prefetch=prefetch)
+    try:
+        for page, reviews, error in pages:
+            if error is not None:
+                raise error
+            for review in reviews:
+                yield review
+    finally:
+        # If a page failed or the caller stopped early, start nothing new.
+        pages.close()
+
+
+def _chapter_reviews(chapter, storyid, rate_limit=3, fast=False):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns every review for one chapter of a story, as a list of
+    (reviewer, chapter, timestamp, review_text) with int chapter and
+    timestamp.
+    """
+    html = fetch(_url(storyid, 1, chapter), rate_limit=rate_limit)
+    reviews, number_of_pages = _read_page(html, fast=fast)
+
+    for page in range(2, number_of_pages + 1):
+        html = fetch(_url(storyid, page, chapter), rate_limit=rate_limit)
+        reviews += _read_page(html, fast=fast)[0]
+
+    return [(reviewer, int(chap), int(timestamp), text)
+            for reviewer, chap, timestamp, text in reviews]
+
+
+def by_chapter(storyid, chapters, latest=None, workers=4, rate_limit=3,
+               fast=False):
+    """
+    .. versionadded:: 0.3.0
+
+    Scrapes the reviews for some (or all) chapters of a story, grouped by
+    chapter. Each chapter has its own pages of reviews (at
+    https://www.fanfiction.net/r/[sid]/[chapter]/1/), which are requested for
+    several chapters at once on a pool of threads, through the shared rate
+    limiter.
+
+    :param storyid: Story-id number for a story on FanFiction.Net.
+    :type storyid: str.
+    :param chapters: Number of chapters in the story (e.g. ``chapters`` from
+                     the metadata), or a list of the chapters to scrape.
+    :type chapters: int or list of int.
+    :param latest: Only scrape the last ``latest`` of those chapters.
+    :type latest: int.
+    :param workers: Number of chapters scraped at once.
+    :type workers: int.
+    :param rate_limit: Minimum number of seconds between requests, shared by
+                       all of the threads.
+    :type rate_limit: int.
+    :param fast: Read pages with regular expressions (see :func:`scraper`).
+    :type fast: bool.
+
+    :returns: Dictionary mapping each chapter (int) to a list of its reviews,
+              newest first, as (reviewer, chapter, timestamp, review_text)
+              where chapter and timestamp are ints.
+    :rtype: dict.
+
+    .. code-block:: python
+
+                    from ffscraper.fanfic import review
+
+                    # Reviews of the last three chapters of a 20 chapter story.
+                    reviews = review.by_chapter('123', 20, latest=3)
+                    print(sorted(reviews))
+
+    .. code-block:: bash
+
+                    [18, 19, 20]
+    """
+
+    if isinstance(chapters, int):
+        chapters = range(1, chapters + 1)
+    chapters = sorted(int(c) for c in chapters)
+    if latest is not None:
+        chapters = chapters[-latest:] if latest > 0 else []
+
+    grouped = {}
+    for chapter, reviews, error in _scrape_many(
+            _chapter_reviews, chapters, workers=workers, storyid=storyid,
+            rate_limit=rate_limit, fast=fast):
+        if error is not None:
+            raise error
+        grouped[chapter] = reviews
+    return grouped
+
+
+def scraper(storyid, reviews_num, rate_limit=3, fast=False, known=0,
+            since=None):
     """
     Scrapes the reviews for a certain story.
 
@@ -139,9 +416,24 @@ def scraper(storyid, reviews_num, rate_limit=3):
     :type storyid: str.
     :param reviews_num: Number of reviews according to the metadata.
     :type reviews_num: int.
-    :param rate_limit: Number of seconds to wait at the start of function call
-                       in order to enforce scraper niceness.
+    :param rate_limit: Minimum number of seconds between requests, in order
+                       to enforce scraper niceness.
     :type rate_limit: int.
+    :param fast: Read pages with regular expressions instead of building a
+                 soup, falling back to BeautifulSoup if a page does not look
+                 as expected.
+    :type fast: bool.
+    :param known: Number of reviews which were already scraped (e.g. during
+                  the last crawl). Reviews are shown newest first, so only
+                  the pages holding the ``reviews_num - known`` newest
+                  reviews are requested, and only those are returned.
+    :type known: int.
+    :param since: (reviewer, timestamp) pairs of reviews which were already
+                  scraped, usually just the newest one. Pages are requested
+                  newest first, stopping at the first review in ``since``;
+                  only the reviews before it are returned. Unlike ``known``,
+                  this is not thrown off by reviews which were deleted.
+    :type since: iterable of tuples.
 
     :returns: A list of review tuples, where each tuple corresponds to:
               (reviewer, chapter, timestamp, review_text).
@@ -159,7 +451,8 @@ def scraper(storyid, reviews_num, rate_limit=3):
           https://www.fanfiction.net/r/[sid]/0/1/
         * /0/ represents all reviews for a story, /1/ is a page, and there are
           up to 15 reviews per page.
-        * Incrementing the 0 gives the reviews for a particular chapter.
+        * Incrementing the 0 gives the reviews for a particular chapter
+          (see :func:`by_chapter`).
 
     Page Layout:
         * Reviews are stored in an html table of up to 15 elements.
@@ -167,20 +460,44 @@ def scraper(storyid, reviews_num, rate_limit=3):
             (userid, chapter_reviewed, date, review_text)
     """
 
-    # There may be up to 15 reviews on a single page, therefore the number of
-    # pages the reviews  are stored on is equal to the following:
-    number_of_pages = (reviews_num // 15) + 1
-
     # Returns a list of tuples (based on the contents of _reviews_in_table)
     list_of_review_tuples = []
 
+    number_of_pages = _number_of_pages(reviews_num)
+
+    if since is not None:
+        seen = set((str(reviewer), str(timestamp))
+                   for reviewer, timestamp in since)
+
+        for p in range(number_of_pages):
+
+            html = fetch(_url(storyid, p+1), rate_limit=rate_limit)
+            reviews = _reviews_on_page(html, fast=fast)
+
+            for review in reviews:
+                if (review[0], review[2]) in seen:
+                    return list_of_review_tuples
+                list_of_review_tuples.append(review)
+
+            if not reviews:
+                break
+
+        return list_of_review_tuples
+
+    if known:
+        new = reviews_num - known
+        if new <= 0:
+            return list_of_review_tuples
+        number_of_pages = (new - 1) // 15 + 1
+
     for p in range(number_of_pages):
 
-        soup = soupify('https://www.fanfiction.net/r/' + storyid +
-                       '/0/' + str(p+1) + '/',
-                       rate_limit=rate_limit)
+        html = fetch(_url(storyid, p+1), rate_limit=rate_limit)
 
-        for review in _reviews_in_table(soup):
+        for review in _reviews_on_page(html, fast=fast):
             list_of_review_tuples.append(review)
 
+    if known:
+        # The end of the last page may hold reviews which were known.
+        return list_of_review_tuples[:reviews_num - known]
     return list_of_review_tuples
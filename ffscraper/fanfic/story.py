@@ -24,13 +24,88 @@
 from __future__ import print_function
 from __future__ import division
 
-from ..utils import soupify
+from ..utils import _soup
+from ..utils import _text
+from ..utils import fetch
+from ..utils import scrape_many as _scrape_many
+from ..utils import Strainer
+from . import metadata
 from . import review
 
 from bs4 import BeautifulSoup as bs
+from bs4 import Tag
+import re
 import time
 
 
+# Fields returned by scraper() by default, and those which must be asked for.
+DEFAULT_FIELDS = ('sid', 'aid', 'category', 'fandom', 'title', 'published',
+                  'updated', 'rating', 'genre', 'num_reviews')
+FIELDS = DEFAULT_FIELDS + ('abstract', 'story_text', 'metadata')
+
+# The part of a story page (by id) which holds each field. Anything not
+# listed is in the header of the story, #profile_top.
+_FIELD_PARTS = {
+    'sid': None,
+    'category': 'pre_story_links',
+    'fandom': 'pre_story_links',
+    'story_text': 'storytext',
+}
+
+
+def _story_parts(name, attrs, ids=('pre_story_links', 'profile_top')):
+    """
+    .. versionadded:: 0.3.0
+
+    Parts of a story page read by :func:`_story`: the category/fandom links,
+    the header of the story (title, author, abstract and metadata line) and
+    the 'Story Not Found' warning. Notably, the story text is skipped.
+
+    :param ids: The ids of the parts to keep, other than the warning.
+    :type ids: tuple.
+    """
+    return (attrs.get('id') in ids or
+            'gui_warning' in Strainer.classes(attrs))
+
+
+_STRAINER = Strainer(_story_parts)
+_STRAINERS = {}
+
+
+def _fields(fields):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns ``fields`` as a tuple, or :data:`DEFAULT_FIELDS` if it is None.
+
+    :raises ValueError: If one of the fields is not in :data:`FIELDS`.
+    """
+    if fields is None:
+        return DEFAULT_FIELDS
+
+    fields = tuple(fields)
+    unknown = [f for f in fields if f not in FIELDS]
+    if unknown:
+        raise ValueError('Unknown field(s): ' + ', '.join(unknown) +
+                         '. Choose from: ' + ', '.join(FIELDS))
+    return fields
+
+
+def _strainer(fields):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns a :class:`ffscraper.utils.Strainer` which only keeps the parts of
+    a story page holding ``fields``.
+    """
+    ids = tuple(sorted(set(_FIELD_PARTS.get(f, 'profile_top')
+                           for f in fields) - set([None])))
+    if ids not in _STRAINERS:
+        _STRAINERS[ids] = Strainer(
+            lambda name, attrs: _story_parts(name, attrs, ids))
+    return _STRAINERS[ids]
+
+
 def _category_and_fandom(soup):
     """
     .. versionadded:: 0.3.0
@@ -203,7 +278,7 @@ def _get_story_text(soup):
     return soup.find('div', {'id': 'storytext'}).text
 
 
-def scraper(storyid, rate_limit=3):
+def scraper(storyid, rate_limit=3, fast=False, fields=None):
     """
     .. versionadded:: 0.1.0
 
@@ -211,9 +286,20 @@ def scraper(storyid, rate_limit=3):
 
     :param storyid: Story-id number for a story on FanFiction.Net.
     :type uid: str.
-    :param rate_limit: Number of seconds to wait at the start of function call
-                       in order to enforce scraper niceness.
+    :param rate_limit: Minimum number of seconds between requests, in order
+                       to enforce scraper niceness.
     :type rate_limit: int.
+    :param fast: Read the page with regular expressions instead of building
+                 a soup (see :func:`_story_from_html`), falling back to
+                 BeautifulSoup if the page does not look as expected.
+    :type fast: bool.
+    :param fields: The keys to return, from :data:`FIELDS`. By default,
+                   :data:`DEFAULT_FIELDS`. 'abstract', 'story_text' and
+                   'metadata' (the metadata line, parsed by
+                   :func:`ffscraper.fanfic.metadata.parse`) are only
+                   returned if asked for. Parts of the page which do not hold
+                   any of the fields are not parsed.
+    :type fields: list of str.
     :returns: Dictionary of data and metadata for the story.
     :rtype: dict.
 
@@ -231,57 +317,312 @@ def scraper(storyid, rate_limit=3):
 
                     {'genre': 'Western', 'sid': '123', 'Reviewers':
                     ['12', '24'], 'rating': 'Rated: Fiction  K', 'aid': "241"}
+
+    Only parse what is needed:
+
+    .. code-block:: python
+
+                    story.scraper('123', fields=['aid', 'fandom', 'published'])
+
+    .. code-block:: bash
+
+                    {'aid': '241', 'fandom': 'Wicked', 'published': '12392811'}
+    """
+
+    fields = _fields(fields)
+
+    # Make a request to the site.
+    html = fetch(_url(storyid), rate_limit=rate_limit)
+
+    # The fast path does not read the abstract or the story text.
+    if fast and not set(fields) & set(['abstract', 'story_text']):
+        story = _story_from_html(html, storyid, fields)
+        if story is not None:
+            return story
+
+    # Create a BeautifulSoup instance for the html
+    return _story(_soup(html, parse_only=_strainer(fields)), storyid,
+                  fields=fields)
+
+
+def scrape_many(storyids, workers=4, rate_limit=3, fields=None):
     """
+    .. versionadded:: 0.3.0
 
-    # Make a request to the site, create a BeautifulSoup instance for the html
-    soup = soupify('https://www.fanfiction.net/s/' + storyid,
-                   rate_limit=rate_limit)
+    Scrapes many stories at once on a pool of threads. See
+    :func:`ffscraper.utils.scrape_many`.
+
+    :param storyids: Iterable of story-ids.
+    :type storyids: iterable of str.
+    :param workers: Number of threads.
+    :type workers: int.
+    :param rate_limit: Minimum number of seconds between requests, shared by
+                       all of the threads.
+    :type rate_limit: int.
+    :param fields: The keys to return for each story (see :func:`scraper`).
+    :type fields: list of str.
+
+    :returns: Generator of (storyid, story, error) in completion order, where
+              ``story`` is the dictionary from :func:`scraper` and ``error``
+              is an exception if scraping failed.
+
+    .. code-block:: python
+
+                    from ffscraper.fanfic import story
+
+                    for sid, s, error in story.scrape_many(sids, workers=8):
+                        if error is None:
+                            print(s['title'])
+    """
+    return _scrape_many(scraper, storyids, workers=workers,
+                        rate_limit=rate_limit, fields=fields)
+
+
+def _url(storyid):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the address of a story on FanFiction.Net.
+    """
+    return 'https://www.fanfiction.net/s/' + storyid
+
+
+def _story(soup, storyid, fields=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Parses the data and metadata for a story from the soup of its first page.
+    See :func:`scraper` for the contents of the dictionary. The soup only
+    needs to contain the parts matched by :func:`_story_parts`.
+
+    :param soup: Soup containing a story page from FanFiction.Net
+    :type soup: bs4.BeautifulSoup class
+    :param storyid: Story-id number for the story.
+    :type storyid: str.
+    :param fields: The keys to return (see :func:`scraper`).
+    :type fields: list of str.
+
+    :returns: Dictionary of data and metadata for the story.
+    :rtype: dict.
+    """
+
+    fields = _fields(fields)
+    found = _story_fields(soup, fields)
 
     # Check in case the fanfic does not exist
-    if not _not_empty_fanfic(soup):
+    if found['empty']:
         raise(Exception('Fanfic is empty.'))
-    else:
-        # Get the category and fandom information.
-        category, fandom = _category_and_fandom(soup)
-
-        # Get the metadata describing properties of the story.
-        # This should contain the metadata line (e.g. rating, genre, etc.)
-        metadata_html = soup.find('span', {'class': 'xgray xcontrast_txt'})
-        metadata = metadata_html.text.replace('Sci-Fi', 'SciFi')
-        metadata = [s.strip() for s in metadata.split('-')]
-
-        # Abstract and story have <div class='xcontrast_txt'>...</div>
-        abstract_and_story = soup.find_all('div', {'class': 'xcontrast_txt'})
-        abstract = abstract_and_story[0].text
-        story_text = abstract_and_story[1].text
-
-        when_published, when_updated = _timestamps(soup)
-
-        # There are several links on the page, the 2nd is a link to the author
-        # page. Get the second link href tag (which will look something like
-        # '/u/1838183/thisname')
-        authorid = soup.find_all('a', {'class':
-                                 'xcontrast_txt'})[2].get('href').split('/')[2]
-
-        story = {
-            'sid': storyid,
-            'aid': authorid,
-            'category': category,
-            'fandom': fandom,
-            'title': _title(soup),
-            'published': when_published,
-            'updated': when_updated,
-            'rating': metadata[0],
-            'genre': metadata[2]
-            # 'metadata': metadata,
-            # 'abstract': abstract,
-            # 'story_text': story_text
-        }
-
-        for m in metadata:
-            if 'Reviews' in m:
-                num_of_reviews = int(m.split()[1].replace(',', ''))
-
-                story['num_reviews'] = num_of_reviews
 
+    story = _story_dict(storyid, found['aid'], found['category'],
+                        found['fandom'], found['title'], found['published'],
+                        found['updated'], found['metadata'])
+    story['abstract'] = found['abstract']
+    story['story_text'] = found['story_text']
+
+    return _project(story, fields)
+
+
+def _project(story, fields):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the part of ``story`` holding ``fields``. Fields which are not on
+    the page (e.g. 'num_reviews' for a story without reviews) are left out.
+    """
+    return dict((f, story[f]) for f in fields if story.get(f) is not None)
+
+
+def _story_fields(soup, fields=FIELDS):
+    """
+    .. versionadded:: 0.3.0
+
+    Collects every field of a story page in a single walk over the soup,
+    rather than searching the whole tree once per field like
+    :func:`_category_and_fandom`, :func:`_timestamps`, :func:`_title`, etc.
+
+    :param soup: Soup containing a story page from FanFiction.Net
+    :type soup: bs4.BeautifulSoup class
+    :param fields: The fields which will be used. The text of the abstract
+                   and of the story are only read if they are included.
+    :type fields: tuple.
+
+    :returns: Dictionary with the keys 'empty' (True for a 'Story Not Found'
+              page), 'category', 'fandom', 'title', 'aid', 'metadata' (text
+              of the metadata line), 'published', 'updated', 'abstract' and
+              'story_text'. Fields which are not on the page (or not asked
+              for) are None.
+    :rtype: dict.
+    """
+
+    links = []
+    author_links = []
+    timestamps = []
+    found = {'title': None, 'metadata': None, 'abstract': None,
+             'story_text': None}
+    empty = False
+
+    # Depth-first, in document order. Each entry remembers whether the tag is
+    # inside #pre_story_links or inside the metadata line.
+    stack = [(soup, False, False)]
+    while stack:
+        tag, in_links, in_metadata = stack.pop()
+        name = tag.name
+        attrs = tag.attrs
+        classes = attrs.get('class') or ()
+
+        if name == 'a':
+            if in_links and 'href' in attrs:
+                links.append(tag)
+            if 'xcontrast_txt' in classes:
+                author_links.append(attrs.get('href'))
+        elif name == 'div':
+            if attrs.get('id') == 'pre_story_links':
+                in_links = True
+            elif attrs.get('id') == 'storytext':
+                # None of the other fields are inside the story text.
+                found['story_text'] = found['story_text'] or tag
+                continue
+            if 'xcontrast_txt' in classes:
+                found['abstract'] = found['abstract'] or tag
+        elif name == 'span':
+            if 'gui_warning' in classes:
+                empty = True
+            elif (found['metadata'] is None and
+                  ' '.join(classes) == 'xgray xcontrast_txt'):
+                found['metadata'] = tag
+                in_metadata = True
+        elif name == 'b' and 'xcontrast_txt' in classes:
+            found['title'] = found['title'] or tag
+
+        if in_metadata and 'data-xutime' in attrs:
+            timestamps.append(attrs['data-xutime'])
+
+        stack.extend((child, in_links, in_metadata)
+                     for child in reversed(tag.contents)
+                     if isinstance(child, Tag))
+
+    for key in ('abstract', 'story_text'):
+        if key not in fields:
+            found[key] = None
+
+    fields = dict((key, tag.text if tag is not None else None)
+                  for key, tag in found.items())
+    fields['empty'] = empty
+    fields['category'] = links[0].text if len(links) > 0 else None
+    fields['fandom'] = links[1].text if len(links) > 1 else None
+
+    # The first xcontrast_txt link to a user is to the author's page,
+    # something like '/u/1838183/thisname'.
+    fields['aid'] = None
+    for href in author_links:
+        if href and href.startswith('/u/'):
+            fields['aid'] = href.split('/')[2]
+            break
+
+    # Update time comes first, if there is one (see _timestamps).
+    fields['updated'] = timestamps[0] if timestamps else None
+    fields['published'] = timestamps[1] if len(timestamps) > 1 else \
+        fields['updated']
+
+    return fields
+
+
+def _story_dict(storyid, authorid, category, fandom, title, when_published,
+                when_updated, metadata_text):
+    """
+    .. versionadded:: 0.3.0
+
+    Builds the dictionary returned by :func:`scraper` from the pieces found
+    on a story page, however they were found.
+    """
+
+    story = {
+        'sid': storyid,
+        'aid': authorid,
+        'category': category,
+        'fandom': fandom,
+        'title': title,
+        'published': when_published,
+        'updated': when_updated,
+    }
+
+    # Without the header of the story (see _strainer), there is no metadata.
+    if metadata_text is None:
         return story
+
+    # 'rating' and 'genre' keep their original (unparsed) form, the typed
+    # fields are in 'metadata'.
+    parts = metadata_text.replace('Sci-Fi', 'SciFi')
+    parts = [s.strip() for s in parts.split('-')]
+
+    story['rating'] = parts[0]
+    story['genre'] = parts[2]
+    story['metadata'] = metadata.parse(metadata_text)
+
+    if story['metadata']['reviews']:
+        story['num_reviews'] = story['metadata']['reviews']
+
+    return story
+
+
+# Patterns for reading a story page without building a soup.
+_PRE_STORY_LINKS = re.compile(
+    r"""id=['"]?pre_story_links['"]?[^>]*>(.*?)</div>""", re.S)
+_PROFILE_TOP = re.compile(r"""id=['"]?profile_top['"]?""")
+_LINK_TEXT = re.compile(r'<a\b[^>]*>(.*?)</a>', re.S)
+_TITLE = re.compile(r"""<b class=['"]?xcontrast_txt['"]?>(.*?)</b>""", re.S)
+_AUTHOR = re.compile(r"""<a\b[^>]*href=['"]?/u/(\d+)/""")
+_METADATA = re.compile(
+    r"""<span class=['"]xgray xcontrast_txt['"]>(.*?)</span>\s*</div>""",
+    re.S)
+_XUTIME = re.compile(r"""data-xutime=['"]?(\d+)""")
+
+
+def _story_from_html(html, storyid, fields=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Fast path for :func:`_story`: finds the same fields by scanning the html
+    with precompiled regular expressions, without building a soup.
+
+    :param html: The html of a story page from FanFiction.Net
+    :type html: str.
+    :param storyid: Story-id number for the story.
+    :type storyid: str.
+    :param fields: The keys to return (see :func:`scraper`), other than
+                   'abstract' and 'story_text'.
+    :type fields: list of str.
+
+    :returns: The same dictionary as :func:`_story`, or None if the page does
+              not look as expected (in which case the soup should be used).
+    :rtype: dict.
+    """
+
+    # Leave missing stories to _story, which raises the usual exception.
+    if 'gui_warning' in html:
+        return None
+
+    links = _PRE_STORY_LINKS.search(html)
+    top = _PROFILE_TOP.search(html)
+    if links is None or top is None:
+        return None
+
+    links = _LINK_TEXT.findall(links.group(1))
+    title = _TITLE.search(html, top.end())
+    author = _AUTHOR.search(html, top.end())
+    metadata = _METADATA.search(html, top.end())
+    if len(links) < 2 or not (title and author and metadata):
+        return None
+
+    timestamps = _XUTIME.findall(metadata.group(1))
+    metadata_text = _text(metadata.group(1))
+    if len(timestamps) not in (1, 2) or metadata_text.count('-') < 2:
+        return None
+
+    # The update time comes first, if there is one (see _timestamps).
+    when_updated, when_published = timestamps[0], timestamps[-1]
+
+    story = _story_dict(storyid, author.group(1), _text(links[0]),
+                        _text(links[1]), _text(title.group(1)),
+                        when_published, when_updated, metadata_text)
+    return _project(story, _fields(fields))
@@ -0,0 +1,218 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
++-------------+------------------------------------------------------------+
+|   **Name**  |                     **Description**                        |
++-------------+------------------------------------------------------------+
+| frontier.py | What is left to crawl, kept on disk so a crawl can resume  |
++-------------+------------------------------------------------------------+
+
+Each story (or user) a crawl should visit is recorded with its state:
+
+* ``pending``: not visited yet
+* ``in-flight``: being scraped (or the process died while scraping it)
+* ``done``: scraped, along with whatever the crawl needs to remember about it
+* ``failed``: scraping it raised an exception
+
+When a frontier is installed, :func:`ffscraper.phases.phase1` and
+:func:`ffscraper.phases.phase3` skip everything which is already done, so a
+crawl that was interrupted resumes where it stopped when it is run again.
+
+.. code-block:: python
+
+                from ffscraper import frontier
+                from ffscraper.phases import phase1
+
+                frontier.set_frontier(frontier.Frontier('crawl.db'))
+
+                # If this is interrupted, running it again only scrapes the
+                # stories which are not done.
+                people, fandoms, timestamps = phase1(sids)
+
+Stories and users which are not done (including those which failed) are
+tried again. Adding an id which is already in the frontier does nothing, so
+to crawl everything again, start a new crawl with :meth:`Frontier.clear`:
+
+.. code-block:: python
+
+                frontier.get_frontier().clear('story')
+"""
+
+from __future__ import print_function
+
+import json
+import sqlite3
+import threading
+import time
+
+PENDING = 'pending'
+IN_FLIGHT = 'in-flight'
+DONE = 'done'
+FAILED = 'failed'
+
+
+class Frontier(object):
+    """
+    .. versionadded:: 0.3.0
+
+    The state of every story and user in a crawl, kept in a SQLite database.
+    Ids are grouped by ``kind`` (e.g. 'story' or 'user').
+
+    :param path: Path to the database (created if it does not exist).
+    :type path: str.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, timeout=60,
+                                     check_same_thread=False)
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS frontier '
+                               '(kind TEXT, id TEXT, state TEXT, '
+                               'attempts INTEGER, changed REAL, '
+                               'error TEXT, result TEXT, '
+                               'PRIMARY KEY (kind, id))')
+
+    def add(self, kind, ids):
+        """
+        Add ids to the frontier as pending, ignoring any which are already
+        in it.
+
+        :returns: The number of ids which were added.
+        :rtype: int.
+        """
+        now = self._clock()
+        with self._lock, self._conn:
+            before = self._conn.total_changes
+            self._conn.executemany(
+                'INSERT OR IGNORE INTO frontier VALUES '
+                '(?, ?, ?, 0, ?, NULL, NULL)',
+                ((kind, i, PENDING, now) for i in ids))
+            return self._conn.total_changes - before
+
+    def start(self, kind, i):
+        """
+        Mark ``i`` as being scraped.
+        """
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE frontier SET state=?, changed=?, '
+                               'attempts=attempts+1 WHERE kind=? AND id=?',
+                               (IN_FLIGHT, self._clock(), kind, i))
+
+    def done(self, kind, i, result=None):
+        """
+        Mark ``i`` as scraped, saving ``result`` (anything which can be
+        written as JSON) for :meth:`results`.
+        """
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE frontier SET state=?, changed=?, '
+                               'error=NULL, result=? WHERE kind=? AND id=?',
+                               (DONE, self._clock(), json.dumps(result),
+                                kind, i))
+
+    def fail(self, kind, i, error=None):
+        """
+        Mark ``i`` as failed, with a description of the error.
+        """
+        with self._lock, self._conn:
+            self._conn.execute('UPDATE frontier SET state=?, changed=?, '
+                               'error=? WHERE kind=? AND id=?',
+                               (FAILED, self._clock(),
+                                None if error is None else repr(error),
+                                kind, i))
+
+    def states(self, kind):
+        """
+        Returns a dictionary mapping each id of ``kind`` to its state.
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT id, state FROM frontier '
+                                      'WHERE kind=?', (kind,)).fetchall()
+        return dict(rows)
+
+    def remaining(self, kind, ids):
+        """
+        Returns the ids (in the order given) which are not done.
+        """
+        states = self.states(kind)
+        return [i for i in ids if states.get(i) != DONE]
+
+    def results(self, kind, ids=None):
+        """
+        Returns a dictionary mapping each id of ``kind`` which is done (and
+        in ``ids``, if given) to the result saved by :meth:`done`.
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT id, result FROM frontier '
+                                      'WHERE kind=? AND state=?',
+                                      (kind, DONE)).fetchall()
+        wanted = None if ids is None else set(ids)
+        return dict((i, json.loads(result)) for i, result in rows
+                    if wanted is None or i in wanted)
+
+    def clear(self, kind, ids=None):
+        """
+        Forget every id of ``kind`` (or only those in ``ids``), so that they
+        are scraped again the next time they are added.
+        """
+        with self._lock, self._conn:
+            if ids is None:
+                self._conn.execute('DELETE FROM frontier WHERE kind=?',
+                                   (kind,))
+            else:
+                self._conn.executemany(
+                    'DELETE FROM frontier WHERE kind=? AND id=?',
+                    ((kind, i) for i in ids))
+
+    def counts(self, kind):
+        """
+        Returns a dictionary mapping each state to the number of ids of
+        ``kind`` in it.
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT state, COUNT(*) FROM frontier '
+                                      'WHERE kind=? GROUP BY state', (kind,))
+            return dict(rows.fetchall())
+
+    def close(self):
+        self._conn.close()
+
+
+_frontier = None
+
+
+def set_frontier(frontier):
+    """
+    .. versionadded:: 0.3.0
+
+    Keep track of the crawl in ``frontier``.
+
+    :param frontier: A :class:`Frontier`, or None to stop.
+    """
+    global _frontier
+    _frontier = frontier
+
+
+def get_frontier():
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the installed frontier, or None.
+    """
+    return _frontier
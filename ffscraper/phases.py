@@ -27,6 +27,9 @@ from .author import profile
 from .fanfic import story
 from .fanfic import review
 from .format import format
+from .frontier import get_frontier
+from .store import get_store
+from .store import remember
 from . import storyid
 
 # Non-Standard Library Modules
@@ -57,14 +60,35 @@ log_handler.setFormatter(formatter)
 logger.addHandler(log_handler)
 logger.info('Started logger.')
 
+# What phase1 needs to know about a story to skip downloading it. Records
+# from listings and favorites (see ffscraper.fanfic.metadata.z_list_record)
+# have no 'rating' or 'genre', so only a story page can complete them.
+_PHASE1_FIELDS = ('sid', 'aid', 'fandom', 'published', 'updated', 'rating',
+                  'genre')
 
-def phase0(fandom, max_pages=float('inf'), rate_limit=3, log=False):
+
+def phase0(fandom, max_pages=float('inf'), rate_limit=3, log=False,
+           records=False, checkpoint=None, updated_since=None):
     """
     Scrape story-ids for a particular fandom.
 
     :param fandom: The identifier on FanFiction.Net pointing to a specific
                    community. e.g. '/book/Harry-Potter/'
     :type fandom: str.
+    :param records: Return everything the listing pages say about each story
+                    (see :func:`ffscraper.storyid.harvest`) instead of only
+                    the story-ids.
+    :type records: bool.
+    :param checkpoint: Save the story-ids on each page as it arrives, so an
+                       interrupted phase0 resumes where it stopped (see
+                       :mod:`ffscraper.storyid.checkpoint`). Checkpoints only
+                       hold story-ids, so they cannot be used with
+                       ``records``.
+    :type checkpoint: :class:`ffscraper.storyid.Checkpoint`
+    :param updated_since: Stop at the first story last updated before this
+                          time, for listings sorted by update time (see
+                          :func:`ffscraper.storyid.stream`).
+    :type updated_since: int.
 
     Example:
 
@@ -84,7 +108,8 @@ def phase0(fandom, max_pages=float('inf'), rate_limit=3, log=False):
             the 25 most recently-updated stories).
 
     General notes on how filters may be applied in order to tailor the stories
-    one is looking for:
+    one is looking for (e.g. ``phase0('/book/Coraline/?&srt=1&r=10')``, or see
+    :func:`ffscraper.storyid.query`):
 
     Sorting Methods
     ---------------
@@ -115,11 +140,18 @@ def phase0(fandom, max_pages=float('inf'), rate_limit=3, log=False):
 
     """
     url = 'https://www.fanfiction.net' + fandom
-    return storyid.scrape(url, max_pages=max_pages, rate_limit=rate_limit)
+    if records and checkpoint is not None:
+        raise ValueError('phase0 cannot checkpoint records, only story-ids')
+    if records:
+        return storyid.harvest(url, max_pages=max_pages, rate_limit=rate_limit,
+                               updated_since=updated_since)
+    return storyid.scrape(url, max_pages=max_pages, rate_limit=rate_limit,
+                          checkpoint=checkpoint, updated_since=updated_since)
 
 
 
-def phase1(sids, output_file='facts.txt', scrape_reviews=True, log=True):
+def phase1(sids, output_file='facts.txt', scrape_reviews=True, log=True,
+           incremental=False, rate_limit=2):
     """
     Scrape all stories with sids.
 
@@ -128,6 +160,23 @@ def phase1(sids, output_file='facts.txt', scrape_reviews=True, log=True):
     :param scrape_reviews: Scrape reviews for a story.
     :type scrape_reviews: bool
     :param verbose: Log to a file.
+    :param incremental: Skip stories which have not changed since they were
+                        last scraped. For the others, scrape the story page
+                        again but only their new reviews (see
+                        :func:`recrawl`). Needs a store.
+    :type incremental: bool
+    :param rate_limit: Minimum number of seconds between requests, in order
+                       to enforce scraper niceness.
+    :type rate_limit: int.
+
+    If a store was installed with :func:`ffscraper.store.set_store`, stories
+    which are already in it (e.g. seen in someone's favorites) are not
+    downloaded again, and every story which is downloaded is saved into it.
+
+    If a frontier was installed with :func:`ffscraper.frontier.set_frontier`,
+    stories which were done by an earlier run are not scraped again (what
+    they added to the people, fandoms and timestamps is read back from the
+    frontier instead), so an interrupted run resumes where it stopped.
 
     Example:
 
@@ -148,57 +197,112 @@ def phase1(sids, output_file='facts.txt', scrape_reviews=True, log=True):
         logger.info('====== Starting Phase I ======')
         logger.info('Beginning loop with ' + str(len(sids)) + ' stories.')
 
-    # Initialize lists for storing predicates and schema (write to disk).
-    predicates = []
-
     # These three will be returned for use in later phases.
     people = set()
     fandoms = set()
     timestamps = []
 
+    stories = get_store()
+    crawl = get_frontier()
+
+    if crawl is not None:
+        # Pick up what was learned from the stories done by an earlier run.
+        crawl.add('story', sids)
+        for result in crawl.results('story', sids).values():
+            people.update(result['people'])
+            fandoms.update(result['fandoms'])
+            for t in result['timestamps']:
+                heappush(timestamps, tuple(t))
+        sids = crawl.remaining('story', sids)
+        if log:
+            logger.info('Resuming with ' + str(len(sids)) + ' stories left.')
+
     for sid in tqdm(sids):
 
-        try:
-            if log:
-                logger.info('Scraping sid: ' + sid)
-            Story = story.scraper(sid, rate_limit=2)
-            if log:
-                logger.info('Finished sid: ' + sid)
-        except Exception:
+        # Number of reviews scraped during the last crawl, and the newest.
+        known = 0
+        newest = None
+
+        if incremental and stories is not None:
+            if not stories.changed(sid):
+                if log:
+                    logger.info('Unchanged since last crawl: ' + sid)
+                continue
+            last = stories.last_crawl(sid)
+            if last is not None:
+                known, newest = last['reviews'], last['newest']
+
+        if crawl is not None:
+            crawl.start('story', sid)
+
+        # What this story adds to the people, fandoms and timestamps, and
+        # the predicates for it (written to disk once it is finished).
+        story_people = []
+        story_timestamps = []
+        predicates = []
+
+        Story = stories.get(sid) if stories else None
+
+        # In an incremental crawl, only stories which changed get this far,
+        # and their story page is scraped again: the rating, genre or
+        # anything else on it may have changed as well.
+        if (not incremental and Story is not None and
+                all(k in Story for k in _PHASE1_FIELDS)):
             if log:
-                logger.error('fanfiction.net/s/' + sid, exc_info=True)
-            continue
+                logger.info('Found sid in store: ' + sid)
+        else:
+            try:
+                if log:
+                    logger.info('Scraping sid: ' + sid)
+                Story = story.scraper(sid, rate_limit=rate_limit)
+                remember([Story])
+                if log:
+                    logger.info('Finished sid: ' + sid)
+            except Exception as error:
+                if log:
+                    logger.error('fanfiction.net/s/' + sid, exc_info=True)
+                if crawl is not None:
+                    crawl.fail('story', sid, error)
+                continue
 
-        # Push the timestamps onto the heap.
-        heappush(timestamps,
-                 (int(Story['published']),
-                  'published'+sid))
-        heappush(timestamps,
-                 (int(Story['updated']),
-                  'lastupdated'+sid))
+        # Timestamps go onto the heap once the story is finished.
+        story_timestamps.append((int(Story['published']), 'published'+sid))
+        story_timestamps.append((int(Story['updated']), 'lastupdated'+sid))
 
-        # Add people and fandoms to the appropriate sets.
-        people.add(Story['aid'])
-        fandoms.add(Story['fandom'])
+        story_people.append(Story['aid'])
 
         if scrape_reviews and ('num_reviews' in Story):
             try:
                 if log:
                     logger.info('Scraping reviews: ' + sid)
+                # Stop at the newest review from the last crawl if it is
+                # known, otherwise count how many reviews are new.
                 reviews = review.scraper(sid, Story['num_reviews'],
-                                         rate_limit=2)
+                                         rate_limit=rate_limit,
+                                         known=0 if newest else known,
+                                         since=[newest] if newest else None)
                 if log:
                     logger.info('Finished reviews: ' + sid)
-            except Exception:
+            except Exception as error:
                 if log:
                     logger.error('Review: /s/' + sid, exc_info=True)
+                if crawl is not None:
+                    crawl.fail('story', sid, error)
+                # Keep what was learned from the story itself.
+                people.update(story_people)
+                fandoms.add(Story['fandom'])
+                for t in story_timestamps:
+                    heappush(timestamps, t)
                 continue
 
+            if reviews:
+                newest = (reviews[0][0], reviews[0][2])
+
             for entry in reviews:
                 # (reviewer, chapter, timestamp, review_text)
 
-                # Push the timestamp onto the heap
-                heappush(timestamps, (int(entry[2]), entry[0] + '_rev_' + sid))
+                story_timestamps.append((int(entry[2]),
+                                         entry[0] + '_rev_' + sid))
 
                 # Get the review text to evaluate sentiment.
                 review_text = TextBlob(entry[3])
@@ -207,8 +311,8 @@ def phase1(sids, output_file='facts.txt', scrape_reviews=True, log=True):
                                 str(review_text.sentiment))
 
                 if entry[0] != 'Guest':
-                    # Add the reviewer to the set of people.
-                    people.add(entry[0])
+                    # Add the reviewer to the people.
+                    story_people.append(entry[0])
                     predicates.append(format('reviewed', entry[0],
                                              Story['sid'],
                                              predicate=True)['predicate'])
@@ -224,6 +328,25 @@ def phase1(sids, output_file='facts.txt', scrape_reviews=True, log=True):
             for p in predicates:
                 f.write(p + '\n')
 
+        if stories is not None:
+            # Remember what the story looked like, for incremental crawls.
+            stories.mark_crawled(sid, Story['updated'],
+                                 Story.get('num_reviews', 0)
+                                 if scrape_reviews else known, newest)
+
+        # Add people, fandoms and timestamps to the appropriate sets.
+        people.update(story_people)
+        fandoms.add(Story['fandom'])
+        for t in story_timestamps:
+            heappush(timestamps, t)
+
+        if crawl is not None:
+            # Saved so that a resumed crawl can return them without
+            # scraping the story again.
+            crawl.done('story', sid, {'people': story_people,
+                                      'fandoms': [Story['fandom']],
+                                      'timestamps': story_timestamps})
+
     if log:
         logger.info('Encountered ' + str(len(fandoms)) + ' fandom(s).')
         logger.info('Fandom(s) found: ' + str(fandoms))
@@ -232,6 +355,62 @@ def phase1(sids, output_file='facts.txt', scrape_reviews=True, log=True):
     return people, fandoms, timestamps
 
 
+def recrawl(fandom, output_file='facts.txt', scrape_reviews=True,
+            max_pages=float('inf'), rate_limit=3, log=True):
+    """
+    .. versionadded:: 0.3.0
+
+    Crawl a fandom again, only scraping what changed since the last crawl.
+
+    The listing pages for the fandom (which already show when each story was
+    updated and how many reviews it has) are compared with the values saved
+    in the store when each story was last scraped by :func:`phase1`. Stories
+    which did not change are skipped; for the others, the story page and
+    only the pages holding new reviews are requested.
+
+    :param fandom: The identifier on FanFiction.Net pointing to a specific
+                   community. e.g. '/book/Harry-Potter/'
+    :type fandom: str.
+
+    :returns: Same as :func:`phase1`.
+
+    .. code-block:: python
+
+                    from ffscraper import store
+                    from ffscraper.phases import recrawl
+
+                    store.set_store(store.StoryStore('stories.db'))
+
+                    # The first crawl scrapes everything, later ones only
+                    # scrape what changed.
+                    people, fandoms, timestamps = recrawl('/book/Coraline/')
+    """
+
+    if get_store() is None:
+        raise RuntimeError('recrawl needs a store, see '
+                           'ffscraper.store.set_store')
+
+    # Saves the current update time and reviews of each story in the store.
+    records = phase0(fandom, max_pages=max_pages, rate_limit=rate_limit,
+                     records=True)
+
+    sids = [r['sid'] for r in records]
+    changed = [sid for sid in sids if get_store().changed(sid)]
+    if log:
+        logger.info('Re-crawl: ' + str(len(changed)) + ' of ' +
+                    str(len(sids)) + ' stories changed.')
+
+    # A frontier would skip the changed stories done by an earlier crawl.
+    # Stories finished by an interrupted recrawl are no longer changed, so
+    # running it again still resumes.
+    if get_frontier() is not None:
+        get_frontier().clear('story', changed)
+
+    return phase1(sids, output_file=output_file,
+                  scrape_reviews=scrape_reviews, log=log, incremental=True,
+                  rate_limit=rate_limit)
+
+
 def phase2(timestamps, log=False):
     """
     Order and process various timestamps.
@@ -269,12 +448,24 @@ def phase3(uids, sids, output_file='facts.txt', fandoms=[], log=True):
     :type uids: list of str.
     :param fandoms: list of fandoms (default: [])
     :type fandoms: list of str.
+
+    If a frontier was installed with :func:`ffscraper.frontier.set_frontier`,
+    profiles which were done by an earlier run are not scraped again.
     """
 
     if log:
         logger.info('====== Starting Phase III ======')
 
-    for uid in tqdm(uids):
+    crawl = get_frontier()
+    remaining = uids
+    if crawl is not None:
+        crawl.add('user', uids)
+        remaining = crawl.remaining('user', uids)
+
+    for uid in tqdm(remaining):
+
+        if crawl is not None:
+            crawl.start('user', uid)
 
         try:
             if log:
@@ -289,9 +480,11 @@ def phase3(uids, sids, output_file='facts.txt', fandoms=[], log=True):
 
             if log:
                 logger.info('Finished scraping uid: ' + uid)
-        except Exception:
+        except Exception as error:
             if log:
                 logger.error('fanfiction.net/u/' + uid, exc_info=True)
+            if crawl is not None:
+                crawl.fail('user', uid, error)
             continue
 
         # Initialize predicates for BoostSRL.
@@ -322,3 +515,6 @@ def phase3(uids, sids, output_file='facts.txt', fandoms=[], log=True):
         with open(output_file, 'a') as f:
             for p in predicates:
                 f.write(p + '\n')
+
+        if crawl is not None:
+            crawl.done('user', uid)
@@ -0,0 +1,263 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
++--------------+---------------------------------------------------------+
+|   **Name**   |                    **Description**                      |
++--------------+---------------------------------------------------------+
+| ratelimit.py | Token-bucket rate limiter shared between all scrapers.  |
++--------------+---------------------------------------------------------+
+
+Scrapers have historically taken a ``rate_limit`` argument: the number of
+seconds to sleep before each request. :func:`wait` keeps that meaning, but
+counts the time from one request to the next instead of sleeping a fixed
+amount on top of however long the last page took to download and parse.
+Calls with the same ``rate_limit`` share one bucket, so threads scraping
+side by side still respect the limit together.
+
+A single limiter can also be installed for every scraper at once, in which
+case the ``rate_limit`` arguments are ignored:
+
+.. code-block:: python
+
+                from ffscraper import ratelimit
+
+                # Two requests per second on average, bursts of up to five.
+                ratelimit.set_limiter(ratelimit.RateLimiter(2, capacity=5))
+
+Several processes (e.g. multiple ``python -m ffscraper -f`` workers) can draw
+from one budget by sharing a :class:`SharedRateLimiter`, which keeps the
+bucket in a SQLite file:
+
+.. code-block:: python
+
+                ratelimit.set_limiter(
+                    ratelimit.SharedRateLimiter('budget.db', 0.5))
+"""
+
+from __future__ import division
+
+import sqlite3
+import threading
+import time
+
+# Prefer a clock which cannot go backwards (Python 3).
+_clock = getattr(time, 'monotonic', time.time)
+
+
+class RateLimiter(object):
+    """
+    .. versionadded:: 0.3.0
+
+    Thread-safe token bucket.
+
+    Tokens are added at ``rate`` per second, up to ``capacity``. Each request
+    takes one token; if none are left, the caller waits until one would
+    have been added. Waiting callers are queued in the order they asked.
+
+    :param rate: Average number of requests per second.
+    :type rate: float.
+    :param capacity: Number of requests which may be made in a burst.
+    :type capacity: int.
+    """
+
+    def __init__(self, rate, capacity=1, clock=_clock, sleep=time.sleep):
+        if rate <= 0:
+            raise ValueError('rate must be positive.')
+        if capacity < 1:
+            raise ValueError('capacity must be at least 1.')
+
+        self.rate = rate
+        self.capacity = capacity
+        self._clock = clock
+        self._sleep = sleep
+        self._tokens = capacity
+        self._last = clock()
+        self._lock = threading.Lock()
+
+    def reserve(self, tokens=1):
+        """
+        Take ``tokens`` from the bucket without blocking.
+
+        :returns: Seconds the caller must wait before making the request.
+        :rtype: float.
+
+        Since this never blocks, it may also be used from asyncio code:
+
+        .. code-block:: python
+
+                        await asyncio.sleep(limiter.reserve())
+        """
+        with self._lock:
+            now = self._clock()
+            self._tokens, delay = self._take(tokens, self._tokens,
+                                             self._last, now)
+            self._last = now
+            return delay
+
+    def _take(self, tokens, available, last, now):
+        """
+        Refill a bucket holding ``available`` tokens at time ``last``, then
+        take ``tokens`` from it at time ``now``.
+
+        :returns: Tuple of the tokens left and the seconds to wait.
+        :rtype: tuple
+        """
+        available = min(self.capacity, available + (now - last) * self.rate)
+
+        # The bucket may go negative: later callers wait for the debt.
+        available -= tokens
+        if available >= 0:
+            return available, 0.0
+        return available, -available / self.rate
+
+    def acquire(self, tokens=1):
+        """
+        Block until ``tokens`` may be used.
+        """
+        delay = self.reserve(tokens)
+        if delay > 0:
+            self._sleep(delay)
+
+
+class SharedRateLimiter(RateLimiter):
+    """
+    .. versionadded:: 0.3.0
+
+    Token bucket stored in a SQLite database, so that every process using
+    the same ``path`` draws from one budget.
+
+    Every process should be started with the same ``rate`` and ``capacity``.
+    Wall-clock time is used, so processes on several machines sharing the
+    file should have synchronized clocks.
+
+    .. warning:: SQLite relies on file locking, which is unreliable on some
+                 network filesystems (notably older NFS setups).
+
+    :param path: Path to the SQLite database (created if it does not exist).
+    :type path: str.
+    :param rate: Average number of requests per second, over all processes.
+    :type rate: float.
+    :param capacity: Number of requests which may be made in a burst.
+    :type capacity: int.
+    :param name: Name of the bucket, allowing several budgets in one file.
+    :type name: str.
+    """
+
+    def __init__(self, path, rate, capacity=1, name='www.fanfiction.net',
+                 clock=time.time, sleep=time.sleep):
+        super(SharedRateLimiter, self).__init__(rate, capacity=capacity,
+                                                clock=clock, sleep=sleep)
+        self.path = path
+        self.name = name
+        self._local = threading.local()
+
+        self._connection().execute(
+            'CREATE TABLE IF NOT EXISTS bucket '
+            '(name TEXT PRIMARY KEY, tokens REAL, last REAL)')
+
+    def _connection(self):
+        """
+        SQLite connections cannot be shared between threads, so each thread
+        opens its own. Transactions are managed explicitly in reserve().
+        """
+        conn = getattr(self._local, 'conn', None)
+        if conn is None:
+            conn = sqlite3.connect(self.path, timeout=60,
+                                   isolation_level=None)
+            self._local.conn = conn
+        return conn
+
+    def reserve(self, tokens=1):
+        """
+        Take ``tokens`` from the shared bucket without blocking.
+
+        :returns: Seconds the caller must wait before making the request.
+        :rtype: float.
+        """
+        conn = self._connection()
+
+        # BEGIN IMMEDIATE takes the write lock before reading, so no other
+        # process can read the bucket between our read and our write.
+        conn.execute('BEGIN IMMEDIATE')
+        try:
+            now = self._clock()
+            row = conn.execute('SELECT tokens, last FROM bucket WHERE name=?',
+                               (self.name,)).fetchone()
+            available, last = row if row else (self.capacity, now)
+
+            available, delay = self._take(tokens, available, last, now)
+            conn.execute('INSERT OR REPLACE INTO bucket VALUES (?, ?, ?)',
+                         (self.name, available, now))
+            conn.execute('COMMIT')
+        except Exception:
+            conn.execute('ROLLBACK')
+            raise
+
+        return delay
+
+
+_limiter = None
+_defaults = {}
+_lock = threading.Lock()
+
+
+def set_limiter(limiter):
+    """
+    .. versionadded:: 0.3.0
+
+    Use ``limiter`` for every request, ignoring ``rate_limit`` arguments.
+
+    :param limiter: Object with ``reserve()`` and ``acquire()`` methods, or
+                    None to return to the per-``rate_limit`` defaults.
+    :type limiter: RateLimiter
+    """
+    global _limiter
+    _limiter = limiter
+
+
+def get_limiter(rate_limit=3):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the installed limiter, or the shared limiter which allows one
+    request every ``rate_limit`` seconds.
+
+    :returns: A limiter, or None if ``rate_limit`` is zero.
+    """
+    if _limiter is not None:
+        return _limiter
+    if rate_limit <= 0:
+        return None
+
+    with _lock:
+        if rate_limit not in _defaults:
+            _defaults[rate_limit] = RateLimiter(1 / rate_limit)
+        return _defaults[rate_limit]
+
+
+def wait(rate_limit=3):
+    """
+    .. versionadded:: 0.3.0
+
+    Block until the next request may be made.
+
+    :param rate_limit: Minimum number of seconds between requests (only used
+                       when no limiter was installed with :func:`set_limiter`)
+    :type rate_limit: int.
+    """
+    limiter = get_limiter(rate_limit)
+    if limiter is not None:
+        limiter.acquire()
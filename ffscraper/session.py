@@ -0,0 +1,172 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
++-------------+-----------------------------------------------------------+
+|   **Name**  |                     **Description**                       |
++-------------+-----------------------------------------------------------+
+|  session.py | Shared HTTP session (connection pooling, keep-alive, etc.) |
++-------------+-----------------------------------------------------------+
+
+Every scraper in ffscraper goes through :func:`ffscraper.utils.soupify`,
+which asks this module for the session to make requests with. Reusing one
+``requests.Session`` means that connections to FanFiction.Net are kept alive
+and pooled, rather than paying for a new TCP+TLS handshake on every page.
+
+.. code-block:: python
+
+                from ffscraper import session
+
+                # Larger pools and a shorter timeout for a threaded crawl.
+                session.configure(pool_maxsize=32, timeout=10)
+
+Any object with a ``get(url, timeout=...)`` method returning something with
+a ``.text`` attribute and a ``raise_for_status()`` method may be swapped in,
+which is convenient for tests:
+
+.. code-block:: python
+
+                class LocalTransport(object):
+                    def get(self, url, timeout=None):
+                        ...
+
+                session.set_session(LocalTransport())
+"""
+
+from __future__ import print_function
+
+import threading
+
+import requests
+from requests.adapters import HTTPAdapter
+
+# Seconds to wait for the server before giving up on a request.
+DEFAULT_TIMEOUT = 30
+
+_session = None
+_timeout = DEFAULT_TIMEOUT
+_lock = threading.Lock()
+
+
+def new_session(pool_connections=4, pool_maxsize=16, max_retries=2,
+                keep_alive=True, headers=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Build a ``requests.Session`` with a pooled connection adapter.
+
+    :param pool_connections: Number of hosts to keep connection pools for.
+    :type pool_connections: int.
+    :param pool_maxsize: Maximum number of open connections per host. Threads
+                         asking for more than this block until one is freed.
+    :type pool_maxsize: int.
+    :param max_retries: Retries for failed connections (not failed responses).
+    :type max_retries: int.
+    :param keep_alive: If False, send ``Connection: close`` on every request.
+    :type keep_alive: bool.
+    :param headers: Optional headers added to every request.
+    :type headers: dict.
+
+    :returns: A configured session.
+    :rtype: requests.Session
+    """
+
+    session = requests.Session()
+
+    adapter = HTTPAdapter(pool_connections=pool_connections,
+                          pool_maxsize=pool_maxsize,
+                          max_retries=max_retries,
+                          pool_block=True)
+    session.mount('https://', adapter)
+    session.mount('http://', adapter)
+
+    if not keep_alive:
+        session.headers['Connection'] = 'close'
+    if headers:
+        session.headers.update(headers)
+
+    return session
+
+
+def configure(timeout=DEFAULT_TIMEOUT, **kwargs):
+    """
+    .. versionadded:: 0.3.0
+
+    Replace the shared session with a new one. Keyword arguments are passed
+    on to :func:`new_session`.
+
+    :param timeout: Seconds to wait for the server on each request.
+    :type timeout: float.
+    """
+    set_session(new_session(**kwargs), timeout=timeout)
+
+
+def set_session(session, timeout=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Use ``session`` for all future requests made by the scrapers.
+
+    :param session: A ``requests.Session``, or any object with a compatible
+                    ``get(url, timeout=...)`` method. ``None`` resets to a
+                    default session on the next request.
+    :param timeout: Seconds to wait for the server on each request. If None,
+                    the current timeout is kept.
+    :type timeout: float.
+    """
+    global _session, _timeout
+
+    with _lock:
+        _session = session
+        if timeout is not None:
+            _timeout = timeout
+
+
+def get_session():
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the shared session, creating a default one on first use.
+    """
+    global _session
+
+    with _lock:
+        if _session is None:
+            _session = new_session()
+        return _session
+
+
+def get(url, session=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Download the text at ``url`` with the shared session (or ``session``, if
+    one is given).
+
+    :param url: A url to a web address.
+    :type url: str.
+
+    :returns: The body of the response.
+    :rtype: str.
+
+    :raises requests.HTTPError: If the server answered with an error (such as
+                                404, 429 or 503), so that error pages are
+                                never cached or archived.
+    """
+    if session is None:
+        session = get_session()
+    response = session.get(url, timeout=_timeout)
+    response.raise_for_status()
+    return response.text
@@ -0,0 +1,219 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
++-------------+------------------------------------------------------------+
+|   **Name**  |                     **Description**                        |
++-------------+------------------------------------------------------------+
+|   store.py  | Local store of everything seen about each story            |
++-------------+------------------------------------------------------------+
+
+The same story shows up in many places: on its own page, on listing pages,
+and in the favorites of everyone who liked it. When a store is installed,
+each of those scrapers records what it saw, so that later stages (e.g.
+:func:`ffscraper.phases.phase1`) can look a story up instead of downloading
+its page again.
+
+.. code-block:: python
+
+                from ffscraper import store
+
+                store.set_store(store.StoryStore('stories.db'))
+
+                # Favorites on profiles are now remembered...
+                profile.scraper('123')
+
+                # ...and can be looked up later.
+                print(store.get_store().get('456'))
+
+Records are dictionaries like those returned by
+:func:`ffscraper.fanfic.story.scraper`. Saving a record for a story which is
+already in the store adds to (and overrides) what was known about it.
+"""
+
+from __future__ import print_function
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class StoryStore(object):
+    """
+    .. versionadded:: 0.3.0
+
+    Story records kept in a SQLite database.
+
+    :param path: Path to the database (created if it does not exist).
+    :type path: str.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, timeout=60,
+                                     check_same_thread=False)
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS stories '
+                               '(sid TEXT PRIMARY KEY, updated INTEGER, '
+                               'seen REAL, record TEXT)')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS crawls '
+                               '(sid TEXT PRIMARY KEY, updated INTEGER, '
+                               'reviews INTEGER, newest TEXT, '
+                               'crawled REAL)')
+            # Stores from before 'newest' was kept have no such column.
+            columns = [c[1] for c in
+                       self._conn.execute('PRAGMA table_info(crawls)')]
+            if 'newest' not in columns:
+                self._conn.execute('ALTER TABLE crawls ADD COLUMN newest TEXT')
+
+    def get(self, sid):
+        """
+        Returns everything known about the story ``sid``, or None.
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT record FROM stories WHERE sid=?',
+                                     (sid,)).fetchone()
+        return json.loads(row[0]) if row else None
+
+    def put(self, record):
+        """
+        Save a record (which must have a 'sid').
+        """
+        self.put_many([record])
+
+    def put_many(self, records):
+        """
+        Save many records at once, in a single transaction.
+        """
+        now = self._clock()
+
+        with self._lock, self._conn:
+            for record in records:
+                row = self._conn.execute('SELECT record FROM stories '
+                                         'WHERE sid=?',
+                                         (record['sid'],)).fetchone()
+                merged = json.loads(row[0]) if row else {}
+                merged.update((k, v) for k, v in record.items()
+                              if v is not None)
+
+                updated = merged.get('updated')
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO stories VALUES (?, ?, ?, ?)',
+                    (merged['sid'], int(updated) if updated else None, now,
+                     json.dumps(merged, sort_keys=True)))
+
+    def mark_crawled(self, sid, updated, reviews, newest=None):
+        """
+        Remember that the story ``sid`` (with its reviews) was scraped, when
+        it was last updated at ``updated`` and had ``reviews`` reviews.
+        ``newest`` is the (reviewer, timestamp) of its newest review.
+        """
+        with self._lock, self._conn:
+            self._conn.execute(
+                'INSERT OR REPLACE INTO crawls (sid, updated, reviews, '
+                'newest, crawled) VALUES (?, ?, ?, ?, ?)',
+                (sid, int(updated), int(reviews),
+                 json.dumps(list(newest)) if newest else None,
+                 self._clock()))
+
+    def last_crawl(self, sid):
+        """
+        Returns what the story ``sid`` looked like the last time it was
+        scraped: a dictionary with the keys 'updated', 'reviews' and 'newest'
+        (a (reviewer, timestamp) tuple, or None), or None if it was never
+        scraped.
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT updated, reviews, newest '
+                                     'FROM crawls WHERE sid=?',
+                                     (sid,)).fetchone()
+        if row is None:
+            return None
+        return {'updated': row[0], 'reviews': row[1],
+                'newest': tuple(json.loads(row[2])) if row[2] else None}
+
+    def changed(self, sid):
+        """
+        True if the story ``sid`` was never scraped, or if what is known about
+        it now (e.g. from a listing page) has a different update time or
+        number of reviews than when it was last scraped.
+        """
+        last = self.last_crawl(sid)
+        record = self.get(sid)
+        if last is None or record is None:
+            return True
+        return (int(record.get('updated') or 0) != last['updated'] or
+                int(record.get('num_reviews', 0)) != last['reviews'])
+
+    def sids(self):
+        """
+        Returns the story-id of every story in the store.
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT sid FROM stories')
+            return [r[0] for r in rows]
+
+    def close(self):
+        self._conn.close()
+
+    def __contains__(self, sid):
+        with self._lock:
+            return self._conn.execute('SELECT 1 FROM stories WHERE sid=?',
+                                      (sid,)).fetchone() is not None
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM stories').fetchone()[0]
+
+
+_store = None
+
+
+def set_store(store):
+    """
+    .. versionadded:: 0.3.0
+
+    Record the stories seen by the scrapers into ``store``.
+
+    :param store: A :class:`StoryStore`, or None to stop.
+    """
+    global _store
+    _store = store
+
+
+def get_store():
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the installed store, or None.
+    """
+    return _store
+
+
+def remember(records):
+    """
+    .. versionadded:: 0.3.0
+
+    Save ``records`` into the installed store, if there is one.
+
+    :param records: Iterable of story records.
+    """
+    if _store is not None:
+        _store.put_many(records)
@@ -19,9 +19,49 @@ Scrape the story-ids based on an input url.
 
 from __future__ import print_function
 
+from .checkpoint import Checkpoint
+from ..fanfic import metadata
+from ..store import remember
+from ..utils import _soup
+from ..utils import fetch
+from ..utils import scrape_many
 from ..utils import soupify
+from ..utils import Strainer
 from tqdm import tqdm
 
+import re
+
+try:
+    from urllib.parse import parse_qsl, urlsplit
+except ImportError:
+    from urlparse import parse_qsl, urlsplit
+
+
+def _listing_parts(name, attrs):
+    """
+    Parts of a listing page read by :func:`_get_sids` and
+    :func:`_number_of_pages`: links to stories and the pagination.
+    """
+    return name == 'center' or (name == 'a' and
+                                'stitle' in Strainer.classes(attrs))
+
+
+_STRAINER = Strainer(_listing_parts)
+
+
+def _record_parts(name, attrs):
+    """
+    .. versionadded:: 0.3.0
+
+    Parts of a listing page read by :func:`_records`: the entry for each
+    story, and the pagination.
+    """
+    return name == 'center' or (name == 'div' and
+                                'z-list' in Strainer.classes(attrs))
+
+
+_RECORD_STRAINER = Strainer(_record_parts)
+
 
 def _get_sids(soup):
     """
@@ -46,6 +86,25 @@ def _get_sids(soup):
     return sids
 
 
+def _records(soup):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads the entry for each story on a listing page.
+
+    :param soup: Soup containing a listing page from FanFiction.Net
+    :type soup: bs4.BeautifulSoup class
+
+    :returns: A list of up to 25 dictionaries, one per story (see
+              :func:`ffscraper.fanfic.metadata.z_list_record`).
+    :rtype: list of dicts.
+    """
+
+    records = [metadata.z_list_record(entry) for entry in
+               soup.find_all('div', {'class': 'z-list'})]
+    return [r for r in records if r is not None]
+
+
 def _number_of_pages(soup):
     """
     There are two center tags at the top and bottom of each page, containing
@@ -66,20 +125,360 @@ def _number_of_pages(soup):
     return number_of_pages
 
 
-def scrape(url, rate_limit=3, max_pages=float('inf')):
+# Patterns for reading a listing page without building a soup.
+_STITLE = re.compile(r"""<a\s+class=['"]?stitle['"]?\s+href=['"]?/s/(\d+)/""")
+_ANY_STITLE = re.compile(r"""<a\b[^>]*\bstitle\b""")
+_LAST = re.compile(r"""<a href=['"]([^'"]*)['"]>Last</a>""")
+
+
+def _sids_from_html(html):
+    """
+    .. versionadded:: 0.3.0
+
+    Fast path for :func:`_get_sids` and :func:`_number_of_pages`: scans the
+    html with precompiled regular expressions, without building a soup.
+
+    :returns: Tuple of (list of story-ids, number of pages), or None if the
+              page does not look as expected (in which case the soup should
+              be used).
+    :rtype: tuple
+    """
+
+    sids = _STITLE.findall(html)
+    if len(sids) != len(_ANY_STITLE.findall(html)):
+        return None
+
+    last = _LAST.search(html)
+    number_of_pages = int(last.group(1).split('=')[-1]) if last else 0
+
+    return sids, number_of_pages
+
+
+def _read_listing(html, fast=False):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns a tuple of (list of story-ids, number of pages) for the html of a
+    listing page, using :func:`_sids_from_html` if ``fast`` (and if it
+    succeeds), or the soup otherwise.
+    """
+    if fast:
+        listing = _sids_from_html(html)
+        if listing is not None:
+            return listing
+
+    soup = _soup(html, parse_only=_STRAINER)
+    return _get_sids(soup), _number_of_pages(soup)
+
+
+# Filters for listing pages, as documented in ffscraper.phases.phase0.
+SORTS = {'updated': 1, 'published': 2, 'reviews': 3, 'favorites': 4,
+         'follows': 5}
+RATINGS = {'all': 10, 'K-T': 103, 'K-K+': 102, 'K': 1, 'K+': 2, 'T': 3,
+           'M': 4}
+STATUSES = {'in-progress': 1, 'complete': 2}
+LANGUAGES = {'English': 1}
+
+
+def query(fandom, sort=None, rating=None, status=None, language=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Builds the address of a filtered listing for a fandom.
+
+    :param fandom: The identifier on FanFiction.Net pointing to a specific
+                   community, e.g. '/book/Harry-Potter/' (or a full url).
+    :type fandom: str.
+    :param sort: One of :data:`SORTS`, e.g. 'updated' (most recent first).
+    :type sort: str.
+    :param rating: One of :data:`RATINGS`, e.g. 'K-T' or 'M'.
+    :type rating: str.
+    :param status: 'in-progress' or 'complete'.
+    :type status: str.
+    :param language: One of :data:`LANGUAGES`, e.g. 'English'.
+    :type language: str.
+
+    :returns: The url, to pass to :func:`scrape` or :func:`stream`.
+    :rtype: str.
+    :raises ValueError: If a filter has an unknown value.
+
+    .. code-block:: python
+
+                    from ffscraper import storyid
+
+                    print(storyid.query('/book/Coraline/', sort='updated',
+                                        rating='all', language='English'))
+
+    .. code-block:: bash
+
+                    https://www.fanfiction.net/book/Coraline/?&srt=1&r=10&lan=1
+    """
+
+    url = fandom
+    if not url.startswith('http'):
+        url = 'https://www.fanfiction.net' + fandom
+
+    filters = ''
+    for key, value, choices in (('srt', sort, SORTS),
+                                ('r', rating, RATINGS),
+                                ('s', status, STATUSES),
+                                ('lan', language, LANGUAGES)):
+        if value is None:
+            continue
+        if value not in choices:
+            raise ValueError('Unknown value {0!r}, expected one of: {1}'
+                             .format(value, ', '.join(sorted(choices))))
+        filters += '&' + key + '=' + str(choices[value])
+
+    return url + ('?' + filters if filters else '')
+
+
+def _sorted_by_update(url):
+    """
+    .. versionadded:: 0.3.0
+
+    True if the listing at ``url`` shows the most recently updated stories
+    first (which is also the order when no sort is given).
+    """
+    return dict(parse_qsl(urlsplit(url).query)).get('srt', '1') == '1'
+
+
+def _updates_on_page(html):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads the story-id and update time of each story on a listing page.
+
+    :returns: Tuple of (list of (story-id, update time as an int), number of
+              pages).
+    :rtype: tuple
+    """
+    soup = _soup(html, parse_only=_RECORD_STRAINER)
+    updates = [(r['sid'], int(r['updated'] or 0)) for r in _records(soup)]
+    return updates, _number_of_pages(soup)
+
+
+def _page_url(url, page):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the address of a page of the listing at ``url``, keeping any
+    filters already in it (e.g. ``?&srt=1&r=10``).
+    """
+    return url + ('&' if '?' in url else '?&') + 'p=' + str(page)
+
+
+def harvest(url, rate_limit=3, max_pages=float('inf'), updated_since=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Like :func:`scrape`, but returns everything a listing page says about
+    each story (title, author, summary, timestamps and the metadata line)
+    rather than only its story-id. When only the metadata is needed, this
+    saves downloading every story page: one listing page covers 25 stories.
+
+    :param url: Url for a page on FanFiction.Net
+    :type url: str.
+    :param rate_limit: Minimum number of seconds between requests, in order
+                       to enforce scraper niceness.
+    :type rate_limit: int.
+    :param max_pages: Optional upper limit to the number of pages scraped.
+    :type max_pages: (int.)
+    :param updated_since: Stop at the first story which was last updated
+                          before this time, for listings sorted by update
+                          time (see :func:`stream`).
+    :type updated_since: int.
+
+    :returns: A list of dictionaries, one per story (see :func:`_records`).
+              If a store was installed with :func:`ffscraper.store.set_store`,
+              they are also saved into it.
+    :rtype: list of dicts.
+    :raises ValueError: If ``updated_since`` is given for a listing which is
+                        not sorted by update time.
+
+    .. code-block:: python
+
+                    from ffscraper import storyid
+
+                    url = 'https://www.fanfiction.net/book/Coraline/'
+                    for story in storyid.harvest(url, max_pages=2):
+                        print(story['sid'], story['metadata']['words'])
+    """
+
+    if updated_since is not None and not _sorted_by_update(url):
+        raise ValueError('updated_since needs a listing sorted by update '
+                         'time (srt=1): ' + url)
+
+    def recent(page_records):
+        # The records before the first one updated before the cutoff.
+        if updated_since is None:
+            return page_records
+        for i, record in enumerate(page_records):
+            if int(record['updated'] or 0) < updated_since:
+                return page_records[:i]
+        return page_records
+
+    soup = soupify(url, rate_limit=rate_limit, parse_only=_RECORD_STRAINER)
+    number_of_pages = min(_number_of_pages(soup), max_pages)
+
+    # The first page is already here, so start with the second.
+    page_records = _records(soup)
+    records = recent(page_records)
+    remember(records)
+    if len(records) < len(page_records):
+        return records
+
+    for page in tqdm(range(2, number_of_pages + 1)):
+        page_records = _records(soupify(_page_url(url, page),
+                                        rate_limit=rate_limit,
+                                        parse_only=_RECORD_STRAINER))
+        kept = recent(page_records)
+        remember(kept)
+        records += kept
+        if len(kept) < len(page_records):
+            break
+
+    return records
+
+
+def stream(url, workers=4, rate_limit=3, max_pages=float('inf'), fast=False,
+           checkpoint=None, updated_since=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Like :func:`scrape`, but yields the story-ids page by page as the pages
+    arrive, requesting several pages at once on a pool of threads. Every
+    thread goes through the shared rate limiter, so a large fandom takes as
+    long as the rate limit allows rather than one round trip per page.
+
+    :param url: Url for a page on FanFiction.Net
+    :type url: str.
+    :param workers: Number of pages requested at once.
+    :type workers: int.
+    :param rate_limit: Minimum number of seconds between requests, shared by
+                       all of the threads.
+    :type rate_limit: int.
+    :param max_pages: Optional upper limit to the number of pages scraped.
+    :type max_pages: (int.)
+    :param fast: Read pages with regular expressions (see :func:`scrape`).
+    :type fast: bool.
+    :param checkpoint: Save each page as it arrives, and do not request the
+                       pages which were saved by an earlier call.
+    :type checkpoint: :class:`ffscraper.storyid.checkpoint.Checkpoint`
+    :param updated_since: Stop at the first story which was last updated
+                          before this time (in seconds since the epoch).
+                          Only for listings sorted by update time (see
+                          :func:`query`), where every later story is older.
+                          Pages which were already requested by the pool may
+                          go unused, so keep ``workers`` low.
+    :type updated_since: int.
+
+    :returns: Generator of story-ids, in the order of the pages.
+    :raises ValueError: If ``updated_since`` is given for a listing which is
+                        not sorted by update time, or with a checkpoint.
+
+    .. code-block:: python
+
+                    from ffscraper import storyid
+
+                    url = 'https://www.fanfiction.net/book/Harry-Potter/'
+                    for sid in storyid.stream(url, workers=8, rate_limit=1):
+                        print(sid)
+    """
+
+    if updated_since is None:
+        def read(html):
+            return _read_listing(html, fast=fast)
+    elif not _sorted_by_update(url):
+        raise ValueError('updated_since needs a listing sorted by update '
+                         'time (srt=1): ' + url)
+    elif checkpoint is not None:
+        # Saved pages only hold story-ids, not update times.
+        raise ValueError('updated_since cannot be used with a checkpoint')
+    else:
+        read = _updates_on_page
+
+    saved, number_of_pages = {}, None
+    if checkpoint is not None:
+        saved = checkpoint.pages(url)
+        number_of_pages = checkpoint.number_of_pages(url)
+
+    if 1 in saved and number_of_pages is not None:
+        first_page = saved[1]
+    else:
+        first_page, number_of_pages = read(fetch(url, rate_limit=rate_limit))
+        if checkpoint is not None:
+            checkpoint.save(url, 1, first_page, number_of_pages)
+    number_of_pages = min(number_of_pages, max_pages)
+
+    pages = range(2, int(number_of_pages) + 1)
+
+    def scrape_page(page):
+        return read(fetch(_page_url(url, page), rate_limit=rate_limit))[0]
+
+    def listing():
+        # The first page is already here, so only the others are requested.
+        yield first_page
+
+        fetched = scrape_many(scrape_page,
+                              [p for p in pages if p not in saved],
+                              workers=workers, ordered=True)
+        try:
+            for page in tqdm(pages):
+                if page in saved:
+                    entries = saved[page]
+                else:
+                    _, entries, error = next(fetched)
+                    if error is not None:
+                        raise error
+                    if checkpoint is not None:
+                        checkpoint.save(url, page, entries)
+                yield entries
+        finally:
+            # If a page failed or the caller stopped early, start nothing new.
+            fetched.close()
+
+    entries = listing()
+    try:
+        for page in entries:
+            for entry in page:
+                if updated_since is not None:
+                    entry, updated = entry
+                    if updated < updated_since:
+                        return
+                yield entry
+    finally:
+        entries.close()
+
+
+def scrape(url, rate_limit=3, max_pages=float('inf'), fast=False,
+           workers=4, checkpoint=None, updated_since=None):
     """
     Scrape all story-ids beginning at a url.
 
     :param url: Url for a page on FanFiction.Net
     :type url: str.
-    :param rate_limit: Number of seconds to wait at the start of function call
-                       in order to enforce scraper niceness.
+    :param rate_limit: Minimum number of seconds between requests, in order
+                       to enforce scraper niceness.
     :type rate_limit: int.
 
     :param max_pages: Optional upper limit to the number of pages scraped.
                       This may be useful in cases where there a large number of
                       stories associated with a fandom.
     :type max_pages: (int.)
+    :param fast: Read pages with regular expressions instead of building a
+                 soup, falling back to BeautifulSoup if a page does not look
+                 as expected.
+    :type fast: bool.
+    :param workers: Number of pages requested at once (see :func:`stream`).
+    :type workers: int.
+    :param checkpoint: Save the story-ids on each page as it arrives, so an
+                       interrupted scrape can be resumed by running it again
+                       (see :mod:`ffscraper.storyid.checkpoint`).
+    :type checkpoint: :class:`ffscraper.storyid.checkpoint.Checkpoint`
+    :param updated_since: Stop at the first story last updated before this
+                          time (see :func:`stream`).
+    :type updated_since: int.
 
     :returns: A list of story-ids.
     :rtype: list of strings.
@@ -97,24 +496,20 @@ def scrape(url, rate_limit=3, max_pages=float('inf')):
                     # for the /book/Coraline/ community.
 
                     # (numbers are changed): ['110', '122', '154', ...]
-    """
 
-    soup = soupify(url, rate_limit=rate_limit)
-    number_of_pages = _number_of_pages(soup)
+    Only the stories updated in the last day, in English:
 
-    # If max pages is specified, set the number of pages to the max number.
-    if max_pages < number_of_pages:
-        number_of_pages = max_pages
+    .. code-block:: python
 
-    sids = []
+                    import time
 
-    if number_of_pages:
-        # If number_of_pages was assigned, then we may scrape the information
-        for page in tqdm(range(1, number_of_pages+1)):
-            sids += _get_sids(soupify(url + '?&p=' + str(page),
-                                      rate_limit=rate_limit))
-    else:
-        # If number_of_pages is 0, get the first page.
-        sids = _get_sids(soupify(url, rate_limit=rate_limit))
-
-    return sids
+                    url = ffs.storyid.query('/book/Coraline/',
+                                            sort='updated',
+                                            language='English')
+                    yesterday = time.time() - 86400
+                    sids = ffs.storyid.scrape(url, workers=1,
+                                              updated_since=yesterday)
+    """
+    return list(stream(url, workers=workers, rate_limit=rate_limit,
+                       max_pages=max_pages, fast=fast, checkpoint=checkpoint,
+                       updated_since=updated_since))
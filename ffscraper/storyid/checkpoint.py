@@ -0,0 +1,120 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
++----------------------+---------------------------------------------------+
+|      **Name**        |                  **Description**                  |
++----------------------+---------------------------------------------------+
+|    checkpoint.py     | Save the progress of a listing as pages arrive    |
++----------------------+---------------------------------------------------+
+
+Enumerating the story-ids of a large fandom takes thousands of pages. When
+a :class:`Checkpoint` is passed to :func:`ffscraper.storyid.scrape`, the
+story-ids on each page are saved as soon as the page arrives, and running
+the same scrape again only requests the pages which are missing.
+
+.. code-block:: python
+
+                from ffscraper import storyid
+
+                url = 'https://www.fanfiction.net/book/Harry-Potter/?&srt=1'
+                checkpoint = storyid.Checkpoint('harry-potter.db')
+
+                # If this is interrupted, running it again picks up from the
+                # first page which was not saved.
+                sids = storyid.scrape(url, checkpoint=checkpoint)
+
+Listings are told apart by their full url, so the same fandom with
+different filters (sort order, rating, status, language) is checkpointed
+separately.
+"""
+
+from __future__ import print_function
+
+import json
+import sqlite3
+import threading
+import time
+
+
+class Checkpoint(object):
+    """
+    .. versionadded:: 0.3.0
+
+    Pages of listings, saved in a SQLite database.
+
+    :param path: Path to the database (created if it does not exist).
+    :type path: str.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+
+        self._conn = sqlite3.connect(path, timeout=60,
+                                     check_same_thread=False)
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS listings '
+                               '(url TEXT PRIMARY KEY, pages INTEGER)')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS pages '
+                               '(url TEXT, page INTEGER, saved REAL, '
+                               'sids TEXT, PRIMARY KEY (url, page))')
+
+    def number_of_pages(self, url):
+        """
+        Returns the number of pages the listing at ``url`` had when its first
+        page was saved, or None.
+        """
+        with self._lock:
+            row = self._conn.execute('SELECT pages FROM listings WHERE url=?',
+                                     (url,)).fetchone()
+        return row[0] if row else None
+
+    def pages(self, url):
+        """
+        Returns a dictionary mapping each saved page of the listing at
+        ``url`` to the story-ids on it.
+        """
+        with self._lock:
+            rows = self._conn.execute('SELECT page, sids FROM pages '
+                                      'WHERE url=?', (url,)).fetchall()
+        return dict((page, json.loads(sids)) for page, sids in rows)
+
+    def save(self, url, page, sids, number_of_pages=None):
+        """
+        Save the story-ids on a page of the listing at ``url``. The first
+        page also saves how many pages there are.
+        """
+        with self._lock, self._conn:
+            if number_of_pages is not None:
+                self._conn.execute(
+                    'INSERT OR REPLACE INTO listings VALUES (?, ?)',
+                    (url, number_of_pages))
+            self._conn.execute(
+                'INSERT OR REPLACE INTO pages VALUES (?, ?, ?, ?)',
+                (url, page, self._clock(), json.dumps(list(sids))))
+
+    def clear(self, url):
+        """
+        Forget everything saved about the listing at ``url``, so the next
+        scrape starts from the beginning.
+        """
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM listings WHERE url=?', (url,))
+            self._conn.execute('DELETE FROM pages WHERE url=?', (url,))
+
+    def close(self):
+        self._conn.close()
@@ -15,21 +15,288 @@
 
 """
 Build a local copy of the categories and fandoms on FanFiction.Net.
+
+:class:`Catalog` keeps every fandom (and every fandom's crossover listing)
+in a SQLite database, with the number of stories in each, so that names can
+be looked up without downloading or scanning anything:
+
+.. code-block:: python
+
+                from ffscraper.storyid.download import Catalog
+
+                catalog = Catalog('fandoms.db')
+
+                # Download every category index the first time, then only
+                # the ones older than a week.
+                catalog.refresh(max_age=7 * 86400)
+
+                print(catalog.url('Harry Potter', category='book'))
+                print([f['name'] for f in catalog.prefix('harry')])
+                print([f['name'] for f in catalog.fuzzy('Hary Poter')])
 """
 
 from __future__ import print_function
 
-import json
-import sys
+import difflib
+import re
+import sqlite3
+import threading
 import time
 
 from tqdm import tqdm
+from ..utils import scrape_many
 from ..utils import soupify
+from ..utils import Strainer
+
+CATEGORIES = ['anime', 'book', 'cartoon', 'comic', 'game',
+              'misc', 'play', 'movie', 'tv']
+
+# Only the list of fandoms needs to be built from a category index.
+_STRAINER = Strainer(lambda name, attrs: attrs.get('id') == 'list_output')
+
+# Story counts are shown like (57), (1.2K) or (1M).
+_COUNT = re.compile(r'\(([\d.,]+)([KM]?)\)')
+
+
+def _count(text):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads a story count such as '(1.2K)' as an int (1200), or None.
+    """
+    count = _COUNT.search(text or '')
+    if count is None:
+        return None
+    number = float(count.group(1).replace(',', ''))
+    return int(round(number * {'': 1, 'K': 1000, 'M': 1000000}
+                     [count.group(2)]))
+
+
+def _index_url(category, crossovers=False):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the address of the index of fandoms (or of crossovers) in a
+    category.
+    """
+    if crossovers:
+        return 'https://www.fanfiction.net/crossovers/' + category + '/'
+    return 'https://www.fanfiction.net/' + category + '/'
+
+
+def _fandoms(soup):
+    """
+    .. versionadded:: 0.3.0
+
+    Reads the fandoms listed on a category index.
+
+    :param soup: Soup containing a category index from FanFiction.Net
+    :type soup: bs4.BeautifulSoup class
+
+    :returns: List of (name, address, number of stories) tuples, where the
+              number of stories may be None.
+    :rtype: list of tuples.
+    """
+    list_output = soup.find('div', {'id': 'list_output'})
+    if list_output is None:
+        return []
+
+    fandoms = []
+    for a in list_output.find_all('a', href=True):
+        # The number of stories follows the link, e.g. <span>(1.2K)</span>
+        span = a.find_next_sibling('span')
+        fandoms.append((a.text.strip(),
+                        'https://www.fanfiction.net' + a['href'],
+                        _count(span.text if span is not None else None)))
+    return fandoms
+
+
+def _index(index, rate_limit=3):
+    """
+    .. versionadded:: 0.3.0
+
+    Downloads a category index, where ``index`` is a tuple of (category,
+    crossovers).
+    """
+    category, crossovers = index
+    return _fandoms(soupify(_index_url(category, crossovers),
+                            rate_limit=rate_limit, parse_only=_STRAINER))
+
+
+class Catalog(object):
+    """
+    .. versionadded:: 0.3.0
+
+    The fandoms on FanFiction.Net, kept in a SQLite database.
+
+    :param path: Path to the database (created if it does not exist).
+    :type path: str.
+    """
+
+    def __init__(self, path, clock=time.time):
+        self.path = path
+        self._clock = clock
+        self._lock = threading.Lock()
+        self._names = None
 
-def download():
+        self._conn = sqlite3.connect(path, timeout=60,
+                                     check_same_thread=False)
+        with self._conn:
+            self._conn.execute('CREATE TABLE IF NOT EXISTS indexes '
+                               '(category TEXT, crossovers INTEGER, '
+                               'refreshed REAL, '
+                               'PRIMARY KEY (category, crossovers))')
+            self._conn.execute('CREATE TABLE IF NOT EXISTS fandoms '
+                               '(url TEXT PRIMARY KEY, key TEXT, name TEXT, '
+                               'category TEXT, crossovers INTEGER, '
+                               'stories INTEGER)')
+            # Prefix lookups are range scans over this index.
+            self._conn.execute('CREATE INDEX IF NOT EXISTS fandoms_key '
+                               'ON fandoms (key)')
+
+    def refresh(self, categories=CATEGORIES, crossovers=True,
+                max_age=None, workers=4, rate_limit=3):
+        """
+        Download the index of each category (on a pool of threads, sharing
+        the rate limiter) and save its fandoms. Fandoms which disappeared
+        from an index are removed.
+
+        :param categories: Categories to download.
+        :type categories: list of str.
+        :param crossovers: Also download the index of crossovers for each
+                           category.
+        :type crossovers: bool.
+        :param max_age: Only download the indexes which were last downloaded
+                        more than ``max_age`` seconds ago (or never).
+        :type max_age: int.
+        :param workers: Number of indexes downloaded at once.
+        :type workers: int.
+        :param rate_limit: Minimum number of seconds between requests,
+                           shared by all of the threads.
+        :type rate_limit: int.
+
+        :returns: The (category, crossovers) indexes which were downloaded.
+        :rtype: list of tuples.
+        """
+
+        indexes = [(c, x) for c in categories
+                   for x in ((False, True) if crossovers else (False,))]
+
+        if max_age is not None:
+            now = self._clock()
+            indexes = [i for i in indexes
+                       if now - self._refreshed(i) > max_age]
+
+        for index, fandoms, error in tqdm(scrape_many(
+                _index, indexes, workers=workers, rate_limit=rate_limit),
+                                          total=len(indexes)):
+            if error is not None:
+                raise error
+            self._save(index, fandoms)
+
+        return indexes
+
+    def _refreshed(self, index):
+        with self._lock:
+            row = self._conn.execute('SELECT refreshed FROM indexes WHERE '
+                                     'category=? AND crossovers=?',
+                                     (index[0], int(index[1]))).fetchone()
+        return row[0] if row else float('-inf')
+
+    def _save(self, index, fandoms):
+        category, crossovers = index[0], int(index[1])
+        with self._lock, self._conn:
+            self._conn.execute('DELETE FROM fandoms WHERE category=? AND '
+                               'crossovers=?', (category, crossovers))
+            self._conn.executemany(
+                'INSERT OR REPLACE INTO fandoms VALUES (?, ?, ?, ?, ?, ?)',
+                [(url, name.lower(), name, category, crossovers, stories)
+                 for name, url, stories in fandoms])
+            self._conn.execute('INSERT OR REPLACE INTO indexes '
+                               'VALUES (?, ?, ?)',
+                               (category, crossovers, self._clock()))
+            self._names = None
+
+    def _select(self, where, args, limit=None):
+        sql = ('SELECT name, url, category, crossovers, stories FROM fandoms '
+               'WHERE ' + where + ' ORDER BY stories DESC, name')
+        if limit is not None:
+            sql += ' LIMIT ' + str(int(limit))
+        with self._lock:
+            rows = self._conn.execute(sql, args).fetchall()
+        return [{'name': name, 'url': url, 'category': category,
+                 'crossovers': bool(crossovers), 'stories': stories}
+                for name, url, category, crossovers, stories in rows]
+
+    def find(self, name, category=None, crossovers=False):
+        """
+        Returns the fandoms called ``name`` (ignoring case), most stories
+        first.
+
+        :returns: List of dictionaries with the keys 'name', 'url',
+                  'category', 'crossovers' and 'stories'.
+        :rtype: list of dicts.
+        """
+        where, args = 'key=? AND crossovers=?', [name.lower(), int(crossovers)]
+        if category is not None:
+            where += ' AND category=?'
+            args.append(category)
+        return self._select(where, args)
+
+    def prefix(self, text, limit=10, crossovers=False):
+        """
+        Returns up to ``limit`` fandoms whose name starts with ``text``
+        (ignoring case), most stories first.
+        """
+        key = text.lower()
+        # Everything starting with key sorts between key and key + U+FFFF.
+        return self._select('key >= ? AND key < ? AND crossovers=?',
+                            (key, key + u'\uffff', int(crossovers)),
+                            limit=limit)
+
+    def fuzzy(self, name, n=5, cutoff=0.6, crossovers=False):
+        """
+        Returns up to ``n`` fandoms with names close to ``name`` (see
+        :func:`difflib.get_close_matches`), closest first.
+        """
+        if self._names is None:
+            with self._lock:
+                rows = self._conn.execute('SELECT DISTINCT key FROM fandoms')
+                self._names = [r[0] for r in rows]
+
+        found = []
+        for key in difflib.get_close_matches(name.lower(), self._names, n=n,
+                                             cutoff=cutoff):
+            found += self._select('key=? AND crossovers=?',
+                                  (key, int(crossovers)))
+        return found[:n]
+
+    def url(self, name, category=None, crossovers=False):
+        """
+        Returns the address of the listing for the fandom called ``name``,
+        the closest match if there is no fandom with exactly that name, or
+        None.
+        """
+        found = (self.find(name, category=category, crossovers=crossovers) or
+                 self.fuzzy(name, n=1, crossovers=crossovers))
+        return found[0]['url'] if found else None
+
+    def close(self):
+        self._conn.close()
+
+    def __len__(self):
+        with self._lock:
+            return self._conn.execute(
+                'SELECT COUNT(*) FROM fandoms').fetchone()[0]
+
+
+def download(workers=4, rate_limit=3):
     """
     Download names and addresses for each category and fandom on FanFiction.Net
 
+    The categories are downloaded on a pool of threads. To keep them, and
+    look names up quickly, use a :class:`Catalog` instead.
+
     .. code-block:: python
 
                     from ffscraper.storyid.download import download
@@ -43,36 +310,18 @@ def download():
                         json.dump(fandoms, f, indent=2)
     """
 
-    categories = ['anime', 'book', 'cartoon', 'comic', 'game',
-                  'misc', 'play', 'movie', 'tv']
-
-    def download_category(category, rate_limit=3):
-        """
-        Download one of the categories.
-        """
-        soup = soupify('https://www.fanfiction.net/' + category + '/',
-                       rate_limit=rate_limit)
-
-        ahref = soup.find('div', {'id': 'list_output'}).find_all('a')
-
-        for a in ahref:
-            try:
-                yield a.text, a['href']
-            except:
-                continue
-
-    fandoms_by_category = {}
-
-    for c in tqdm(categories):
-
-        fandoms_by_category[c] = []
-        links = list(download_category(c))
+    fandoms_by_category = dict((c, []) for c in CATEGORIES)
 
-        for l in links:
+    for index, fandoms, error in tqdm(scrape_many(
+            _index, [(c, False) for c in CATEGORIES], workers=workers,
+            rate_limit=rate_limit), total=len(CATEGORIES)):
+        if error is not None:
+            raise error
 
-            fandoms_by_category[c].append({
-                'name': l[0],
-                'address': 'https://www.fanfiction.net' + l[1]
+        for name, address, stories in fandoms:
+            fandoms_by_category[index[0]].append({
+                'name': name,
+                'address': address
             })
 
     return fandoms_by_category
@@ -0,0 +1,148 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Compare the BeautifulSoup extractors against the regular expression fast
+paths (and the single walk over a story page against one search per
+field), on the test pages or on every page of a recorded archive:
+
+.. code-block:: bash
+
+                $ python -m ffscraper.tests.benchmark
+                $ python -m ffscraper.tests.benchmark crawl.ffa
+"""
+
+from __future__ import print_function
+from __future__ import division
+
+import sys
+import timeit
+
+from ffscraper.archive import Archive
+from ffscraper.cache import page_type
+from ffscraper.fanfic import review
+from ffscraper.fanfic import story
+from ffscraper import storyid
+from ffscraper.tests.ffscrapertests import pages
+from ffscraper.utils import _soup
+
+# For each type of page: (soup extractor, fast extractor).
+EXTRACTORS = {
+    'story': (lambda html: story._story(
+                  _soup(html, parse_only=story._STRAINER), '0'),
+              lambda html: story._story_from_html(html, '0')),
+    'review': (lambda html: review._reviews_on_page(html),
+               lambda html: review._reviews_in_html(html)),
+    'listing': (lambda html: storyid._read_listing(html),
+                lambda html: storyid._sids_from_html(html)),
+}
+
+
+def sample_pages():
+    """
+    Returns a dictionary mapping each type of page to a list of test pages.
+    """
+    entries = [{'sid': str(s), 'aid': '7', 'updated': '2', 'published': '1'}
+               for s in range(25)]
+    return {
+        'story': [pages.story(text='Once upon a time. ' * 2000)],
+        'review': [pages.reviews('1', [('9', '3', '333', 'Review. ' * 20)] *
+                                 15, last_page=10)],
+        'listing': [pages.listing(entries, last_page=40)],
+    }
+
+
+def archived_pages(path):
+    """
+    Returns a dictionary mapping each type of page to the pages of that type
+    recorded in the archive at ``path``.
+    """
+    archive = Archive(path)
+    found = {}
+    for url in archive.urls():
+        found.setdefault(page_type(url), []).append(archive.get(url))
+    archive.close()
+    return found
+
+
+def compare(found, number=5):
+    """
+    Time both extractors on every page, and count the pages where the fast
+    path gave up (fell back) or disagreed with the soup.
+    """
+    print('{0:<8} {1:>6} {2:>10} {3:>10} {4:>8} {5:>9} {6:>9}'.format(
+        'type', 'pages', 'soup (s)', 'fast (s)', 'speedup', 'fallback',
+        'mismatch'))
+
+    for kind in sorted(EXTRACTORS):
+        html = found.get(kind, [])
+        if not html:
+            continue
+
+        slow, fast = EXTRACTORS[kind]
+        fallback = sum(fast(h) is None for h in html)
+        mismatch = 0
+        for h in html:
+            result = fast(h)
+            if result is not None and result != slow(h):
+                mismatch += 1
+
+        slow_time = timeit.timeit(lambda: [slow(h) for h in html],
+                                  number=number)
+        fast_time = timeit.timeit(lambda: [fast(h) for h in html],
+                                  number=number)
+
+        print('{0:<8} {1:>6} {2:>10.3f} {3:>10.3f} {4:>7.1f}x {5:>9} {6:>9}'
+              .format(kind, len(html), slow_time, fast_time,
+                      slow_time / fast_time, fallback, mismatch))
+
+
+def separate_searches(soup):
+    """
+    What story._story did before story._story_fields: one search of the soup
+    per field.
+    """
+    story._not_empty_fanfic(soup)
+    category, fandom = story._category_and_fandom(soup)
+    metadata = soup.find('span', {'class': 'xgray xcontrast_txt'}).text
+    published, updated = story._timestamps(soup)
+    aid = soup.find_all('a', {'class':
+                        'xcontrast_txt'})[2].get('href').split('/')[2]
+    return (category, fandom, story._title(soup), aid, metadata,
+            published, updated)
+
+
+def compare_story_fields(number=20):
+    """
+    Time the single walk in story._story_fields against one search per
+    field, on a long story page.
+    """
+    soup = _soup(pages.story('5', aid='50', text='<p>Paragraph.</p>' * 300))
+
+    separate = min(timeit.repeat(lambda: separate_searches(soup),
+                                 number=number, repeat=3))
+    single = min(timeit.repeat(lambda: story._story_fields(soup),
+                               number=number, repeat=3))
+
+    print('story fields: {0:.3f}s one search per field, {1:.3f}s single '
+          'walk ({2:.1f}x)'.format(separate, single, separate / single))
+
+
+if __name__ == '__main__':
+    if len(sys.argv) > 1:
+        compare(archived_pages(sys.argv[1]), number=1)
+    else:
+        compare(sample_pages())
+    compare_story_fields()
@@ -0,0 +1,203 @@
+# -*- coding: utf-8 -*-
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+"""
+Trimmed-down copies of pages from FanFiction.Net (names and numbers are
+changed), along with a stand-in for ``requests.Session`` which serves them.
+Shared by the tests which need whole pages rather than fragments.
+"""
+
+from __future__ import print_function
+
+import requests
+
+
+def story(sid='123', aid='4444', chapters=3, reviews=32, text='Once upon.'):
+    """
+    First page of a story in Books/Harry Potter.
+    """
+    options = ''.join(
+        "<option  value={0} {1}>{0}. Chapter {0}</option>".format(
+            c, 'selected' if c == 1 else '')
+        for c in range(1, chapters + 1))
+
+    return u"""<html><head><title>Title Here Chapter 1</title></head><body>
+<div id=top><div class='menulink'><a href='/'>FanFiction</a></div></div>
+<div style='margin-bottom: 10px' class='lc-wrapper' id=pre_story_links>
+<span class=lc-left><a class=xcontrast_txt href='/book/'>Books</a>
+<span class='xcontrast_txt icon-chevron-right xicon-section-arrow'></span>
+<a class=xcontrast_txt href="/book/Harry-Potter/">Harry Potter</a></span>
+</div>
+<div id=profile_top style='min-height:112px;'>
+<button class='btn pull-right' type=button>Follow/Fav</button>
+<b class='xcontrast_txt'>Title Here</b>
+<span class='xcontrast_txt'><div style='height:5px'></div>By:</span>
+<a class='xcontrast_txt' href='/u/{aid}/Author-Name'>Author Name</a>
+<span class='icon-mail-1  xcontrast_txt'></span>
+<a class='xcontrast_txt' title="Send Private Message"
+href='https://www.fanfiction.net/pm2/post.php?uid={aid}'></a>
+<div style='margin-top:2px' class='xcontrast_txt'>An abstract for the story.
+</div>
+<span class='xgray xcontrast_txt'>Rated: <a class='xcontrast_txt'
+href='https://www.fictionratings.com/' target='rating'>Fiction  T</a> -
+English - Romance/Sci-Fi - [Harry P., Hermione G.] Ron W. -
+Chapters: {chapters} - Words: 12,345 - Reviews: <a href='/r/{sid}/'>{reviews}</a>
+- Favs: 1,024 - Follows: 56 - Updated: <span data-xutime='1500000000'>7/14/2017
+</span> - Published: <span data-xutime='1400000000'>5/13/2014</span> -
+Status: Complete - id: {sid} </span>
+</div>
+<span class='lc-left'><select id=chap_select title="Chapter Navigation"
+Name=chapter onChange="self.location = '/s/{sid}/'+ this.options[
+this.selectedIndex].value + '/title-here';">{options}</select></span>
+<div role='main' aria-label='story content' class='storytextp'
+id='storytextp' align=center style='padding:0px 0.5em 0px .5em;'>
+<div class='storytext xcontrast_txt nocopy' id='storytext'>
+<p>{text}</p><p>Lots more story text.</p></div></div>
+</body></html>""".format(sid=sid, aid=aid, chapters=chapters,
+                         reviews=reviews, text=text, options=options)
+
+
+STORY_NOT_FOUND = u"""<html><body><div class='panel_warning'>
+<span class='gui_warning'>Story Not Found<hr size=1 noshade>Unable to locate
+story. Code 1.</span></div></body></html>"""
+
+
+def reviews(sid, entries, last_page=None, chapter=0):
+    """
+    A page of reviews. ``entries`` is a list of (reviewer, chapter, timestamp,
+    text), where a reviewer of None is an anonymous review.
+    """
+    rows = []
+    for reviewer, chap, timestamp, text in entries:
+        if reviewer is None:
+            who = (u"<img class='round36' src='/static/images/d_60_90.jpg'"
+                   u" width=50 height=50> Guest")
+        else:
+            who = u"<a href='/u/{0}/name-{0}'>name-{0}</a>".format(reviewer)
+        rows.append(
+            u"<tr  ><td  style='padding-top:10px;padding-bottom:10px'>"
+            u"<span style='float:right'><a href='https://www.fanfiction.net/'"
+            u" title='Reply to Review'></a></span>{0}"
+            u"<small style='color:gray'>chapter {1} . <span data-xutime='{2}'>"
+            u"5/3</span></small><div style='margin-top:5px'>{3}</div>"
+            u"</td></tr>".format(who, chap, timestamp, text))
+
+    pagination = u''
+    if last_page:
+        pagination = (u"<center style='margin-top:5px;margin-bottom:5px;'>"
+                      u"<a href='/r/{0}/{1}/2/'>2</a> "
+                      u"<a href='/r/{0}/{1}/{2}/'>Last</a> "
+                      u"<a href='/r/{0}/{1}/2/'>Next &#187;</a></center>"
+                      .format(sid, chapter, last_page))
+
+    return (u"<html><body><div id=content_wrapper>{0}"
+            u"<table id='gui_table1i' class='table table-striped' "
+            u"style='margin-top:5px;'><tbody>{1}</tbody></table>{0}"
+            u"</div></body></html>".format(pagination, u''.join(rows)))
+
+
+def listing(entries, last_page=None, fandom='/book/Harry-Potter/'):
+    """
+    A page of a fandom listing. ``entries`` is a list of dictionaries with
+    'sid', 'aid', 'updated' and 'published' keys.
+    """
+    stories = []
+    for entry in entries:
+        e = {'chapters': 1, 'reviews': 3}
+        e.update(entry)
+        stories.append(
+            u"<div class='z-list zhover zpointer ' style='min-height:77px;'>"
+            u"<a  class=stitle href=\"/s/{sid}/1/Story-{sid}\">"
+            u"<img class='cimage' src='/static/images/d_60_90.jpg'>"
+            u"Story {sid}</a>  by <a href=\"/u/{aid}/Author-{aid}\">"
+            u"Author {aid}</a> <a class=reviews href='/r/{sid}/'>reviews</a>"
+            u"<div class='z-indent z-padtop'>Summary of {sid}."
+            u"<div class='z-padtop2 xgray'>Rated: K+ - English - "
+            u"Humor/Sci-Fi - Chapters: {chapters} - Words: 2,048 - "
+            u"Reviews: {reviews} - Favs: 8 - Follows: 2 - Updated: "
+            u"<span data-xutime='{updated}'>8h</span> - Published: "
+            u"<span data-xutime='{published}'>1/2/2010</span> - "
+            u"Luna L., Neville L. - Complete</div></div></div>".format(**e))
+
+    pagination = u''
+    if last_page:
+        pagination = (u"<center style='margin-top:5px;'>1.1K | Page <b>1</b>"
+                      u" <a href='{0}?&srt=1&p=2'>2</a> "
+                      u"<a href='{0}?&srt=1&p={1}'>Last</a> "
+                      u"<a href='{0}?&srt=1&p=2'>Next &#187;</a></center>"
+                      .format(fandom, last_page))
+
+    return (u"<html><body><div id=content_wrapper>{0}{1}{0}</div>"
+            u"</body></html>".format(pagination, u''.join(stories)))
+
+
+def profile(favorites=(), authors=()):
+    """
+    A user's profile. ``favorites`` is a list of (sid, fandom) tuples and
+    ``authors`` is a list of user-ids.
+    """
+    stories = []
+    for sid, fandom in favorites:
+        stories.append(
+            u"<div class='z-list favstories' data-category=\"{1}\" "
+            u"data-storyid=\"{0}\" data-title=\"Story {0}\" "
+            u"data-wordcount=\"2048\" data-datesubmit=\"1262400000\" "
+            u"data-dateupdate=\"1500000000\" data-ratingtimes=\"3\" "
+            u"data-chapters=\"2\" data-statusid=\"2\" "
+            u"style='min-height:77px;'>"
+            u"<a class=stitle href=\"/s/{0}/1/Story-{0}\">Story {0}</a> by "
+            u"<a href=\"/u/99/Author-99\">Author 99</a>"
+            u"<div class='z-indent z-padtop'>Summary of {0}."
+            u"<div class='z-padtop2 xgray'>{1} - Rated: T - English - "
+            u"Romance - Chapters: 2 - Words: 2,048 - Reviews: 3 - Favs: 8 - "
+            u"Updated: <span data-xutime='1500000000'>7/14/2017</span> - "
+            u"Published: <span data-xutime='1262400000'>1/2/2010</span> - "
+            u"Complete</div></div></div>".format(sid, fandom))
+
+    links = u''.join(u"<dl><a href='/u/{0}/user-{0}'>user-{0}</a></dl>"
+                     .format(a) for a in authors)
+
+    return (u"<html><body><div id=content_wrapper>"
+            u"<div id='fs' class='tab-pane'>{0}</div>"
+            u"<div id='fa' class='tab-pane '><table width=100%><tr>"
+            u"<TD VALIGN=TOP>{1}</TD></tr></table></div>"
+            u"</div></body></html>".format(u''.join(stories), links))
+
+
+class Response(object):
+
+    def __init__(self, text, status_code=200):
+        self.text = text
+        self.status_code = status_code
+
+    def raise_for_status(self):
+        if self.status_code >= 400:
+            raise requests.HTTPError(str(self.status_code))
+
+
+class Transport(object):
+    """
+    Stand-in for ``requests.Session``, serving pages from a dictionary
+    mapping urls to html. Every requested url is remembered.
+    """
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append(url)
+        return Response(self.pages[url])
@@ -0,0 +1,93 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import sys
+import unittest
+
+# This set of tests is interested in ffscraper.aio (Python 3.5+)
+sys.path.append('./')
+from ffscraper import session
+from ffscraper.fanfic import story
+from ffscraper.tests.ffscrapertests import pages
+
+if sys.version_info >= (3, 5):
+    import asyncio
+    from ffscraper import aio
+
+
+@unittest.skipIf(sys.version_info < (3, 5), 'asyncio engine needs 3.5+')
+class EngineTest(unittest.TestCase):
+
+    def setUp(self):
+        F = 'https://www.fanfiction.net'
+        self.transport = pages.Transport({
+            F + '/s/123': pages.story('123', reviews=20),
+            F + '/s/124': pages.STORY_NOT_FOUND,
+            F + '/r/123/0/1/': pages.reviews('123', [('1', 1, 10, 'a')]),
+            F + '/r/123/0/2/': pages.reviews('123', [(None, 2, 5, 'b')]),
+            F + '/u/7': pages.profile([('5', 'Twilight')], ['8']),
+            F + '/book/X/': pages.listing([{'sid': '1', 'aid': '2',
+                                            'updated': 3, 'published': 3}],
+                                          last_page=2, fandom='/book/X/'),
+            F + '/book/X/?&p=2': pages.listing([{'sid': '4', 'aid': '2',
+                                                 'updated': 3,
+                                                 'published': 3}]),
+        })
+        session.set_session(self.transport)
+        self.engine = aio.Engine(concurrency=2, rate_limit=0)
+        self.loop = asyncio.new_event_loop()
+        asyncio.set_event_loop(self.loop)
+
+    def tearDown(self):
+        self.engine.close()
+        self.loop.close()
+        asyncio.set_event_loop(None)
+        session.set_session(None)
+
+    def run_until_complete(self, coroutine):
+        return self.loop.run_until_complete(coroutine)
+
+    def test_scrape_story_1(self):
+        # 1. The async scraper agrees with story.scraper.
+        self.assertEqual(self.run_until_complete(
+                            self.engine.scrape_story('123')),
+                         story.scraper('123', rate_limit=0))
+
+    def test_scrape_many_2(self):
+        # 2. Errors for one story do not stop the others.
+        results = self.run_until_complete(asyncio.gather(
+            self.engine.scrape_story('123'),
+            self.engine.scrape_story('124'),
+            return_exceptions=True))
+        self.assertEqual(results[0]['aid'], '4444')
+        self.assertIsInstance(results[1], Exception)
+
+    def test_scrape_reviews_3(self):
+        reviews = self.run_until_complete(
+            self.engine.scrape_reviews('123', 20))
+        self.assertEqual(reviews, [('1', '1', '10', 'a'),
+                                   ('Guest', '2', '5', 'b')])
+
+    def test_scrape_profile_4(self):
+        user = self.run_until_complete(self.engine.scrape_profile('7'))
+        self.assertEqual(user['favorite_authors'], ['8'])
+        self.assertEqual(user['favorite_stories'][0], [('5', 'Twilight')])
+
+    def test_scrape_storyids_5(self):
+        # 5. The first listing page is not downloaded twice.
+        sids = self.run_until_complete(
+            self.engine.scrape_storyids('https://www.fanfiction.net/book/X/'))
+        self.assertEqual(sids, ['1', '4'])
+        self.assertEqual(len(self.transport.requested), 2)
@@ -0,0 +1,116 @@
+# -*- coding: utf-8 -*-
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import shutil
+import sys
+import tempfile
+import unittest
+
+# This set of tests is interested in ffscraper.archive
+sys.path.append('./')
+from ffscraper import archive
+from ffscraper import session
+from ffscraper import utils
+
+
+class Transport(object):
+
+    def __init__(self):
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append(url)
+        response = type('Response', (object,), {})()
+        response.text = u'<p>' + url + u' 進撃</p>'
+        response.raise_for_status = lambda: None
+        return response
+
+
+class ArchiveTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = self.directory + '/crawl.ffa'
+
+    def tearDown(self):
+        archive.set_archive(None)
+        session.set_session(None)
+        shutil.rmtree(self.directory)
+
+    def test_record_and_replay_1(self):
+        # 1. Pages recorded during a crawl are replayed without the network.
+        transport = Transport()
+        session.set_session(transport)
+        archive.set_archive(archive.Archive(self.path, mode='a'))
+
+        utils.fetch('https://a/s/1', rate_limit=0)
+        utils.fetch('https://a/u/2/', rate_limit=0)
+        archive.get_archive().close()
+
+        replay = archive.Archive(self.path)
+        archive.set_archive(replay)
+        self.assertEqual(len(replay), 2)
+        self.assertEqual(utils.fetch('https://a/s/1'),
+                         u'<p>https://a/s/1 進撃</p>')
+        self.assertEqual(utils.soupify('https://a/u/2').find('p').text,
+                         u'https://a/u/2/ 進撃')
+        self.assertEqual(len(transport.requested), 2)
+
+    def test_missing_page_2(self):
+        # 2. Replaying a page which was never recorded raises an error.
+        archive.Archive(self.path, mode='a').close()
+        archive.set_archive(archive.Archive(self.path))
+        self.assertRaises(archive.PageNotArchived, utils.fetch, 'https://a/')
+
+    def test_partial_record_3(self):
+        # 3. A record cut short by a crash is dropped when reopened.
+        a = archive.Archive(self.path, mode='a')
+        a.record('https://a/s/1', 'one')
+        a.record('https://a/s/1', 'duplicate')
+        a.record('https://a/s/2', 'two')
+        a.close()
+
+        with open(self.path, 'rb+') as f:
+            f.seek(-3, 2)
+            f.truncate()
+
+        a = archive.Archive(self.path, mode='a')
+        self.assertEqual(a.urls(), ['https://a/s/1'])
+        self.assertEqual(a.get('https://a/s/1'), 'one')
+        a.record('https://a/s/3', 'three')
+        a.close()
+
+        a = archive.Archive(self.path)
+        self.assertEqual(sorted(a.urls()), ['https://a/s/1', 'https://a/s/3'])
+        self.assertEqual(a.get('https://a/s/3'), 'three')
+        self.assertRaises(IOError, a.record, 'https://a/s/4', 'four')
+
+    def test_url_with_spaces_4(self):
+        # 4. A url with spaces in it does not cut off the records after it.
+        a = archive.Archive(self.path, mode='a')
+        a.record('https://a/book/Some Fandom/', 'fandom')
+        a.record('https://a/s/2', 'two')
+        a.close()
+
+        a = archive.Archive(self.path, mode='a')
+        a.record('https://a/s/3', 'three')
+        a.close()
+
+        a = archive.Archive(self.path)
+        self.assertEqual(len(a), 3)
+        self.assertEqual(a.get('https://a/book/Some Fandom'), 'fandom')
+        self.assertEqual(a.get('https://a/s/2'), 'two')
+        self.assertEqual(a.get('https://a/s/3'), 'three')
@@ -0,0 +1,172 @@
+# -*- coding: utf-8 -*-
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import shutil
+import sys
+import tempfile
+import unittest
+
+import requests
+
+# This set of tests is interested in ffscraper.cache
+sys.path.append('./')
+from ffscraper import cache
+from ffscraper import ratelimit
+from ffscraper import session
+from ffscraper import utils
+
+from ffscraper.tests.ffscrapertests import pages
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class NormalizeTest(unittest.TestCase):
+
+    def test_normalize_url_1(self):
+        self.assertEqual(
+            cache.normalize_url('https://www.FanFiction.net/book/Coraline/'),
+            cache.normalize_url('https://www.fanfiction.net/book/Coraline'))
+
+    def test_normalize_url_2(self):
+        self.assertEqual(
+            cache.normalize_url('https://www.fanfiction.net/x/?&srt=1&p=2'),
+            'https://www.fanfiction.net/x?p=2&srt=1')
+
+    def test_page_type_3(self):
+        self.assertEqual(cache.page_type('https://a/s/123'), 'story')
+        self.assertEqual(cache.page_type('https://a/r/123/0/2/'), 'review')
+        self.assertEqual(cache.page_type('https://a/u/12'), 'profile')
+        self.assertEqual(cache.page_type('https://a/book/Coraline/'),
+                         'listing')
+
+
+class HTMLCacheTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.clock = FakeClock()
+
+    def tearDown(self):
+        shutil.rmtree(self.directory)
+
+    def test_get_put_1(self):
+        # 1. Pages round-trip, including non-ascii text.
+        c = cache.HTMLCache(self.directory, clock=self.clock)
+        self.assertIsNone(c.get('https://a/s/1'))
+        c.put('https://a/s/1', u'<b>進撃の巨人</b>')
+        self.assertEqual(c.get('https://a/s/1/'), u'<b>進撃の巨人</b>')
+
+        # The index survives reopening the cache.
+        c = cache.HTMLCache(self.directory, clock=self.clock)
+        self.assertEqual(c.get('https://a/s/1'), u'<b>進撃の巨人</b>')
+
+    def test_ttl_2(self):
+        # 2. Each page type has its own time to live.
+        c = cache.HTMLCache(self.directory, ttl={'review': 10},
+                            clock=self.clock)
+        c.put('https://a/s/1', 'story')
+        c.put('https://a/r/1/0/1/', 'review')
+        self.clock.now = 11
+        self.assertEqual(c.get('https://a/s/1'), 'story')
+        self.assertIsNone(c.get('https://a/r/1/0/1/'))
+
+    def test_eviction_3(self):
+        # 3. The least recently used pages are evicted first.
+        c = cache.HTMLCache(self.directory, clock=self.clock, max_size=0)
+        c.put('https://a/s/1', 'x')
+        self.assertEqual(len(c), 0)
+
+        c = cache.HTMLCache(self.directory, clock=self.clock)
+        for i in range(3):
+            self.clock.now = i
+            c.put('https://a/s/' + str(i), 'page' * 100)
+        c.max_size = c.size()
+
+        self.clock.now = 5
+        c.get('https://a/s/0')
+        self.clock.now = 6
+        c.put('https://a/s/3', 'page' * 100)
+
+        self.assertEqual(len(c), 3)
+        self.assertIsNone(c.get('https://a/s/1'))
+        self.assertEqual(c.get('https://a/s/0'), 'page' * 100)
+
+
+class CachedFetchTest(unittest.TestCase):
+
+    class Transport(object):
+
+        def __init__(self):
+            self.requested = []
+
+        def get(self, url, timeout=None):
+            self.requested.append(url)
+            response = type('Response', (object,), {})()
+            response.text = '<p>' + url + '</p>'
+            response.raise_for_status = lambda: None
+            return response
+
+    class Limiter(object):
+
+        def __init__(self):
+            self.acquired = 0
+
+        def reserve(self, tokens=1):
+            return 0.0
+
+        def acquire(self, tokens=1):
+            self.acquired += 1
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.transport = self.Transport()
+        self.limiter = self.Limiter()
+        session.set_session(self.transport)
+        ratelimit.set_limiter(self.limiter)
+        cache.set_cache(cache.HTMLCache(self.directory))
+
+    def tearDown(self):
+        session.set_session(None)
+        ratelimit.set_limiter(None)
+        cache.set_cache(None)
+        shutil.rmtree(self.directory)
+
+    def test_fetch_1(self):
+        # 1. Cache hits are neither downloaded nor rate limited.
+        self.assertEqual(utils.fetch('https://a/s/1'), '<p>https://a/s/1</p>')
+        self.assertEqual(utils.fetch('https://a/s/1'), '<p>https://a/s/1</p>')
+        self.assertEqual(self.transport.requested, ['https://a/s/1'])
+        self.assertEqual(self.limiter.acquired, 1)
+
+    def test_fetch_error_2(self):
+        # 2. Error pages (e.g. 503 Service Unavailable) are never cached.
+        class Unavailable(object):
+            def get(self, url, timeout=None):
+                return pages.Response('<p>Try again later</p>', 503)
+
+        session.set_session(Unavailable())
+
+        with self.assertRaises(requests.HTTPError):
+            utils.fetch('https://a/s/1')
+        self.assertEqual(len(cache.get_cache()), 0)
+        self.assertIsNone(cache.get_cache().get('https://a/s/1'))
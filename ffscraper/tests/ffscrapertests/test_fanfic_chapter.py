@@ -0,0 +1,122 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from __future__ import print_function
+
+import gzip
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# This set of tests is interested in ffscraper.fanfic.chapter
+sys.path.append('./')
+from ffscraper import session
+from ffscraper.fanfic import chapter
+from ffscraper.tests.ffscrapertests import pages
+
+
+def _story(chapters):
+    return dict(('https://www.fanfiction.net/s/7/' + str(c),
+                 pages.story('7', chapters=chapters, text='Chapter ' + str(c)))
+                for c in range(1, chapters + 1))
+
+
+class DownloadTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+
+    def tearDown(self):
+        session.set_session(None)
+        shutil.rmtree(self.directory)
+
+    def _download(self, chapters, **kwargs):
+        transport = pages.Transport(chapters)
+        session.set_session(transport)
+        path = chapter.download('7', directory=self.directory, rate_limit=0,
+                                **kwargs)
+        return path, transport.requested
+
+    def test_download_1(self):
+        path, _ = self._download(_story(5), workers=2)
+        texts = [text for _, text in chapter.read_chapters(path)]
+
+        self.assertEqual([n for n, _ in chapter.read_chapters(path)],
+                         [1, 2, 3, 4, 5])
+        self.assertTrue(texts[2].strip().startswith('Chapter 3'))
+
+        # The whole file is also one gzip stream.
+        with gzip.open(path) as f:
+            self.assertEqual(f.read().decode('utf-8'), ''.join(texts))
+
+    def test_download_2(self):
+        # Chapter 3 fails: the first two are kept.
+        pages_ = _story(4)
+        del pages_['https://www.fanfiction.net/s/7/3']
+        self.assertRaises(KeyError, self._download, pages_, workers=1)
+
+        path = os.path.join(self.directory, '7.txt.gz')
+        self.assertEqual([n for n, _ in chapter.read_chapters(path)], [1, 2])
+
+        # Half of a chapter left at the end of the file is dropped.
+        with open(path, 'ab') as f:
+            f.write(b'\x1f\x8b\x08 partial')
+
+        # Resuming (after two chapters were added) only needs chapter 2, to
+        # count the chapters, and the chapters after it.
+        path, requested = self._download(_story(6), workers=2)
+        self.assertEqual(sorted(requested),
+                         ['https://www.fanfiction.net/s/7/' + str(c)
+                          for c in range(2, 7)])
+        self.assertEqual([n for n, _ in chapter.read_chapters(path)],
+                         [1, 2, 3, 4, 5, 6])
+
+    def test_download_3(self):
+        session.set_session(pages.Transport({
+            'https://www.fanfiction.net/s/7/1': pages.STORY_NOT_FOUND}))
+        self.assertRaises(Exception, chapter.download, '7',
+                          directory=self.directory, rate_limit=0)
+
+    def test_partial_progress_4(self):
+        # A line of the sidecar cut short by a crash does not count.
+        path, _ = self._download(_story(3), workers=1)
+        with open(path + '.progress') as f:
+            lines = f.readlines()
+        self.assertEqual(len(lines), 3)
+
+        with open(path + '.progress', 'w') as f:
+            f.writelines(lines[:2])
+            f.write(lines[2].split()[0] + ' ' + lines[2].split()[1][:1])
+        self.assertEqual([c for c, _ in chapter._progress(path)], [1, 2])
+
+        # Offsets which go backwards, or past the end of the file, stop it.
+        with open(path + '.progress', 'w') as f:
+            f.writelines([lines[0], '2 1\n', lines[2]])
+        self.assertEqual([c for c, _ in chapter._progress(path)], [1])
+        with open(path + '.progress', 'w') as f:
+            f.writelines(lines[:2] + ['3 {0}\n'.format(10 ** 9)])
+        self.assertEqual([c for c, _ in chapter._progress(path)], [1, 2])
+
+        # Resuming only downloads the last chapter again.
+        with open(path + '.progress', 'w') as f:
+            f.writelines(lines[:2])
+            f.write(lines[2].split()[0] + ' ' + lines[2].split()[1][:1])
+        path, requested = self._download(_story(3), workers=1)
+        self.assertEqual(requested, ['https://www.fanfiction.net/s/7/2',
+                                     'https://www.fanfiction.net/s/7/3'])
+        self.assertEqual([n for n, _ in chapter.read_chapters(path)],
+                         [1, 2, 3])
@@ -0,0 +1,89 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from __future__ import print_function
+
+from bs4 import BeautifulSoup as bs
+import sys
+import unittest
+
+# This set of tests is interested in ffscraper.fanfic.metadata
+sys.path.append('./')
+from ffscraper.fanfic import metadata
+from ffscraper.tests.ffscrapertests import pages
+
+
+def _line(html):
+    # The text of the first metadata line on a page.
+    soup = bs(html, 'html.parser')
+    tag = (soup.find('span', {'class': 'xgray xcontrast_txt'}) or
+           soup.find('div', {'class': 'z-padtop2 xgray'}))
+    return tag.text
+
+
+class ParseTest(unittest.TestCase):
+
+    def test_parse_story_page(self):
+        m = metadata.parse(_line(pages.story('123', chapters=3, reviews=32)))
+        self.assertEqual(m['rating'], 'T')
+        self.assertEqual(m['language'], 'English')
+        self.assertEqual(m['genres'], ['Romance', 'Sci-Fi'])
+        self.assertEqual(m['characters'], ['Harry P.', 'Hermione G.',
+                                           'Ron W.'])
+        self.assertEqual(m['pairings'], [['Harry P.', 'Hermione G.']])
+        self.assertEqual((m['chapters'], m['words'], m['reviews'], m['favs'],
+                          m['follows']), (3, 12345, 32, 1024, 56))
+        self.assertEqual(m['status'], 'Complete')
+        self.assertEqual(m['id'], '123')
+        self.assertIsNone(m['fandom'])
+
+    def test_parse_listing_page(self):
+        m = metadata.parse(_line(pages.listing(
+            [{'sid': '1', 'aid': '2', 'updated': '3', 'published': '4',
+              'chapters': 7, 'reviews': 1200}])))
+        self.assertEqual(m['rating'], 'K+')
+        self.assertEqual(m['genres'], ['Humor', 'Sci-Fi'])
+        self.assertEqual(m['characters'], ['Luna L.', 'Neville L.'])
+        self.assertEqual(m['pairings'], [])
+        self.assertEqual((m['chapters'], m['reviews']), (7, 1200))
+        self.assertEqual(m['status'], 'Complete')
+        self.assertIsNone(m['id'])
+
+    def test_parse_profile(self):
+        m = metadata.parse(_line(pages.profile([('1', 'Harry Potter')])))
+        self.assertEqual(m['fandom'], 'Harry Potter')
+        self.assertFalse(m['crossover'])
+        self.assertEqual(m['rating'], 'T')
+        self.assertEqual(m['genres'], ['Romance'])
+        self.assertEqual(m['follows'], 0)
+
+    def test_parse_crossover(self):
+        m = metadata.parse('Crossover - Harry Potter & Naruto - Rated: M - '
+                           'Spanish - Hurt/Comfort/Drama - Chapters: 2 - '
+                           'Words: 900 - Published: 1/2/2010 - Naruto U.')
+        self.assertTrue(m['crossover'])
+        self.assertEqual(m['fandom'], 'Harry Potter & Naruto')
+        self.assertEqual(m['language'], 'Spanish')
+        self.assertEqual(m['genres'], ['Hurt/Comfort', 'Drama'])
+        self.assertEqual(m['characters'], ['Naruto U.'])
+        self.assertEqual(m['status'], 'In-Progress')
+        self.assertEqual(m['reviews'], 0)
+
+    def test_parse_no_genre(self):
+        m = metadata.parse('Rated: K - English - Jean-Luc P. - Words: 100')
+        self.assertEqual(m['genres'], [])
+        self.assertEqual(m['characters'], ['Jean-Luc P.'])
+        # A one-shot has no 'Chapters:', but it has one chapter.
+        self.assertEqual(m['chapters'], 1)
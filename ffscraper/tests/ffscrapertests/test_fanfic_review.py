@@ -58,6 +58,7 @@ class ReviewsTest(unittest.TestCase):
 
         reviews = review._reviews_in_table(soup)
         reality = [r for r in reviews]
+        self.assertEqual(reality, review._reviews_in_html(str(soup)))
 
         self.assertEqual(reality[0][0], '123')
         self.assertEqual(reality[0][1], '10')
@@ -73,3 +74,174 @@ class ReviewsTest(unittest.TestCase):
         self.assertEqual(reality[2][1], '2')
         self.assertEqual(reality[2][2], '22222')
         self.assertEqual(reality[2][3], 'Anonymous third.')
+
+
+class FastPathTest(unittest.TestCase):
+
+    # ffscraper.fanfic.review._reviews_in_html
+
+    def test_fast_path_1(self):
+        from ffscraper.tests.ffscrapertests import pages
+
+        html = pages.reviews('1', [('9', '3', '333', 'Hi &amp; bye.'),
+                                   (None, '1', '111', '<b>Bold</b> text.')])
+        fast = review._reviews_in_html(html)
+        self.assertEqual(fast, review._reviews_on_page(html))
+        self.assertEqual(fast[0], ('9', '3', '333', 'Hi & bye.'))
+        self.assertEqual(fast[1], ('Guest', '1', '111', 'Bold text.'))
+
+    def test_fast_path_2(self):
+        # A row the patterns do not understand hands the page to the soup.
+        html = """<tbody><tr><td>Something else entirely.</td></tr></tbody>"""
+        self.assertIsNone(review._reviews_in_html(html))
+        self.assertIsNone(review._reviews_in_html('<html></html>'))
+
+
+class KnownReviewsTest(unittest.TestCase):
+
+    # ffscraper.fanfic.review.scraper(known=...)
+
+    def setUp(self):
+        from ffscraper import session
+        from ffscraper.tests.ffscrapertests import pages
+
+        entries = [(str(i), '1', str(100 - i), 'Text') for i in range(40)]
+        self.session = session
+        self.transport = pages.Transport(dict(
+            ('https://www.fanfiction.net/r/1/0/' + str(p + 1) + '/',
+             pages.reviews('1', entries[15 * p:15 * (p + 1)]))
+            for p in range(3)))
+        session.set_session(self.transport)
+
+    def tearDown(self):
+        self.session.set_session(None)
+
+    def test_known_1(self):
+        # 18 new reviews: the first two pages.
+        reviews = review.scraper('1', 40, rate_limit=0, known=22)
+        self.assertEqual([r[0] for r in reviews], [str(i) for i in range(18)])
+        self.assertEqual(len(self.transport.requested), 2)
+
+    def test_known_2(self):
+        self.assertEqual(review.scraper('1', 40, rate_limit=0, known=40), [])
+        self.assertEqual(self.transport.requested, [])
+
+    def test_known_3(self):
+        self.assertEqual(len(review.scraper('1', 40, rate_limit=0)), 40)
+
+
+class SinceReviewsTest(KnownReviewsTest):
+
+    # ffscraper.fanfic.review.scraper(since=...)
+
+    def test_since_1(self):
+        # The newest known review is the 19th: stop on the second page.
+        reviews = review.scraper('1', 40, rate_limit=0, since=[('18', 82)])
+        self.assertEqual([r[0] for r in reviews], [str(i) for i in range(18)])
+        self.assertEqual(len(self.transport.requested), 2)
+
+    def test_since_2(self):
+        self.assertEqual(review.scraper('1', 40, rate_limit=0,
+                                        since=[('0', '100')]), [])
+        self.assertEqual(len(self.transport.requested), 1)
+
+    def test_since_3(self):
+        # Nothing is known: every page is requested.
+        reviews = review.scraper('1', 40, rate_limit=0, since=[])
+        self.assertEqual(len(reviews), 40)
+        self.assertEqual(len(self.transport.requested), 3)
+
+
+class StreamTest(unittest.TestCase):
+
+    # ffscraper.fanfic.review.stream
+
+    def setUp(self):
+        from ffscraper import session
+        from ffscraper.tests.ffscrapertests import pages
+
+        # 37 reviews on 3 pages, although the metadata might say otherwise.
+        self.entries = [(str(i), '1', str(100 - i), 'Text') for i in range(37)]
+        self.session = session
+        self.transport = pages.Transport(dict(
+            ('https://www.fanfiction.net/r/1/0/' + str(p + 1) + '/',
+             pages.reviews('1', self.entries[15 * p:15 * (p + 1)],
+                           last_page=3))
+            for p in range(3)))
+        session.set_session(self.transport)
+
+    def tearDown(self):
+        self.session.set_session(None)
+
+    def test_stream_1(self):
+        reviews = list(review.stream('1', workers=2, rate_limit=0))
+        self.assertEqual(reviews, [tuple(e) for e in self.entries])
+        self.assertEqual(len(self.transport.requested), 3)
+
+    def test_stream_2(self):
+        reviews = list(review.stream('1', workers=2, rate_limit=0, fast=True))
+        self.assertEqual(reviews, [tuple(e) for e in self.entries])
+
+    def test_stream_3(self):
+        # Nothing is requested beyond the first page plus the prefetch.
+        reviews = review.stream('1', workers=1, rate_limit=0, prefetch=1)
+        self.assertEqual(next(reviews)[0], '0')
+        self.assertLessEqual(len(self.transport.requested), 1 + 1)
+        reviews.close()
+
+    def test_last_page_1(self):
+        from ffscraper.tests.ffscrapertests import pages
+
+        html = pages.reviews('1', self.entries[:15], last_page=9, chapter=2)
+        soup = bs(html, 'html.parser')
+        self.assertEqual(review._last_page(soup), 9)
+        self.assertEqual(review._read_page(html, fast=True)[1], 9)
+        self.assertEqual(review._read_page(pages.reviews('1', []))[1], 1)
+
+
+class ByChapterTest(unittest.TestCase):
+
+    # ffscraper.fanfic.review.by_chapter
+
+    def setUp(self):
+        from ffscraper import session
+        from ffscraper.tests.ffscrapertests import pages
+
+        # Chapter c has 10 * c reviews, 15 to a page.
+        site = {}
+        for c in range(1, 5):
+            entries = [(str(i), str(c), str(1000 * c - i), 'Text')
+                       for i in range(10 * c)]
+            last = (len(entries) - 1) // 15 + 1
+            for p in range(last):
+                site['https://www.fanfiction.net/r/1/' + str(c) + '/' +
+                     str(p + 1) + '/'] = pages.reviews(
+                         '1', entries[15 * p:15 * (p + 1)],
+                         last_page=last if last > 1 else None, chapter=c)
+
+        self.session = session
+        self.transport = pages.Transport(site)
+        session.set_session(self.transport)
+
+    def tearDown(self):
+        self.session.set_session(None)
+
+    def test_by_chapter_1(self):
+        reviews = review.by_chapter('1', 4, workers=2, rate_limit=0)
+        self.assertEqual(sorted(reviews), [1, 2, 3, 4])
+        self.assertEqual([len(reviews[c]) for c in range(1, 5)],
+                         [10, 20, 30, 40])
+        self.assertEqual(reviews[3][0], ('0', 3, 3000, 'Text'))
+        self.assertEqual(reviews[4][-1], ('39', 4, 3961, 'Text'))
+
+    def test_by_chapter_2(self):
+        reviews = review.by_chapter('1', 4, latest=2, rate_limit=0)
+        self.assertEqual(sorted(reviews), [3, 4])
+        self.assertFalse(any('/r/1/1/' in url or '/r/1/2/' in url
+                             for url in self.transport.requested))
+
+    def test_by_chapter_3(self):
+        reviews = review.by_chapter('1', [2], rate_limit=0, fast=True)
+        self.assertEqual(list(reviews), [2])
+        self.assertEqual(len(reviews[2]), 20)
+        self.assertEqual(review.by_chapter('1', 4, latest=0), {})
@@ -186,3 +186,132 @@ class TimestampsTest(unittest.TestCase):
         published, updated = story._timestamps(soup)
         self.assertEqual(published, '12392811')
         self.assertEqual(updated, '183818181')
+
+
+class ScrapeManyTest(unittest.TestCase):
+
+    def setUp(self):
+        from ffscraper import session
+        from ffscraper.tests.ffscrapertests import pages
+
+        self.session = session
+        session.set_session(pages.Transport({
+            'https://www.fanfiction.net/s/1': pages.story('1', aid='10'),
+            'https://www.fanfiction.net/s/2': pages.STORY_NOT_FOUND,
+            'https://www.fanfiction.net/s/3': pages.story('3', aid='30'),
+        }))
+
+    def tearDown(self):
+        self.session.set_session(None)
+
+    def test_scrape_many_1(self):
+        results = dict((sid, (s, e)) for sid, s, e in
+                       story.scrape_many(['1', '2', '3'], workers=2,
+                                         rate_limit=0))
+        self.assertEqual(results['1'][0]['aid'], '10')
+        self.assertEqual(results['3'][0]['aid'], '30')
+        self.assertIsNone(results['2'][0])
+        self.assertIsNotNone(results['2'][1])
+
+
+class FastPathTest(unittest.TestCase):
+
+    # ffscraper.fanfic.story._story_from_html
+
+    def test_fast_path_1(self):
+        from ffscraper.tests.ffscrapertests import pages
+
+        html = pages.story('5', aid='50')
+        self.assertEqual(story._story_from_html(html, '5'),
+                         story._story(bs(html, 'html.parser'), '5'))
+
+    def test_fast_path_2(self):
+        from ffscraper.tests.ffscrapertests import pages
+
+        self.assertIsNone(story._story_from_html(pages.STORY_NOT_FOUND, '5'))
+
+
+class StoryFieldsTest(unittest.TestCase):
+
+    # ffscraper.fanfic.story._story_fields
+
+    def setUp(self):
+        from ffscraper.tests.ffscrapertests import pages
+
+        self.pages = pages
+        self.soup = bs(pages.story('5', aid='50',
+                                   text='<p>Paragraph.</p>' * 300),
+                       'html.parser')
+
+    def _separate_searches(self, soup):
+        # What _story did before _story_fields: one search per field.
+        story._not_empty_fanfic(soup)
+        category, fandom = story._category_and_fandom(soup)
+        metadata = soup.find('span', {'class': 'xgray xcontrast_txt'}).text
+        published, updated = story._timestamps(soup)
+        aid = soup.find_all('a', {'class':
+                            'xcontrast_txt'})[2].get('href').split('/')[2]
+        return (category, fandom, story._title(soup), aid, metadata,
+                published, updated)
+
+    def test_story_fields_1(self):
+        fields = story._story_fields(self.soup)
+        self.assertEqual(self._separate_searches(self.soup),
+                         (fields['category'], fields['fandom'],
+                          fields['title'], fields['aid'], fields['metadata'],
+                          fields['published'], fields['updated']))
+        self.assertEqual(fields['abstract'],
+                         story._get_abstract_text(self.soup))
+        self.assertEqual(fields['story_text'],
+                         story._get_story_text(self.soup))
+        self.assertFalse(fields['empty'])
+
+    def test_story_fields_2(self):
+        soup = bs(self.pages.STORY_NOT_FOUND, 'html.parser')
+        self.assertTrue(story._story_fields(soup)['empty'])
+        self.assertRaises(Exception, story._story, soup, '5')
+
+
+class FieldsTest(unittest.TestCase):
+
+    # ffscraper.fanfic.story.scraper(fields=...)
+
+    def setUp(self):
+        from ffscraper import session
+        from ffscraper.tests.ffscrapertests import pages
+
+        self.session = session
+        session.set_session(pages.Transport({
+            'https://www.fanfiction.net/s/1': pages.story('1', aid='10'),
+        }))
+
+    def tearDown(self):
+        self.session.set_session(None)
+
+    def test_fields_1(self):
+        s = story.scraper('1', rate_limit=0)
+        self.assertEqual(sorted(s), sorted(story.DEFAULT_FIELDS))
+
+    def test_fields_2(self):
+        for fast in (False, True):
+            s = story.scraper('1', rate_limit=0, fast=fast,
+                              fields=['aid', 'fandom', 'published'])
+            self.assertEqual(s, {'aid': '10', 'fandom': 'Harry Potter',
+                                 'published': '1400000000'})
+
+    def test_fields_3(self):
+        s = story.scraper('1', rate_limit=0,
+                          fields=['abstract', 'story_text', 'metadata'])
+        self.assertEqual(s['abstract'].strip(), 'An abstract for the story.')
+        self.assertEqual(s['story_text'].strip(),
+                         'Once upon.Lots more story text.')
+        self.assertEqual(s['metadata']['language'], 'English')
+
+    def test_fields_4(self):
+        # Only the category links are parsed.
+        s = story.scraper('1', rate_limit=0, fields=['sid', 'category'])
+        self.assertEqual(s, {'sid': '1', 'category': 'Books'})
+
+    def test_fields_5(self):
+        self.assertRaises(ValueError, story.scraper, '1', 0, False,
+                          ['aid', 'colour'])
@@ -0,0 +1,94 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# This set of tests is interested in ffscraper.frontier
+sys.path.append('./')
+from ffscraper import frontier
+
+
+class FrontierTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'crawl.db')
+        self.frontier = frontier.Frontier(self.path)
+
+    def tearDown(self):
+        self.frontier.close()
+        frontier.set_frontier(None)
+        shutil.rmtree(self.directory)
+
+    def test_add_1(self):
+        self.assertEqual(self.frontier.add('story', ['1', '2', '3']), 3)
+        # Ids which are already in the frontier are ignored.
+        self.assertEqual(self.frontier.add('story', ['2', '3', '4']), 1)
+        self.assertEqual(self.frontier.add('user', ['2']), 1)
+        self.assertEqual(self.frontier.counts('story'), {'pending': 4})
+
+    def test_states_1(self):
+        self.frontier.add('story', ['1', '2', '3', '4'])
+        self.frontier.start('story', '1')
+        self.frontier.done('story', '1', {'people': ['9']})
+        self.frontier.start('story', '2')
+        self.frontier.fail('story', '2', ValueError('oops'))
+        self.frontier.start('story', '3')
+
+        self.assertEqual(self.frontier.states('story'),
+                         {'1': 'done', '2': 'failed', '3': 'in-flight',
+                          '4': 'pending'})
+        self.assertEqual(self.frontier.results('story'),
+                         {'1': {'people': ['9']}})
+        self.assertEqual(self.frontier.results('story', ['2']), {})
+
+        # Everything which is not done is left, in the order given.
+        self.assertEqual(self.frontier.remaining('story',
+                                                 ['4', '3', '2', '1']),
+                         ['4', '3', '2'])
+
+    def test_states_2(self):
+        # The state survives closing (or losing) the process.
+        self.frontier.add('user', ['7'])
+        self.frontier.done('user', '7')
+        self.frontier.close()
+
+        self.frontier = frontier.Frontier(self.path)
+        self.assertEqual(self.frontier.remaining('user', ['7', '8']), ['8'])
+
+    def test_clear_3(self):
+        # Cleared ids are scraped again once they are added back.
+        self.frontier.add('story', ['1', '2'])
+        self.frontier.done('story', '1')
+        self.frontier.done('story', '2')
+        self.frontier.add('user', ['7'])
+        self.frontier.done('user', '7')
+
+        self.frontier.clear('story', ['2'])
+        self.frontier.add('story', ['1', '2'])
+        self.assertEqual(self.frontier.remaining('story', ['1', '2']), ['2'])
+
+        self.frontier.clear('story')
+        self.assertEqual(self.frontier.counts('story'), {})
+        self.assertEqual(self.frontier.remaining('user', ['7']), [])
+
+    def test_set_frontier_1(self):
+        self.assertIsNone(frontier.get_frontier())
+        frontier.set_frontier(self.frontier)
+        self.assertIs(frontier.get_frontier(), self.frontier)
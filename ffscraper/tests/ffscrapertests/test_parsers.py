@@ -0,0 +1,140 @@
+# -*- coding: utf-8 -*-
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+from bs4 import BeautifulSoup as bs
+from bs4 import FeatureNotFound
+import sys
+import unittest
+
+# This set of tests checks that every extractor gives the same results no
+# matter which parser BeautifulSoup uses.
+sys.path.append('./')
+from ffscraper import storyid
+from ffscraper import utils
+from ffscraper.author import profile
+from ffscraper.fanfic import review
+from ffscraper.fanfic import story
+from ffscraper.tests.ffscrapertests import pages
+
+
+def installed(parser):
+    try:
+        bs('', parser)
+        return True
+    except FeatureNotFound:
+        return False
+
+
+STORY = pages.story('123', text=u'Hello, 進撃の巨人.')
+REVIEWS = pages.reviews('123', [('1', 10, 111, 'Most recent.'),
+                                (None, 2, 22, u'Anonymous — 2nd.')],
+                        last_page=4)
+PROFILE = pages.profile([('120', 'Pride and Prejudice'), ('5', 'Twilight')],
+                        ['7', '8'])
+LISTING = pages.listing([{'sid': '1', 'aid': '2', 'updated': 3,
+                          'published': 3},
+                         {'sid': '4', 'aid': '2', 'updated': 5,
+                          'published': 3}], last_page=12)
+
+# (page, extractor, arguments after the soup)
+EXTRACTORS = [
+    (STORY, story._category_and_fandom, ()),
+    (STORY, story._not_empty_fanfic, ()),
+    (pages.STORY_NOT_FOUND, story._not_empty_fanfic, ()),
+    (STORY, story._timestamps, ()),
+    (STORY, story._title, ()),
+    (STORY, story._metadata, ()),
+    (STORY, story._get_abstract_text, ()),
+    (STORY, story._get_story_text, ()),
+    (STORY, story._story, ('123',)),
+    (REVIEWS, lambda soup: list(review._reviews_in_table(soup)), ()),
+    (PROFILE, profile._favorite_stories, ()),
+    (PROFILE, profile._favorite_authors, ()),
+    (PROFILE, profile._profile, ('12',)),
+    (LISTING, storyid._get_sids, ()),
+    (LISTING, storyid._number_of_pages, ()),
+]
+
+
+class ParserEquivalenceTest(unittest.TestCase):
+
+    def check(self, parser):
+        if not installed(parser):
+            self.skipTest(parser + ' is not installed')
+
+        for page, extractor, args in EXTRACTORS:
+            expected = extractor(bs(page, 'html.parser'), *args)
+            reality = extractor(utils._soup(page, parser=parser), *args)
+            self.assertEqual(expected, reality)
+
+    def test_lxml_1(self):
+        self.check('lxml')
+
+    def test_html5lib_2(self):
+        self.check('html5lib')
+
+
+class SetParserTest(unittest.TestCase):
+
+    def tearDown(self):
+        utils.set_parser('html.parser')
+
+    def test_set_parser_1(self):
+        self.assertRaises(ValueError, utils.set_parser, 'not-a-parser')
+
+    def test_set_parser_2(self):
+        if not installed('lxml'):
+            self.skipTest('lxml is not installed')
+        utils.set_parser('lxml')
+        self.assertEqual(utils.get_parser(), 'lxml')
+        self.assertEqual(utils._soup('<p>a</p>').builder.NAME, 'lxml')
+
+
+class StrainerTest(unittest.TestCase):
+
+    # Partial parsing should not change what the extractors return.
+
+    def check(self, page, strainer, extractor, *args):
+        for parser in ('html.parser', 'lxml'):
+            if not installed(parser):
+                continue
+            full = utils._soup(page, parser=parser)
+            partial = utils._soup(page, parser=parser, parse_only=strainer)
+            self.assertEqual(extractor(full, *args),
+                             extractor(partial, *args))
+            self.assertTrue(len(str(partial)) < len(str(full)))
+
+    def test_story_1(self):
+        self.check(STORY, story._STRAINER, story._story, '123')
+
+    def test_story_not_found_2(self):
+        self.check(pages.STORY_NOT_FOUND, story._STRAINER,
+                   story._not_empty_fanfic)
+
+    def test_reviews_3(self):
+        self.check(REVIEWS, review._STRAINER,
+                   lambda soup: list(review._reviews_in_table(soup)))
+
+    def test_profile_4(self):
+        self.check(PROFILE, profile._STRAINER, profile._profile, '12')
+
+    def test_listing_5(self):
+        self.check(LISTING, storyid._STRAINER, storyid._get_sids)
+        self.check(LISTING, storyid._STRAINER, storyid._number_of_pages)
+
+    def test_story_text_skipped_6(self):
+        soup = utils._soup(STORY, parse_only=story._STRAINER)
+        self.assertIsNone(soup.find('div', {'id': 'storytext'}))
@@ -0,0 +1,268 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# This set of tests is interested in ffscraper.phases
+sys.path.append('./')
+from ffscraper import frontier
+from ffscraper import session
+from ffscraper import store
+from ffscraper.tests.ffscrapertests import pages
+
+FANFIC = 'https://www.fanfiction.net'
+
+
+def _reviews(sid, count):
+    # Newest first, 15 to a page: new reviews push older ones back.
+    entries = [(str(100 + i), '1', str(5000 + i), 'Review ' + str(i))
+               for i in reversed(range(count))]
+    return dict((FANFIC + '/r/' + sid + '/0/' + str(p + 1) + '/',
+                 pages.reviews(sid, entries[15 * p:15 * (p + 1)]))
+                for p in range(count // 15 + 1))
+
+
+def _site(reviews):
+    """
+    A fandom with two stories, where ``reviews`` is the number of reviews
+    on each one.
+    """
+    site = {FANFIC + '/book/Harry-Potter/': pages.listing(
+        [{'sid': sid, 'aid': '9', 'updated': '1500000000',
+          'published': '500', 'reviews': count}
+         for sid, count in sorted(reviews.items())])}
+    for sid, count in reviews.items():
+        site[FANFIC + '/s/' + sid] = pages.story(sid, reviews=count)
+        site.update(_reviews(sid, count))
+    return site
+
+
+class RecrawlTest(unittest.TestCase):
+
+    def setUp(self):
+        # phases logs to a file in the working directory.
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+
+        from ffscraper import phases
+        self.phases = phases
+        store.set_store(store.StoryStore('stories.db'))
+
+    def tearDown(self):
+        store.set_store(None)
+        session.set_session(None)
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def _recrawl(self, reviews):
+        transport = pages.Transport(_site(reviews))
+        session.set_session(transport)
+        self.phases.recrawl('/book/Harry-Potter/', output_file='facts.txt',
+                            rate_limit=0, log=False)
+        return [url for url in transport.requested
+                if not url.endswith('Harry-Potter/')]
+
+    def test_recrawl_1(self):
+        first = self._recrawl({'1': 20, '2': 3})
+        self.assertEqual(len(first), 2 + 2 + 1)
+
+        # Nothing changed: only the listing is requested.
+        self.assertEqual(self._recrawl({'1': 20, '2': 3}), [])
+
+        # Four new reviews on the second story: its story page (which may
+        # have changed too) and one page of reviews.
+        self.assertEqual(self._recrawl({'1': 20, '2': 7}),
+                         [FANFIC + '/s/2', FANFIC + '/r/2/0/1/'])
+
+        with open('facts.txt') as f:
+            reviewed = [l for l in f if l.startswith('reviewed') and
+                        '"2")' in l]
+        self.assertEqual(len(reviewed), 7)
+
+    def test_recrawl_3(self):
+        self._recrawl({'1': 20, '2': 3})
+        self.assertEqual(store.get_store().last_crawl('2')['newest'],
+                         ('102', '5002'))
+
+        # Two reviews were deleted and sixteen were added: the count says
+        # fourteen are new, but the newest known review is on page two.
+        store.get_store().put({'sid': '2', 'num_reviews': 17})
+        site = _site({'1': 20, '2': 17})
+        entries = [(str(200 + i), '1', str(6000 + i), 'New')
+                   for i in reversed(range(16))]
+        entries.append(('102', '1', '5002', 'Review 2'))
+        site[FANFIC + '/r/2/0/1/'] = pages.reviews('2', entries[:15])
+        site[FANFIC + '/r/2/0/2/'] = pages.reviews('2', entries[15:])
+        transport = pages.Transport(site)
+        session.set_session(transport)
+        self.phases.phase1(['2'], output_file='facts.txt', incremental=True,
+                           rate_limit=0, log=False)
+
+        self.assertEqual(transport.requested[-2:], [FANFIC + '/r/2/0/1/',
+                                                    FANFIC + '/r/2/0/2/'])
+        self.assertEqual(store.get_store().last_crawl('2')['newest'],
+                         ('215', '6015'))
+        with open('facts.txt') as f:
+            reviewed = [l for l in f if l.startswith('reviewed') and
+                        '"2")' in l]
+        self.assertEqual(len(reviewed), 3 + 16)
+
+    def test_recrawl_2(self):
+        store.set_store(None)
+        self.assertRaises(RuntimeError, self.phases.recrawl, '/book/HP/')
+
+    def test_rating_changed_5(self):
+        # A changed story's page is scraped again, so a new rating is seen.
+        self._recrawl({'1': 20, '2': 3})
+        site = _site({'1': 20, '2': 4})
+        site[FANFIC + '/s/2'] = site[FANFIC + '/s/2'].replace(
+            'Fiction  T', 'Fiction  M')
+        session.set_session(pages.Transport(site))
+        self.phases.recrawl('/book/Harry-Potter/', output_file='facts.txt',
+                            rate_limit=0, log=False)
+        self.assertEqual(store.get_store().get('2')['rating'],
+                         'Rated: Fiction  M')
+        with open('facts.txt') as f:
+            self.assertIn('rating("2","Rated:FictionM").',
+                          [l.strip() for l in f])
+
+    def test_frontier_6(self):
+        # With a frontier, a recrawl still scrapes the stories which changed.
+        frontier.set_frontier(frontier.Frontier('crawl.db'))
+        try:
+            self._recrawl({'1': 20, '2': 3})
+            self.assertEqual(self._recrawl({'1': 20, '2': 7}),
+                             [FANFIC + '/s/2', FANFIC + '/r/2/0/1/'])
+            self.assertEqual(self._recrawl({'1': 20, '2': 7}), [])
+        finally:
+            frontier.get_frontier().close()
+            frontier.set_frontier(None)
+
+    def test_listing_record_4(self):
+        # A record from a listing does not say what a story page says about
+        # the rating and genre, so the story page is still scraped.
+        transport = pages.Transport(_site({'2': 3}))
+        session.set_session(transport)
+        self.phases.phase0('/book/Harry-Potter/', rate_limit=0,
+                           records=True)
+        self.assertNotIn('rating', store.get_store().get('2'))
+
+        self.phases.phase1(['2'], output_file='facts.txt', rate_limit=0,
+                           log=False)
+        self.assertIn(FANFIC + '/s/2', transport.requested)
+        self.assertEqual(store.get_store().get('2')['rating'],
+                         'Rated: Fiction  T')
+
+
+class FrontierTest(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+
+        from ffscraper import phases
+        self.phases = phases
+        frontier.set_frontier(frontier.Frontier('crawl.db'))
+
+    def tearDown(self):
+        frontier.get_frontier().close()
+        frontier.set_frontier(None)
+        session.set_session(None)
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def _phase1(self, site):
+        transport = pages.Transport(site)
+        session.set_session(transport)
+        result = self.phases.phase1(['1', '2', '3'], output_file='facts.txt',
+                                    rate_limit=0, log=False)
+        return result, transport.requested
+
+    def test_frontier_1(self):
+        site = _site({'1': 2, '2': 2, '3': 2})
+        for sid in ('1', '2', '3'):
+            site[FANFIC + '/s/' + sid] = pages.story(sid, aid='4' + sid,
+                                                     reviews=2)
+        broken = dict(site)
+        del broken[FANFIC + '/s/2']
+
+        (people, fandoms, timestamps), _ = self._phase1(broken)
+        self.assertNotIn('42', people)
+        self.assertEqual(frontier.get_frontier().states('story'),
+                         {'1': 'done', '2': 'failed', '3': 'done'})
+
+        # Only the story which failed is scraped again, but everything
+        # learned from the others is still returned.
+        (people, fandoms, timestamps), requested = self._phase1(site)
+        self.assertEqual(requested, [FANFIC + '/s/2', FANFIC + '/r/2/0/1/'])
+        self.assertTrue(set(['41', '42', '43', '100', '101']) <= people)
+        self.assertEqual(fandoms, set(['Harry Potter']))
+        self.assertEqual(len(timestamps), 3 * (2 + 2))
+
+        # Nothing is left.
+        self.assertEqual(self._phase1(site)[1], [])
+
+        # Each story's predicates were written once.
+        with open('facts.txt') as f:
+            authors = [l.strip() for l in f if l.startswith('author')]
+        self.assertEqual(sorted(authors), ['author("41","1").',
+                                           'author("42","2").',
+                                           'author("43","3").'])
+
+    def test_frontier_2(self):
+        transport = pages.Transport({})
+        session.set_session(transport)
+        crawl = frontier.get_frontier()
+        crawl.add('user', ['7'])
+        crawl.done('user', '7')
+
+        # '8' fails (there is no profile to serve), '7' is not requested.
+        self.phases.phase3(set(['7', '8']), ['1'], output_file='facts.txt',
+                           log=False)
+        self.assertEqual(transport.requested,
+                         ['https://www.fanfiction.net/u/8'])
+        self.assertEqual(crawl.states('user'), {'7': 'done', '8': 'failed'})
+
+
+class Phase0Test(unittest.TestCase):
+
+    def setUp(self):
+        self.cwd = os.getcwd()
+        self.directory = tempfile.mkdtemp()
+        os.chdir(self.directory)
+
+        from ffscraper import phases
+        self.phases = phases
+
+    def tearDown(self):
+        os.chdir(self.cwd)
+        shutil.rmtree(self.directory)
+
+    def test_phase0_checkpoint_1(self):
+        from ffscraper import storyid
+
+        checkpoint = storyid.Checkpoint('listing.db')
+        try:
+            self.assertRaises(ValueError, self.phases.phase0,
+                              '/book/Harry-Potter/', records=True,
+                              checkpoint=checkpoint)
+        finally:
+            checkpoint.close()
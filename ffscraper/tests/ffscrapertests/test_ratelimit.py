@@ -0,0 +1,146 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import sys
+import threading
+import unittest
+
+# This set of tests is interested in ffscraper.ratelimit
+sys.path.append('./')
+from ffscraper import ratelimit
+
+
+class FakeClock(object):
+
+    def __init__(self):
+        self.now = 0.0
+
+    def __call__(self):
+        return self.now
+
+
+class RateLimiterTest(unittest.TestCase):
+
+    def test_reserve_1(self):
+        # 1. One request per two seconds: the second request waits.
+        clock = FakeClock()
+        limiter = ratelimit.RateLimiter(0.5, clock=clock)
+        self.assertEqual(limiter.reserve(), 0.0)
+        self.assertEqual(limiter.reserve(), 2.0)
+        # A third caller queues behind the second.
+        self.assertEqual(limiter.reserve(), 4.0)
+
+    def test_reserve_2(self):
+        # 2. Time spent between requests is not charged again.
+        clock = FakeClock()
+        limiter = ratelimit.RateLimiter(0.5, clock=clock)
+        limiter.reserve()
+        clock.now = 1.5
+        self.assertEqual(limiter.reserve(), 0.5)
+        clock.now = 10.0
+        self.assertEqual(limiter.reserve(), 0.0)
+
+    def test_reserve_3(self):
+        # 3. Bursts up to the capacity are allowed, but never more.
+        clock = FakeClock()
+        limiter = ratelimit.RateLimiter(1, capacity=3, clock=clock)
+        self.assertEqual([limiter.reserve() for _ in range(4)],
+                         [0.0, 0.0, 0.0, 1.0])
+        clock.now = 100.0
+        self.assertEqual([limiter.reserve() for _ in range(4)],
+                         [0.0, 0.0, 0.0, 1.0])
+
+    def test_acquire_threads_4(self):
+        # 4. Threads sharing a limiter are spaced out together.
+        clock = FakeClock()
+        slept = []
+        limiter = ratelimit.RateLimiter(10, clock=clock, sleep=slept.append)
+
+        threads = [threading.Thread(target=limiter.acquire) for _ in range(5)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(round(s, 6) for s in slept),
+                         [0.1, 0.2, 0.3, 0.4])
+
+    def test_bad_rate_5(self):
+        self.assertRaises(ValueError, ratelimit.RateLimiter, 0)
+
+
+class GetLimiterTest(unittest.TestCase):
+
+    def tearDown(self):
+        ratelimit.set_limiter(None)
+
+    def test_get_limiter_1(self):
+        # 1. Calls with the same rate_limit share a limiter.
+        self.assertIs(ratelimit.get_limiter(3), ratelimit.get_limiter(3))
+        self.assertIsNot(ratelimit.get_limiter(3), ratelimit.get_limiter(2))
+        self.assertIsNone(ratelimit.get_limiter(0))
+
+    def test_set_limiter_2(self):
+        # 2. An installed limiter overrides every rate_limit.
+        limiter = ratelimit.RateLimiter(5)
+        ratelimit.set_limiter(limiter)
+        self.assertIs(ratelimit.get_limiter(3), limiter)
+        self.assertIs(ratelimit.get_limiter(0), limiter)
+
+
+class SharedRateLimiterTest(unittest.TestCase):
+
+    def setUp(self):
+        import tempfile
+        self.directory = tempfile.mkdtemp()
+        self.path = self.directory + '/budget.db'
+
+    def tearDown(self):
+        import shutil
+        shutil.rmtree(self.directory)
+
+    def test_shared_budget_1(self):
+        # 1. Two limiters on the same file draw from one bucket.
+        clock = FakeClock()
+        first = ratelimit.SharedRateLimiter(self.path, 1, clock=clock)
+        second = ratelimit.SharedRateLimiter(self.path, 1, clock=clock)
+        self.assertEqual(first.reserve(), 0.0)
+        self.assertEqual(second.reserve(), 1.0)
+        self.assertEqual(first.reserve(), 2.0)
+
+    def test_shared_budget_2(self):
+        # 2. Separate names are separate budgets.
+        clock = FakeClock()
+        first = ratelimit.SharedRateLimiter(self.path, 1, name='a',
+                                            clock=clock)
+        second = ratelimit.SharedRateLimiter(self.path, 1, name='b',
+                                             clock=clock)
+        self.assertEqual(first.reserve(), 0.0)
+        self.assertEqual(second.reserve(), 0.0)
+
+    def test_shared_budget_threads_3(self):
+        # 3. Threads get their own connections to the database.
+        clock = FakeClock()
+        limiter = ratelimit.SharedRateLimiter(self.path, 4, clock=clock)
+        delays = []
+
+        def reserve():
+            delays.append(limiter.reserve())
+
+        threads = [threading.Thread(target=reserve) for _ in range(4)]
+        for t in threads:
+            t.start()
+        for t in threads:
+            t.join()
+        self.assertEqual(sorted(delays), [0.0, 0.25, 0.5, 0.75])
@@ -0,0 +1,131 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import shutil
+import sqlite3
+import sys
+import tempfile
+import unittest
+
+# This set of tests is interested in ffscraper.store
+sys.path.append('./')
+from ffscraper import session
+from ffscraper import store
+from ffscraper.author import profile
+from ffscraper.tests.ffscrapertests import pages
+
+
+class StoryStoreTest(unittest.TestCase):
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.path = os.path.join(self.directory, 'stories.db')
+
+    def tearDown(self):
+        store.set_store(None)
+        session.set_session(None)
+        shutil.rmtree(self.directory)
+
+    def test_put_get_1(self):
+        s = store.StoryStore(self.path)
+        s.put({'sid': '1', 'title': u'Caf\xe9', 'updated': '100'})
+        s.put({'sid': '2', 'title': 'Two'})
+
+        self.assertEqual(s.get('1'), {'sid': '1', 'title': u'Caf\xe9',
+                                      'updated': '100'})
+        self.assertIsNone(s.get('3'))
+        self.assertIn('2', s)
+        self.assertEqual(len(s), 2)
+        self.assertEqual(sorted(s.sids()), ['1', '2'])
+
+    def test_merge_2(self):
+        # Later records add to what was known, without erasing it.
+        s = store.StoryStore(self.path)
+        s.put({'sid': '1', 'category': 'Books', 'updated': '100'})
+        s.put({'sid': '1', 'updated': '200', 'category': None})
+        s.close()
+
+        s = store.StoryStore(self.path)
+        self.assertEqual(s.get('1'), {'sid': '1', 'category': 'Books',
+                                      'updated': '200'})
+
+    def test_changed_5(self):
+        s = store.StoryStore(self.path)
+        s.put({'sid': '1', 'updated': '100', 'num_reviews': 4})
+        self.assertTrue(s.changed('1'))
+        self.assertIsNone(s.last_crawl('1'))
+
+        s.mark_crawled('1', '100', 4)
+        self.assertEqual(s.last_crawl('1'),
+                         {'updated': 100, 'reviews': 4, 'newest': None})
+        self.assertFalse(s.changed('1'))
+
+        # A listing page says there is a new review.
+        s.put({'sid': '1', 'num_reviews': 5})
+        self.assertTrue(s.changed('1'))
+
+    def test_changed_6(self):
+        # A store made before the newest review was kept can still be used.
+        conn = sqlite3.connect(self.path)
+        with conn:
+            conn.execute('CREATE TABLE crawls (sid TEXT PRIMARY KEY, '
+                         'updated INTEGER, reviews INTEGER, crawled REAL)')
+            conn.execute("INSERT INTO crawls VALUES ('1', 100, 4, 0.0)")
+        conn.close()
+
+        s = store.StoryStore(self.path)
+        self.assertEqual(s.last_crawl('1'),
+                         {'updated': 100, 'reviews': 4, 'newest': None})
+        s.mark_crawled('2', '300', 6, ('12', '5000'))
+        self.assertEqual(s.last_crawl('2'),
+                         {'updated': 300, 'reviews': 6,
+                          'newest': ('12', '5000')})
+
+    def test_remember_3(self):
+        # Without a store, remember does nothing.
+        store.remember([{'sid': '1'}])
+
+        s = store.StoryStore(self.path)
+        store.set_store(s)
+        store.remember([{'sid': '1'}])
+        self.assertIn('1', s)
+
+    def test_profile_4(self):
+        # Favorites on a profile are saved into the store.
+        s = store.StoryStore(self.path)
+        store.set_store(s)
+        session.set_session(pages.Transport({
+            'https://www.fanfiction.net/u/5':
+                pages.profile([('10', 'Harry Potter'), ('11', 'Naruto')]),
+        }))
+
+        user = profile.scraper('5', rate_limit=0)
+        self.assertEqual(len(user['favorite_records']), 2)
+
+        record = s.get('11')
+        self.assertEqual(record['fandom'], 'Naruto')
+        self.assertEqual(record['title'], 'Story 11')
+        self.assertEqual(record['aid'], '99')
+        self.assertEqual((record['published'], record['updated']),
+                         ('1262400000', '1500000000'))
+        self.assertEqual(record['num_reviews'], 3)
+        self.assertEqual(record['metadata']['words'], 2048)
+        self.assertEqual(record['metadata']['status'], 'Complete')
+        self.assertEqual(record['metadata']['rating'], 'T')
+        self.assertEqual(record['metadata']['genres'], ['Romance'])
+        # Only a story page says what 'rating' and 'genre' are.
+        self.assertNotIn('rating', record)
+        self.assertNotIn('genre', record)
@@ -111,3 +111,275 @@ class NumberOfPagesTest(unittest.TestCase):
         </center>""", 'html.parser')
         number_of_pages = storyid._number_of_pages(soup)
         self.assertEqual(99, number_of_pages)
+
+
+class FastPathTest(unittest.TestCase):
+
+    # ffscraper.storyid._sids_from_html
+
+    def test_fast_path_1(self):
+        from ffscraper.tests.ffscrapertests import pages
+
+        html = pages.listing([{'sid': str(s), 'aid': '7', 'updated': '2',
+                               'published': '1'} for s in (10, 11, 12)],
+                             last_page=40)
+        self.assertEqual(storyid._sids_from_html(html),
+                         (['10', '11', '12'], 40))
+        self.assertEqual(storyid._read_listing(html, fast=True),
+                         storyid._read_listing(html))
+
+    def test_fast_path_2(self):
+        # An stitle link which does not match the pattern.
+        html = """<a href="/s/10/1/Story" class="stitle">Story</a>"""
+        self.assertIsNone(storyid._sids_from_html(html))
+        self.assertEqual(storyid._read_listing(html, fast=True),
+                         (['10'], 0))
+
+
+class HarvestTest(unittest.TestCase):
+
+    # ffscraper.storyid.harvest
+
+    def setUp(self):
+        from ffscraper import session
+        from ffscraper.tests.ffscrapertests import pages
+
+        url = 'https://www.fanfiction.net/book/Harry-Potter/'
+        entries = [[{'sid': str(p * 10 + i), 'aid': str(i), 'updated': '9',
+                     'published': '8', 'reviews': i} for i in range(3)]
+                   for p in range(3)]
+
+        self.url = url
+        self.session = session
+        self.transport = pages.Transport({
+            url: pages.listing(entries[0], last_page=3),
+            url + '?&p=2': pages.listing(entries[1], last_page=3),
+            url + '?&p=3': pages.listing(entries[2], last_page=3),
+        })
+        session.set_session(self.transport)
+
+    def tearDown(self):
+        self.session.set_session(None)
+
+    def test_harvest_1(self):
+        records = storyid.harvest(self.url, rate_limit=0)
+
+        self.assertEqual([r['sid'] for r in records],
+                         ['0', '1', '2', '10', '11', '12', '20', '21', '22'])
+        self.assertEqual(records[4]['aid'], '1')
+        self.assertEqual(records[4]['title'], 'Story 11')
+        self.assertEqual(records[4]['summary'], 'Summary of 11.')
+        self.assertEqual((records[4]['updated'], records[4]['published']),
+                         ('9', '8'))
+        self.assertEqual(records[4]['metadata']['rating'], 'K+')
+        self.assertEqual(records[4]['num_reviews'], 1)
+        self.assertNotIn('num_reviews', records[3])
+
+        # Each page is only requested once.
+        self.assertEqual(len(self.transport.requested), 3)
+
+    def test_harvest_2(self):
+        records = storyid.harvest(self.url, rate_limit=0, max_pages=2)
+        self.assertEqual(len(records), 6)
+
+
+class StreamTest(unittest.TestCase):
+
+    # ffscraper.storyid.stream
+
+    def setUp(self):
+        from ffscraper import session
+        from ffscraper.tests.ffscrapertests import pages
+
+        url = 'https://www.fanfiction.net/book/Harry-Potter/'
+        site = {}
+        for p in range(1, 7):
+            entries = [{'sid': str(p * 10 + i), 'aid': '1', 'updated': '9',
+                        'published': '8'} for i in range(3)]
+            site[url + ('?&p=' + str(p) if p > 1 else '')] = pages.listing(
+                entries, last_page=6)
+
+        self.url = url
+        self.session = session
+        self.transport = pages.Transport(site)
+        session.set_session(self.transport)
+
+    def tearDown(self):
+        self.session.set_session(None)
+
+    def test_stream_1(self):
+        sids = list(storyid.stream(self.url, workers=3, rate_limit=0))
+        self.assertEqual(sids, [str(p * 10 + i) for p in range(1, 7)
+                                for i in range(3)])
+        # The first page is not requested again.
+        self.assertEqual(len(self.transport.requested), 6)
+        self.assertNotIn(self.url + '?&p=1', self.transport.requested)
+
+    def test_stream_2(self):
+        self.assertEqual(storyid.scrape(self.url, rate_limit=0, max_pages=2,
+                                        fast=True),
+                         ['10', '11', '12', '20', '21', '22'])
+        self.assertEqual(len(self.transport.requested), 2)
+
+    def test_stream_3(self):
+        from ffscraper.tests.ffscrapertests import pages
+
+        self.transport.pages[self.url] = pages.listing(
+            [{'sid': '5', 'aid': '1', 'updated': '9', 'published': '8'}])
+        self.assertEqual(storyid.scrape(self.url, rate_limit=0), ['5'])
+
+
+class CheckpointTest(unittest.TestCase):
+
+    # ffscraper.storyid.checkpoint
+
+    def setUp(self):
+        import os
+        import tempfile
+        from ffscraper import session
+        from ffscraper.tests.ffscrapertests import pages
+
+        url = 'https://www.fanfiction.net/book/Harry-Potter/?&srt=1&r=10'
+        self.site = {}
+        for p in range(1, 6):
+            entries = [{'sid': str(p * 10 + i), 'aid': '1', 'updated': '9',
+                        'published': '8'} for i in range(2)]
+            self.site[url + ('&p=' + str(p) if p > 1 else '')] = \
+                pages.listing(entries, last_page=5)
+
+        self.url = url
+        self.session = session
+        self.directory = tempfile.mkdtemp()
+        self.checkpoint = storyid.Checkpoint(
+            os.path.join(self.directory, 'listing.db'))
+
+    def tearDown(self):
+        import shutil
+        self.session.set_session(None)
+        self.checkpoint.close()
+        shutil.rmtree(self.directory)
+
+    def _scrape(self, site, **kwargs):
+        from ffscraper.tests.ffscrapertests import pages
+
+        transport = pages.Transport(site)
+        self.session.set_session(transport)
+        sids = storyid.scrape(self.url, rate_limit=0, workers=1,
+                              checkpoint=self.checkpoint, **kwargs)
+        return sids, transport.requested
+
+    def test_checkpoint_1(self):
+        # The fourth page fails.
+        broken = dict(self.site)
+        del broken[self.url + '&p=4']
+        self.assertRaises(KeyError, self._scrape, broken)
+        self.assertEqual(sorted(self.checkpoint.pages(self.url)), [1, 2, 3])
+        self.assertEqual(self.checkpoint.number_of_pages(self.url), 5)
+
+        # Running again only requests the pages which are missing.
+        sids, requested = self._scrape(self.site)
+        self.assertEqual(sids, [str(p * 10 + i) for p in range(1, 6)
+                                for i in range(2)])
+        self.assertEqual(requested, [self.url + '&p=4', self.url + '&p=5'])
+
+        sids, requested = self._scrape(self.site)
+        self.assertEqual(len(sids), 10)
+        self.assertEqual(requested, [])
+
+    def test_checkpoint_2(self):
+        # max_pages still applies when resuming.
+        self.assertEqual(self._scrape(self.site, max_pages=2)[0],
+                         ['10', '11', '20', '21'])
+        sids, requested = self._scrape(self.site, max_pages=3)
+        self.assertEqual(sids, ['10', '11', '20', '21', '30', '31'])
+        self.assertEqual(requested, [self.url + '&p=3'])
+
+    def test_checkpoint_3(self):
+        self._scrape(self.site, max_pages=2)
+        self.checkpoint.clear(self.url)
+        self.assertEqual(self.checkpoint.pages(self.url), {})
+        self.assertEqual(len(self._scrape(self.site, max_pages=2)[1]), 2)
+
+    def test_page_url_1(self):
+        self.assertEqual(storyid._page_url('/book/HP/', 2), '/book/HP/?&p=2')
+        self.assertEqual(storyid._page_url('/book/HP/?&srt=1', 3),
+                         '/book/HP/?&srt=1&p=3')
+
+
+class QueryTest(unittest.TestCase):
+
+    # ffscraper.storyid.query
+
+    def test_query_1(self):
+        self.assertEqual(storyid.query('/book/Coraline/'),
+                         'https://www.fanfiction.net/book/Coraline/')
+        self.assertEqual(storyid.query('/book/Coraline/', sort='updated',
+                                       rating='K-T', status='complete',
+                                       language='English'),
+                         'https://www.fanfiction.net/book/Coraline/'
+                         '?&srt=1&r=103&s=2&lan=1')
+
+    def test_query_2(self):
+        self.assertRaises(ValueError, storyid.query, '/book/Coraline/',
+                          rating='R')
+
+    def test_query_3(self):
+        # Page links keep the filters.
+        url = storyid.query('/book/Coraline/', rating='M')
+        self.assertEqual(storyid._page_url(url, 2), url + '&p=2')
+
+
+class UpdatedSinceTest(unittest.TestCase):
+
+    # ffscraper.storyid.stream(updated_since=...)
+
+    def setUp(self):
+        from ffscraper import session
+        from ffscraper.tests.ffscrapertests import pages
+
+        # 10 pages of 3 stories, updated one second apart, newest first.
+        self.url = storyid.query('/book/Harry-Potter/', sort='updated')
+        site = {}
+        for p in range(1, 11):
+            entries = [{'sid': str(p * 10 + i), 'aid': '1',
+                        'updated': str(1000 - 3 * p - i), 'published': '8'}
+                       for i in range(3)]
+            site[self.url + ('&p=' + str(p) if p > 1 else '')] = \
+                pages.listing(entries, last_page=10)
+
+        self.session = session
+        self.transport = pages.Transport(site)
+        session.set_session(self.transport)
+
+    def tearDown(self):
+        self.session.set_session(None)
+
+    def test_updated_since_1(self):
+        # Stories 10..31 were updated at 997..990.
+        sids = storyid.scrape(self.url, rate_limit=0, workers=1,
+                              updated_since=990)
+        self.assertEqual(sids, ['10', '11', '12', '20', '21', '22', '30',
+                                '31'])
+        # Paging stopped early: the pool only reads a couple of pages ahead.
+        self.assertLess(len(self.transport.requested), 10)
+
+    def test_updated_since_2(self):
+        self.assertEqual(storyid.scrape(self.url, rate_limit=0,
+                                        updated_since=2000), [])
+
+    def test_updated_since_harvest_4(self):
+        records = storyid.harvest(self.url, rate_limit=0, updated_since=990)
+        self.assertEqual([r['sid'] for r in records],
+                         ['10', '11', '12', '20', '21', '22', '30', '31'])
+        # The page with the first older story is the last one requested.
+        self.assertEqual(len(self.transport.requested), 3)
+
+        self.assertEqual(storyid.harvest(self.url, rate_limit=0,
+                                         updated_since=2000), [])
+
+    def test_updated_since_3(self):
+        url = storyid.query('/book/Harry-Potter/', sort='reviews')
+        self.assertRaises(ValueError, storyid.scrape, url,
+                          updated_since=100)
+        self.assertRaises(ValueError, storyid.harvest, url,
+                          updated_since=100)
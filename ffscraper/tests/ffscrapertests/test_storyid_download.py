@@ -0,0 +1,148 @@
+
+#   Copyright (c) 2018-2019 Alexander L. Hayes (@hayesall)
+#
+#   Licensed under the Apache License, Version 2.0 (the "License");
+#   you may not use this file except in compliance with the License.
+#   You may obtain a copy of the License at
+#
+#       http://www.apache.org/licenses/LICENSE-2.0
+#
+#   Unless required by applicable law or agreed to in writing, software
+#   distributed under the License is distributed on an "AS IS" BASIS,
+#   WITHOUT WARRANTIES OR CONDITIONS OF ANY KIND, either express or implied.
+#   See the License for the specific language governing permissions and
+#   limitations under the License.
+
+import os
+import shutil
+import sys
+import tempfile
+import unittest
+
+# This set of tests is interested in ffscraper.storyid.download
+sys.path.append('./')
+from ffscraper import session
+from ffscraper.storyid import download
+from ffscraper.tests.ffscrapertests import pages
+
+FANFIC = 'https://www.fanfiction.net/'
+
+
+def _index(fandoms):
+    """
+    A category index. ``fandoms`` is a list of (name, href, count).
+    """
+    entries = u''.join(
+        u"<div><a href=\"{1}\" title=\"{0}\">{0}</a> "
+        u"<span class='gray'>({2})</span></div>".format(name, href, count)
+        for name, href, count in fandoms)
+    return (u"<html><body><div id=content_wrapper><div id='list_output'>"
+            u"<table><tr><td>{0}</td></tr></table></div></div>"
+            u"</body></html>".format(entries))
+
+
+def _site(books=(('Harry Potter', '/book/Harry-Potter/', '824K'),
+                 ('Harry Dresden', '/book/Dresden-Files/', '1.2K'),
+                 ('Hobbit', '/book/Hobbit/', '12,345'))):
+    site = {}
+    for category in download.CATEGORIES:
+        site[FANFIC + category + '/'] = _index([])
+        site[FANFIC + 'crossovers/' + category + '/'] = _index([])
+    site[FANFIC + 'book/'] = _index(books)
+    site[FANFIC + 'crossovers/book/'] = _index(
+        [('Harry Potter', '/crossovers/Harry-Potter/224/', '31K')])
+    return site
+
+
+class CatalogTest(unittest.TestCase):
+
+    # ffscraper.storyid.download.Catalog
+
+    def setUp(self):
+        self.directory = tempfile.mkdtemp()
+        self.now = [1000.0]
+        self.catalog = download.Catalog(
+            os.path.join(self.directory, 'fandoms.db'),
+            clock=lambda: self.now[0])
+        self.transport = pages.Transport(_site())
+        session.set_session(self.transport)
+
+    def tearDown(self):
+        session.set_session(None)
+        self.catalog.close()
+        shutil.rmtree(self.directory)
+
+    def test_count_1(self):
+        self.assertEqual(download._count('(57)'), 57)
+        self.assertEqual(download._count('(1.2K)'), 1200)
+        self.assertEqual(download._count('(12,345)'), 12345)
+        self.assertEqual(download._count('(1M)'), 1000000)
+        self.assertIsNone(download._count(None))
+
+    def test_refresh_1(self):
+        self.catalog.refresh(workers=3, rate_limit=0)
+        self.assertEqual(len(self.transport.requested), 18)
+        self.assertEqual(len(self.catalog), 4)
+
+        found = self.catalog.find('harry potter')
+        self.assertEqual(found, [{'name': 'Harry Potter',
+                                  'url': FANFIC + 'book/Harry-Potter/',
+                                  'category': 'book', 'crossovers': False,
+                                  'stories': 824000}])
+        self.assertEqual(self.catalog.find('Harry Potter', crossovers=True)
+                         [0]['url'], FANFIC + 'crossovers/Harry-Potter/224/')
+
+    def test_refresh_2(self):
+        self.catalog.refresh(rate_limit=0)
+
+        # Nothing is old enough to download again.
+        self.now[0] += 60
+        self.assertEqual(self.catalog.refresh(max_age=3600, rate_limit=0),
+                         [])
+        self.assertEqual(len(self.transport.requested), 18)
+
+        # A fandom was removed from the books.
+        self.transport.pages = _site(
+            [('Harry Potter', '/book/Harry-Potter/', '825K')])
+        self.now[0] += 3600
+        self.catalog.refresh(categories=['book'], crossovers=False,
+                             max_age=3600, rate_limit=0)
+        self.assertEqual([f['name'] for f in self.catalog.prefix('h')],
+                         ['Harry Potter'])
+        self.assertEqual(self.catalog.find('Harry Potter')[0]['stories'],
+                         825000)
+
+    def test_lookup_1(self):
+        self.catalog.refresh(rate_limit=0)
+
+        # Most stories first.
+        self.assertEqual([f['name'] for f in self.catalog.prefix('HAR')],
+                         ['Harry Potter', 'Harry Dresden'])
+        self.assertEqual([f['name'] for f in self.catalog.prefix('h', 1)],
+                         ['Harry Potter'])
+        self.assertEqual(self.catalog.prefix('x'), [])
+
+        self.assertEqual(self.catalog.fuzzy('Hary Poter')[0]['name'],
+                         'Harry Potter')
+        self.assertEqual(self.catalog.url('Hobit'), FANFIC + 'book/Hobbit/')
+        self.assertEqual(self.catalog.url('Hobbit', category='book'),
+                         FANFIC + 'book/Hobbit/')
+        self.assertIsNone(self.catalog.url('Something Else Entirely'))
+
+
+class DownloadTest(unittest.TestCase):
+
+    # ffscraper.storyid.download.download
+
+    def tearDown(self):
+        session.set_session(None)
+
+    def test_download_1(self):
+        session.set_session(pages.Transport(_site()))
+        fandoms = download.download(rate_limit=0)
+        self.assertEqual(sorted(fandoms), sorted(download.CATEGORIES))
+        self.assertEqual(fandoms['book'][0],
+                         {'name': 'Harry Potter',
+                          'address': FANFIC + 'book/Harry-Potter/'})
+        self.assertEqual(len(fandoms['book']), 3)
+        self.assertEqual(fandoms['anime'], [])
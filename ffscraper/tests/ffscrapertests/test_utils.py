@@ -21,3 +21,130 @@ import unittest
 sys.path.append('./')
 
 from ffscraper import utils
+from ffscraper import session
+
+
+class LocalResponse(object):
+
+    def __init__(self, text):
+        self.text = text
+
+    def raise_for_status(self):
+        pass
+
+
+class LocalTransport(object):
+    """Stand-in for requests.Session which serves pages from a dict."""
+
+    def __init__(self, pages):
+        self.pages = pages
+        self.requested = []
+
+    def get(self, url, timeout=None):
+        self.requested.append((url, timeout))
+        return LocalResponse(self.pages[url])
+
+
+class SoupifyTest(unittest.TestCase):
+
+    def tearDown(self):
+        session.set_session(None, timeout=session.DEFAULT_TIMEOUT)
+
+    def test_soupify_shared_session_1(self):
+        # 1. soupify requests pages through the injected session.
+        transport = LocalTransport({'https://a/': '<b>Hello</b>'})
+        session.set_session(transport, timeout=5)
+
+        soup = utils.soupify('https://a/', rate_limit=0)
+        self.assertEqual(soup.find('b').text, 'Hello')
+        self.assertEqual(transport.requested, [('https://a/', 5)])
+
+    def test_soupify_explicit_session_2(self):
+        # 2. An explicit session takes priority over the shared one.
+        shared = LocalTransport({})
+        explicit = LocalTransport({'https://b/': '<i>World</i>'})
+        session.set_session(shared)
+
+        soup = utils.soupify('https://b/', rate_limit=0, session=explicit)
+        self.assertEqual(soup.find('i').text, 'World')
+        self.assertEqual(shared.requested, [])
+
+    def test_new_session_3(self):
+        # 3. Pooled adapters are mounted for both schemes.
+        s = session.new_session(pool_maxsize=7, keep_alive=False)
+        adapter = s.get_adapter('https://www.fanfiction.net/')
+        self.assertEqual(adapter._pool_maxsize, 7)
+        self.assertEqual(s.headers['Connection'], 'close')
+
+
+class ScrapeManyTest(unittest.TestCase):
+
+    def test_scrape_many_1(self):
+        # 1. Every id is scraped once; errors are returned, not raised.
+        def scraper(i, offset=0):
+            if i == 3:
+                raise ValueError(i)
+            return i + offset
+
+        results = sorted(utils.scrape_many(scraper, range(10), workers=3,
+                                           offset=100),
+                         key=lambda r: r[0])
+        self.assertEqual([r[0] for r in results], list(range(10)))
+        self.assertEqual(results[0], (0, 100, None))
+        self.assertIsNone(results[3][1])
+        self.assertIsInstance(results[3][2], ValueError)
+
+    def test_scrape_many_lazy_2(self):
+        # 2. Ids are taken from the iterable a few at a time.
+        taken = []
+
+        def ids():
+            for i in range(1000):
+                taken.append(i)
+                yield i
+
+        results = utils.scrape_many(lambda i: i, ids(), workers=2)
+        next(results)
+        results.close()
+        self.assertTrue(len(taken) < 10)
+
+    def test_scrape_many_sequential_3(self):
+        # 3. One worker, or no concurrent.futures (Python 2.7 without the
+        #    futures backport): ids are scraped in order, in this thread.
+        import threading
+
+        def scraper(i):
+            if i == 2:
+                raise ValueError(i)
+            return threading.current_thread()
+
+        self.assertIsInstance(utils._executor(1), utils._Sequential)
+        results = list(utils.scrape_many(scraper, range(4), workers=1))
+        self.assertEqual([r[0] for r in results], [0, 1, 2, 3])
+        self.assertIs(results[0][1], threading.current_thread())
+        self.assertIsInstance(results[2][2], ValueError)
+
+        futures = sys.modules.get('concurrent.futures')
+        sys.modules['concurrent.futures'] = None
+        try:
+            self.assertIsInstance(utils._executor(4), utils._Sequential)
+            results = list(utils.scrape_many(scraper, range(4), workers=4))
+            self.assertEqual([r[0] for r in results], [0, 1, 2, 3])
+        finally:
+            if futures is None:
+                del sys.modules['concurrent.futures']
+            else:
+                sys.modules['concurrent.futures'] = futures
+
+    def test_scrape_many_ordered_4(self):
+        # 4. With ordered=True, results come back in the order of the ids
+        #    even when later ids finish first.
+        import time
+
+        def scraper(i):
+            time.sleep(0.01 * (5 - i))
+            return i * i
+
+        results = list(utils.scrape_many(scraper, range(5), workers=5,
+                                         ordered=True))
+        self.assertEqual(results, [(i, i * i, None) for i in range(5)])
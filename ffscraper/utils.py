@@ -13,8 +13,17 @@
 #   See the License for the specific language governing permissions and
 #   limitations under the License.
 
+from collections import OrderedDict
+import itertools
+import re
 import sys
 
+try:
+    from html import unescape as _unescape
+except ImportError:
+    from HTMLParser import HTMLParser
+    _unescape = HTMLParser().unescape
+
 """
 +-------------+--------------------------------------------------+
 |   **Name**  |               **Description**                    |
@@ -23,6 +32,141 @@ import sys
 +-------------+--------------------------------------------------+
 """
 
+_TAG = re.compile(r'<[^>]*>')
+
+
+def _text(html):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the text in a fragment of html (tags removed, entities decoded),
+    the same as BeautifulSoup's ``.text`` for simple markup. Used by the
+    regex-based extractors which skip building a soup.
+
+    >>> _text("<b class='x'>Fish &amp; Chips</b>")
+    'Fish & Chips'
+    """
+    return _unescape(_TAG.sub('', html))
+
+
+# BeautifulSoup tree builders which the scrapers are tested against.
+PARSERS = ('html.parser', 'lxml', 'html5lib')
+
+_parser = 'html.parser'
+
+
+def set_parser(parser):
+    """
+    .. versionadded:: 0.3.0
+
+    Choose the parser BeautifulSoup uses for every page. ``'html.parser'``
+    (the default) is always available, ``'lxml'`` is several times faster
+    but needs the lxml package, and ``'html5lib'`` (slowest) needs html5lib.
+
+    :param parser: One of :data:`PARSERS`.
+    :type parser: str.
+
+    :raises ValueError: If the parser is unknown or not installed.
+
+    .. code-block:: python
+
+                    import ffscraper as ffs
+
+                    ffs.utils.set_parser('lxml')
+    """
+    global _parser
+
+    from bs4 import BeautifulSoup as bs
+    from bs4 import FeatureNotFound
+
+    if parser not in PARSERS:
+        raise ValueError('Unknown parser: ' + str(parser))
+    try:
+        bs('', parser)
+    except FeatureNotFound:
+        raise ValueError('Parser is not installed: ' + parser)
+
+    _parser = parser
+
+
+class Strainer(object):
+    """
+    .. versionadded:: 0.3.0
+
+    Tells BeautifulSoup to only build the parts of a page which a scraper
+    will look at. Tags for which ``match(name, attrs)`` is true are kept
+    (along with everything inside of them); everything else is skipped while
+    parsing, which saves time and memory on large pages.
+
+    This works like ``bs4.SoupStrainer``, but may match on any combination of
+    tag names and attributes. ``attrs`` is the raw dictionary of attributes,
+    so use :func:`Strainer.classes` to read the class attribute.
+
+    .. code-block:: python
+
+                    from ffscraper.utils import soupify, Strainer
+
+                    # Only build the review table.
+                    soup = soupify('https://www.fanfiction.net/r/123/',
+                                   parse_only=Strainer(
+                                       lambda name, attrs: name == 'tbody'))
+
+    .. note:: html5lib does not support partial parsing, so the strainer is
+              ignored (and the whole page is built) with that parser.
+    """
+
+    def __init__(self, match):
+        self.match = match
+
+    @staticmethod
+    def classes(attrs):
+        """
+        Returns the list of classes in a raw dictionary of attributes.
+        """
+        value = attrs.get('class') or []
+        if isinstance(value, (list, tuple)):
+            return list(value)
+        return value.split()
+
+    def soup_strainer(self):
+        """
+        Returns a ``bs4.SoupStrainer`` applying this strainer's rule.
+        """
+        from bs4 import SoupStrainer
+
+        match = self.match
+
+        class _SoupStrainer(SoupStrainer):
+
+            # Older versions of bs4 ask search_tag about each tag.
+            def search_tag(self, markup_name=None, markup_attrs={}):
+                if hasattr(markup_name, 'attrs'):
+                    return match(markup_name.name, markup_attrs or
+                                 markup_name.attrs) and markup_name
+                return match(markup_name, markup_attrs or {}) and markup_name
+
+            # bs4 4.13 and newer asks these instead.
+            def allow_tag_creation(self, nsprefix, name, attrs):
+                return bool(match(name, attrs or {}))
+
+            def allow_string_creation(self, string):
+                return False
+
+            @property
+            def includes_everything(self):
+                return False
+
+        return _SoupStrainer()
+
+
+def get_parser():
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the name of the parser used by :func:`soupify`.
+    """
+    return _parser
+
 
 def ImportStoryIDs(path_to_file):
     """
@@ -69,14 +213,262 @@ def ImportStoryIDs(path_to_file):
     return sids
 
 
-def soupify(url, rate_limit=3):
+class _Finished(object):
+    """
+    .. versionadded:: 0.3.0
+
+    A call which was run as soon as it was submitted, standing in for a
+    ``concurrent.futures.Future``.
+    """
+
+    def __init__(self, fn, args, kwargs):
+        self._result, self._error = None, None
+        try:
+            self._result = fn(*args, **kwargs)
+        except Exception as error:
+            self._error = error
+
+    def result(self):
+        if self._error is not None:
+            raise self._error
+        return self._result
+
+    def exception(self):
+        return self._error
+
+    def cancel(self):
+        return False
+
+
+class _Sequential(object):
     """
     .. versionadded:: 0.3.0
 
-    Helper function for returning the soup from a url.
+    Stands in for a ``ThreadPoolExecutor``, running each call in the calling
+    thread as soon as it is submitted.
+    """
+
+    def submit(self, fn, *args, **kwargs):
+        return _Finished(fn, args, kwargs)
+
+    def shutdown(self, wait=True):
+        pass
+
+
+def _executor(workers):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns a pool of ``workers`` threads, or a :class:`_Sequential` stand-in
+    if only one worker is needed or if ``concurrent.futures`` is missing
+    (on Python 2.7 it comes from the ``futures`` backport).
+    """
+    if workers > 1:
+        try:
+            from concurrent.futures import ThreadPoolExecutor
+        except ImportError:
+            pass
+        else:
+            return ThreadPoolExecutor(max_workers=workers)
+    return _Sequential()
+
+
+def _first_completed(futures):
+    """
+    .. versionadded:: 0.3.0
+
+    Waits until at least one of ``futures`` is finished, then returns the
+    ones which are.
+    """
+    if all(isinstance(f, _Finished) for f in futures):
+        return list(futures)
+
+    from concurrent.futures import FIRST_COMPLETED, wait
+    return wait(futures, return_when=FIRST_COMPLETED)[0]
+
+
+def scrape_many(scraper, ids, workers=4, ordered=False, prefetch=None,
+                **kwargs):
+    """
+    .. versionadded:: 0.3.0
+
+    Run ``scraper`` over many ids on a pool of threads, yielding results as
+    soon as each one finishes (not necessarily in the order of ``ids``,
+    unless ``ordered`` is set).
+
+    Every thread shares the pooled session from :mod:`ffscraper.session` and
+    the rate limiter from :mod:`ffscraper.ratelimit`, so the politeness of
+    the scraper does not change with the number of workers. Only a few ids
+    are taken from ``ids`` at a time, so it may be a long (or lazy) iterable.
+
+    :param scraper: Function taking an id as its first argument, such as
+                    :func:`ffscraper.fanfic.story.scraper`.
+    :type scraper: function
+    :param ids: Iterable of ids to scrape.
+    :type ids: iterable of str.
+    :param workers: Number of threads.
+    :type workers: int.
+    :param ordered: Yield the results in the order of ``ids``, holding back
+                    any which finish before the ones ahead of them (e.g. the
+                    pages of a listing, which are read in order).
+    :type ordered: bool.
+    :param prefetch: Most ids which are being scraped or held before the
+                     caller reads them (``2 * workers`` by default).
+    :type prefetch: int.
+    :param kwargs: Passed on to ``scraper``.
+
+    :returns: A generator of 3-tuples: (id, result, error). ``error`` is the
+              exception raised by the scraper (and ``result`` is None), or
+              None if the scraper succeeded.
+
+    With a single worker (or without ``concurrent.futures``), the ids are
+    scraped one after another in the calling thread. Closing the generator
+    (or raising an error it returned) cancels whatever has not started.
+    """
+
+    ids = iter(ids)
+    executor = _executor(workers)
+    # Futures in the order they were submitted.
+    pending = OrderedDict()
+
+    def submit(n):
+        for i in itertools.islice(ids, n):
+            pending[executor.submit(scraper, i, **kwargs)] = i
+
+    try:
+        # Keep every worker busy, with a few ids queued up behind them.
+        submit(prefetch or 2 * workers)
+        while pending:
+            if ordered:
+                done = [next(iter(pending))]
+            else:
+                done = _first_completed(pending)
+            for future in done:
+                i = pending.pop(future)
+                error = future.exception()
+                if error is None:
+                    yield i, future.result(), None
+                else:
+                    yield i, None, error
+            submit(len(done))
+    finally:
+        # If the caller stops early, do not start anything new.
+        for future in pending:
+            future.cancel()
+        executor.shutdown(wait=True)
+
+
+def fetch(url, rate_limit=3, session=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the html at a url.
+
+    When an archive from :mod:`ffscraper.archive` is being replayed, pages
+    only come from the archive. Otherwise, pages are read from the cache in
+    :mod:`ffscraper.cache` when one is installed and holds a fresh copy;
+    cache hits skip the rate limiter. Otherwise the page is downloaded
+    through the shared, pooled session in :mod:`ffscraper.session`, once the
+    shared limiter in :mod:`ffscraper.ratelimit` allows it. Pages are added
+    to an archive being recorded, whether or not they came from the cache.
 
     :param url: A url to a web address.
     :type url: str.
+    :param rate_limit: Minimum number of seconds between requests.
+    :type rate_limit: int.
+    :param session: Optional session to use instead of the shared one.
+    :type session: requests.Session
+
+    :returns: The html at the url.
+    :rtype: str.
+
+    :raises ffscraper.archive.PageNotArchived: If replaying an archive which
+                                               does not contain the url.
+    """
+
+    from .ratelimit import wait
+
+    html = _stored(url)
+    if html is None:
+        wait(rate_limit)
+        html = _download(url, session=session)
+    return html
+
+
+def _stored(url):
+    """
+    .. versionadded:: 0.3.0
+
+    Returns the html at a url from a replayed archive or from the cache,
+    without using the network. See :func:`fetch`.
+
+    :returns: The html, or None if the page has to be downloaded.
+    :rtype: str.
+    """
+
+    from .archive import get_archive, PageNotArchived
+    from .cache import get_cache
+
+    archive = get_archive()
+    if archive is not None and archive.replay:
+        html = archive.get(url)
+        if html is None:
+            raise PageNotArchived(url)
+        return html
+
+    cache = get_cache()
+    if cache is not None:
+        html = cache.get(url)
+        if html is not None:
+            if archive is not None:
+                archive.record(url, html)
+            return html
+
+    return None
+
+
+def _download(url, session=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Download the html at a url, then store it in the cache and in an archive
+    being recorded. The caller is responsible for rate limiting.
+    """
+
+    from .archive import get_archive
+    from .cache import get_cache
+    from .session import get
+
+    html = get(url, session=session)
+
+    cache = get_cache()
+    if cache is not None:
+        cache.put(url, html)
+
+    archive = get_archive()
+    if archive is not None:
+        archive.record(url, html)
+    return html
+
+
+def soupify(url, rate_limit=3, session=None, parser=None, parse_only=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Helper function for returning the soup from a url. See :func:`fetch` for
+    how pages are requested.
+
+    :param url: A url to a web address.
+    :type url: str.
+    :param rate_limit: Minimum number of seconds between requests.
+    :type rate_limit: int.
+    :param session: Optional session to use instead of the shared one.
+    :type session: requests.Session
+    :param parser: Parser to use instead of the one chosen with
+                   :func:`set_parser`.
+    :type parser: str.
+    :param parse_only: Only build the parts of the page matched by this.
+    :type parse_only: Strainer
 
     :returns: Beautiful Soup html parser for the text at the url.
     :rtype: bs4.BeautifulSoup class
@@ -88,11 +480,22 @@ def soupify(url, rate_limit=3):
                     soup = ffs.utils.soupify('https://www.fanfiction.net/u/12')
     """
 
+    html = fetch(url, rate_limit=rate_limit, session=session)
+    return _soup(html, parser=parser, parse_only=parse_only)
+
+
+def _soup(html, parser=None, parse_only=None):
+    """
+    .. versionadded:: 0.3.0
+
+    Parse html into a BeautifulSoup instance with the chosen parser,
+    optionally only building the parts matched by a :class:`Strainer`.
+    """
+
     from bs4 import BeautifulSoup as bs
-    import requests
-    import time
 
-    time.sleep(rate_limit)
+    parser = parser or _parser
 
-    html = requests.get(url).text
-    return bs(html, 'html.parser')
+    if parse_only is None or parser == 'html5lib':
+        return bs(html, parser)
+    return bs(html, parser, parse_only=parse_only.soup_strainer())